@@ -2,519 +2,315 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import io
-import base64
-from datetime import datetime, timedelta, date
-import plotly.express as px
-import plotly.graph_objects as go
-import re
-import calendar
+from datetime import date, datetime
 import os
+import hashlib
+from card_report_parser import get_workbook_sheet_names
+from attendance_core import (CLOCK_COLUMNS, ROMANIAN_MONTH_NAMES, STANDARD_START_MINUTE, employee_row_ranges,
+                             format_clock_columns, get_holidays_frame, get_month_metrics, parse_clock_minutes,
+                             process_attendance_data, read_report_lines)
+from attendance_batch import list_sources, process_batch_in_worker
+from attendance_cube import build_attendance_cube, drill_down
+from excel_export import report_sheets, workbook_bytes
+from history_analytics import range_entities, range_totals, range_trend
+from history_store import ParquetHistoryStore, SqliteHistoryStore
 
 # Configure page
 st.set_page_config(page_title="Analizor Prezență Angajați", layout="wide")
 
-# Initialize session state variables
-if 'historical_data' not in st.session_state:
-    st.session_state.historical_data = pd.DataFrame()
-
 # Ensure data directory exists
 if not os.path.exists('data'):
     os.makedirs('data', exist_ok=True)
 
-# Romanian holidays by year
-ROMANIAN_HOLIDAYS = {
-    2024: [
-        "2024-01-01", "2024-01-02", "2024-01-24", 
-        "2024-05-01", "2024-05-03", "2024-05-05", "2024-05-06",
-        "2024-06-23", "2024-06-24", "2024-08-15",
-        "2024-11-30", "2024-12-01", "2024-12-25", "2024-12-26"
-    ],
-    2025: [
-        "2025-01-01", "2025-01-02", "2025-01-24",
-        "2025-04-18", "2025-04-20", "2025-04-21",
-        "2025-05-01", "2025-06-08", "2025-06-09",
-        "2025-08-15", "2025-11-30", "2025-12-01",
-        "2025-12-25", "2025-12-26"
-    ]
-}
-
-# Function to get holidays for a specific year
-def get_holidays_for_year(year):
-    if year in ROMANIAN_HOLIDAYS:
-        return ROMANIAN_HOLIDAYS[year]
-    
-    # If we don't have data for the requested year, extrapolate from 2025
-    extrapolated_holidays = []
-    for holiday in ROMANIAN_HOLIDAYS[2025]:
-        parts = holiday.split('-')
-        if len(parts) == 3:
-            new_date = f"{year}-{parts[1]}-{parts[2]}"
-            extrapolated_holidays.append(new_date)
-    return extrapolated_holidays
-
-# Function to check if a date is a holiday
-def is_holiday(check_date):
-    year = check_date.year
-    date_str = check_date.strftime("%Y-%m-%d")
-    return date_str in get_holidays_for_year(year)
-
-# Function to calculate working days in a month
-def calculate_working_days(year, month):
-    num_days = calendar.monthrange(year, month)[1]
-    working_days = 0
-    
-    for day in range(1, num_days + 1):
-        current_date = date(year, month, day)
-        if current_date.weekday() < 5:  # 0-4 are Monday-Friday
-            if not is_holiday(current_date):
-                working_days += 1
-    
-    return working_days
+# Attendance history: one Parquet file per month by default, or an embedded SQLite database
+# (ATTENDANCE_HISTORY_BACKEND=sqlite), plus the CSV file used by older versions
+HISTORY_DIR = 'data/history'
+HISTORY_DATABASE = 'data/attendance_history.db'
+LEGACY_HISTORY_FILE = 'data/attendance_history.csv'
+HISTORY_BACKEND = os.environ.get('ATTENDANCE_HISTORY_BACKEND', 'parquet')
 
-# Function to calculate standard monthly hours
-def calculate_standard_monthly_hours(year, month):
-    num_days = calendar.monthrange(year, month)[1]
-    total_hours = 0
-    
-    for day in range(1, num_days + 1):
-        current_date = date(year, month, day)
-        weekday = current_date.weekday()
-        
-        # Skip weekends and holidays
-        if weekday >= 5 or is_holiday(current_date):
-            continue
-        
-        # Add hours based on day of week
-        if weekday == 4:  # Friday
-            total_hours += 6.0
-        else:  # Monday to Thursday
-            total_hours += 8.5
-    
-    return total_hours
-
-# Function to parse time strings
-def parse_time(time_str):
-    if pd.isna(time_str) or time_str == '':
-        return None
-    try:
-        return datetime.strptime(time_str.strip(), '%H:%M')
-    except:
-        return None
+if HISTORY_BACKEND == 'sqlite':
+    history_store = SqliteHistoryStore(HISTORY_DATABASE)
+else:
+    history_store = ParquetHistoryStore(HISTORY_DIR)
 
-# Function to calculate duration between times
-def calculate_duration(entry_time, exit_time):
-    if entry_time is None or exit_time is None:
-        return 0
-    
-    duration = exit_time - entry_time
-    hours = duration.total_seconds() / 3600
-    return round(hours, 2)
+# Uploads are processed once per distinct content; keep the most recent ones for an hour
+UPLOAD_CACHE_ENTRIES = 16
+UPLOAD_CACHE_TTL = 3600
 
-# Function to convert date string to datetime
-def convert_date_string(date_str, year=None):
-    if pd.isna(date_str) or not date_str:
-        return None
-    
-    # Clean up the date string
-    date_str = date_str.strip()
+# Function to import the legacy CSV history into the Parquet store, once
+def migrate_legacy_history():
+    if not os.path.exists(LEGACY_HISTORY_FILE) or not history_store.is_empty():
+        return
     
-    # Try different date formats
-    formats = ['%d %B %Y', '%d %B', '%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d']
+    legacy_df = pd.read_csv(LEGACY_HISTORY_FILE)
+    legacy_df['Data_Obiect'] = pd.to_datetime(legacy_df['Data_Obiect'], format='mixed', errors='coerce')
     
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_str, fmt)
-            if '%Y' not in fmt and year:
-                # If year is not in the format, set it
-                dt = dt.replace(year=year)
-            return dt
-        except ValueError:
-            continue
+    # Entry/exit are kept as minutes; older history files stored them as 'HH:MM' strings
+    for minute_column, clock_column in CLOCK_COLUMNS.items():
+        if clock_column in legacy_df.columns:
+            position = legacy_df.columns.get_loc(clock_column)
+            legacy_df.insert(position, minute_column, parse_clock_minutes(legacy_df.pop(clock_column)))
+        elif minute_column in legacy_df.columns:
+            legacy_df[minute_column] = legacy_df[minute_column].astype('Int16')
     
-    return None
+    history_store.upsert(legacy_df)
 
-# Function to load historical data
-def load_historical_data():
+# Function to count the historical records without loading them
+def count_historical_records():
     try:
-        if os.path.exists('data/attendance_history.csv'):
-            return pd.read_csv('data/attendance_history.csv')
-        return pd.DataFrame()
+        migrate_legacy_history()
+        return history_store.count()
     except Exception as e:
         st.warning(f"Nu s-a putut încărca istoricul: {e}")
-        return pd.DataFrame()
+        return 0
 
-# Function to save data to historical record
-def save_to_historical_data(new_data):
+# Function to get the first and last day covered by the history, or None when it is empty
+def get_history_bounds():
     try:
-        if new_data.empty:
-            return pd.DataFrame()
-            
-        # Load existing data first
-        historical_df = load_historical_data()
-        
-        if historical_df.empty:
-            historical_df = new_data
-        else:
-            # Remove duplicates based on Employee + Date
-            if 'Angajat' in new_data.columns and 'Data' in new_data.columns:
-                for _, row in new_data.iterrows():
-                    mask = (historical_df['Angajat'] == row['Angajat']) & (historical_df['Data'] == row['Data'])
-                    historical_df = historical_df[~mask]
-                
-                # Add new data
-                historical_df = pd.concat([historical_df, new_data], ignore_index=True)
-        
-        # Save locally
-        historical_df.to_csv('data/attendance_history.csv', index=False)
-        
-        st.session_state.historical_data = historical_df
-        return historical_df
+        migrate_legacy_history()
+        partitions = [partition for partition in history_store.partitions() if partition != (0, 0)]
     except Exception as e:
-        st.warning(f"Nu s-a putut salva istoricul: {e}")
-        return pd.DataFrame()
+        st.warning(f"Nu s-a putut încărca istoricul: {e}")
+        return None
+    if not partitions:
+        return None
+
+    (first_year, first_month), (last_year, last_month) = partitions[0], partitions[-1]
+    last_day = pd.Timestamp(last_year, last_month, 1) + pd.offsets.MonthEnd(0)
+    return date(first_year, first_month, 1), last_day.date()
 
-# Function to create download link
-def get_download_link(df, filename, link_text):
+# Function to total the history over a date interval, from the smallest stored rollups that cover it
+def load_history_totals(start, end, by):
     try:
-        csv = df.to_csv(index=False)
-        b64 = base64.b64encode(csv.encode()).decode()
-        href = f'<a href="data:file/csv;base64,{b64}" download="{filename}" class="download-link">{link_text}</a>'
-        return href
+        migrate_legacy_history()
+        return range_totals(history_store, start, end, by)
     except Exception as e:
-        st.warning(f"Nu s-a putut crea link-ul de descărcare: {e}")
-        return ""
+        st.warning(f"Nu s-au putut încărca totalurile din istoric: {e}")
+        return pd.DataFrame(), None
 
-# Function to create Excel download link
-def get_excel_download_link(df, filename, link_text):
+# Function to load the weekly, monthly or yearly totals of the history that overlap a date interval, of everyone or
+# only of the given employee or department
+def load_history_trend(level, start, end, by, entity=None):
     try:
-        output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-            df.to_excel(writer, index=False, sheet_name='Sheet1')
-        excel_data = output.getvalue()
-        b64 = base64.b64encode(excel_data).decode()
-        href = f'<a href="data:application/vnd.openxmlformats-officedocument.spreadsheetml.sheet;base64,{b64}" download="{filename}" class="download-link">{link_text}</a>'
-        return href
+        migrate_legacy_history()
+        return range_trend(history_store, level, start, end, by, entity)
     except Exception as e:
-        st.warning(f"Nu s-a putut crea link-ul de descărcare Excel: {e}")
-        return ""
+        st.warning(f"Nu s-au putut încărca totalurile din istoric: {e}")
+        return pd.DataFrame()
 
-# Helper function to process employee data entries (removes duplication)
-def process_employee_entry(current_employee, department, badge_id, weekdays, dates, time_range, report_year):
-    data_entries = []
-    
-    for day_idx, (day, date_str, time_range_val) in enumerate(zip(weekdays, dates, time_range)):
-        if date_str:  # Check if date exists
-            date_obj = convert_date_string(date_str, report_year)
-            weekday_name = day
-            
-            if time_range_val and '-' in time_range_val:
-                entry_time_str, exit_time_str = time_range_val.split(' - ')
-                entry_time = parse_time(entry_time_str)
-                exit_time = parse_time(exit_time_str)
-                
-                if entry_time and exit_time:
-                    duration = calculate_duration(entry_time, exit_time)
-                    standard_duration = 0
-                    
-                    # Calculate standard hours based on weekday
-                    if weekday_name in ['Mon', 'Tue', 'Wed', 'Thu']:
-                        standard_duration = 8.5
-                    elif weekday_name == 'Fri':
-                        standard_duration = 6.0
-                    
-                    # Check if it's a holiday
-                    if date_obj and is_holiday(date_obj):
-                        standard_duration = 0
-                    
-                    data_entries.append({
-                        'Angajat': current_employee,
-                        'Departament': department,
-                        'ID Legitimație': badge_id,
-                        'Zi': weekday_name,
-                        'Data': date_str,
-                        'Data_Obiect': date_obj,
-                        'Ora Sosire': entry_time_str,
-                        'Ora Plecare': exit_time_str,
-                        'Durata (Ore)': duration,
-                        'Ore Standard': standard_duration,
-                        'Diferență': duration - standard_duration
-                    })
-            else:
-                # Date exists but no time range (absent day)
-                standard_duration = 0
-                if weekday_name in ['Mon', 'Tue', 'Wed', 'Thu']:
-                    standard_duration = 8.5
-                elif weekday_name == 'Fri':
-                    standard_duration = 6.0
-                
-                # Check if it's a holiday
-                if date_obj and is_holiday(date_obj):
-                    standard_duration = 0
-                
-                data_entries.append({
-                    'Angajat': current_employee,
-                    'Departament': department,
-                    'ID Legitimație': badge_id,
-                    'Zi': weekday_name,
-                    'Data': date_str,
-                    'Data_Obiect': date_obj,
-                    'Ora Sosire': '',
-                    'Ora Plecare': '',
-                    'Durata (Ore)': 0,
-                    'Ore Standard': standard_duration,
-                    'Diferență': -standard_duration
-                })
-    
-    return data_entries
+# Function to list the employees or departments with hours in a date interval
+def load_history_entities(start, end, by):
+    try:
+        migrate_legacy_history()
+        return range_entities(history_store, start, end, by)
+    except Exception as e:
+        st.warning(f"Nu s-au putut încărca totalurile din istoric: {e}")
+        return []
 
-# Function to process attendance data
-def process_attendance_data(file_content):
+# Function to get the keys an upload is recorded by in the history: the content hash of each file and its sheet
+def get_upload_record_keys(upload_key):
+    return [f"{upload_hash}:{sheet_name or ''}" for upload_hash, sheet_name in upload_key]
+
+# Function to save data to historical record, unless all of its uploads were already saved (in any session)
+def save_to_historical_data(new_data, upload_key):
     try:
-        # Read CSV content
-        lines = file_content.strip().split('\n')
-        
-        # Extract date range from header
-        date_range_line = lines[1] if len(lines) > 1 else ""
-        date_match = re.search(r'from\s+(\d+\s+\w+\s+\d+)\s+to\s+(\d+\s+\w+\s+\d+)', date_range_line)
-        date_range = f"{date_match.group(1)} - {date_match.group(2)}" if date_match else "N/A"
-        
-        # Extract start and end dates
-        start_date_str = date_match.group(1) if date_match else None
-        end_date_str = date_match.group(2) if date_match else None
-        
-        start_date = convert_date_string(start_date_str)
-        end_date = convert_date_string(end_date_str)
-        report_year = start_date.year if start_date else datetime.now().year
-        
-        data = []
-        current_employee = None
-        department = None
-        badge_id = None
-        days_data = []
-        weekdays = None
-        dates = None
-        
-        for line in lines:
-            line = line.strip()
-            
-            # Skip empty lines
-            if not line:
-                continue
-            
-            # Check if this is an employee header line
-            employee_match = re.search(r',([^,]+\s+[^,]+\s+\d+),([^,]*),', line)
-            if employee_match:
-                # Process previous employee data if it exists
-                if current_employee and days_data:
-                    data_entries = process_employee_entry(current_employee, department, badge_id, weekdays, dates, days_data, report_year)
-                    data.extend(data_entries)
-                
-                # Set new employee data
-                current_employee = employee_match.group(1).strip()
-                department = employee_match.group(2).strip()
-                
-                # Extract badge ID
-                badge_match = re.search(r'(\d{3}[A-Z0-9]+)$', line)
-                badge_id = badge_match.group(1) if badge_match else "N/A"
-                
-                days_data = []
-                continue
-            
-            # Check if this is a weekday header line
-            if line.startswith('Mon,Tue,Wed,Thu,Fri,Sat,Sun'):
-                weekdays = line.split(',')
-                continue
-            
-            # Check if this is a date line
-            date_line_match = re.match(r'\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,', line)
-            if date_line_match:
-                dates = []
-                for date_str in line.split(','):
-                    date_str = date_str.strip()
-                    if date_str and re.match(r'\d+\s+\w+', date_str):
-                        dates.append(date_str)
-                    else:
-                        dates.append(None)
-                continue
-            
-            # Check if this is a time range line
-            time_range_match = re.match(r'(\d{1,2}:\d{2}\s+-\s+\d{1,2}:\d{2})?,(\d{1,2}:\d{2}\s+-\s+\d{1,2}:\d{2})?,', line)
-            if time_range_match:
-                days_data = line.split(',')
-                days_data = [d.strip() if d.strip() else None for d in days_data]
-                
-                # Process current employee data
-                if current_employee and days_data:
-                    data_entries = process_employee_entry(current_employee, department, badge_id, weekdays, dates, days_data, report_year)
-                    data.extend(data_entries)
-                
-                days_data = []
-                continue
-        
-        # Create DataFrame
-        df = pd.DataFrame(data)
-        
-        # Add missing working days for each employee
-        if not df.empty and start_date and end_date:
-            all_employees = df['Angajat'].unique()
-            
-            for employee in all_employees:
-                # Get department and badge ID for this employee
-                emp_df = df[df['Angajat'] == employee]
-                if not emp_df.empty:
-                    department = emp_df['Departament'].iloc[0] if 'Departament' in emp_df.columns else ""
-                    badge_id = emp_df['ID Legitimație'].iloc[0]
-                    
-                    current_date = start_date
-                    while current_date <= end_date:
-                        weekday_num = current_date.weekday()
-                        weekday_name = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'][weekday_num]
-                        date_str = current_date.strftime("%d %B")
-                        
-                        # Skip weekends
-                        if weekday_num < 5:
-                            # Check if this day already exists for this employee
-                            date_exists = False
-                            for _, row in emp_df.iterrows():
-                                row_date = row.get('Data_Obiect')
-                                if row_date and row_date.date() == current_date.date():
-                                    date_exists = True
-                                    break
-                            
-                            if not date_exists:
-                                # Calculate standard hours
-                                standard_duration = 0
-                                if weekday_name in ['Mon', 'Tue', 'Wed', 'Thu']:
-                                    standard_duration = 8.5
-                                elif weekday_name == 'Fri':
-                                    standard_duration = 6.0
-                                
-                                # Check if it's a holiday
-                                if is_holiday(current_date):
-                                    standard_duration = 0
-                                
-                                # Add the missing day
-                                new_row = {
-                                    'Angajat': employee,
-                                    'Departament': department,
-                                    'ID Legitimație': badge_id,
-                                    'Zi': weekday_name,
-                                    'Data': date_str,
-                                    'Data_Obiect': current_date,
-                                    'Ora Sosire': '',
-                                    'Ora Plecare': '',
-                                    'Durata (Ore)': 0,
-                                    'Ore Standard': standard_duration,
-                                    'Diferență': -standard_duration
-                                }
-                                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-                        
-                        current_date += timedelta(days=1)
-        
-        # Extract year, month info and add them as columns
-        if not df.empty and 'Data_Obiect' in df.columns:
-            df['An'] = df['Data_Obiect'].apply(lambda x: x.year if x else None)
-            df['Luna'] = df['Data_Obiect'].apply(lambda x: x.month if x else None)
-            df['Luna_Nume'] = df['Data_Obiect'].apply(lambda x: x.strftime('%B') if x else None)
-            df['Săptămână'] = df['Data_Obiect'].apply(lambda x: x.isocalendar()[1] if x else None)
-        
-        # Sort DataFrame by employee and date
-        if 'Data_Obiect' in df.columns and not df.empty:
-            df = df.sort_values(['Angajat', 'Data_Obiect']).reset_index(drop=True)
-        
-        # Calculate weekly totals for each employee
-        weekly_data = []
-        
-        if not df.empty and 'Săptămână' in df.columns:
-            for (employee, year, week), week_df in df.groupby(['Angajat', 'An', 'Săptămână']):
-                if pd.isna(year) or pd.isna(week):
-                    continue
-                    
-                total_hours = week_df['Durata (Ore)'].sum()
-                total_standard_hours = week_df['Ore Standard'].sum()
-                
-                # Get department
-                department = week_df['Departament'].iloc[0] if 'Departament' in week_df.columns else ""
-                
-                # Get the first and last date of the week
-                dates = sorted(week_df['Data_Obiect'].dropna())
-                week_start = dates[0].strftime('%d %b') if dates else ""
-                week_end = dates[-1].strftime('%d %b') if dates else ""
-                week_range = f"{week_start} - {week_end}" if week_start and week_end else f"Săpt. {week}"
-                
-                weekly_data.append({
-                    'Angajat': employee,
-                    'Departament': department,
-                    'An': year,
-                    'Săptămână': week,
-                    'Interval': week_range,
-                    'Ore Totale': total_hours,
-                    'Ore Standard': total_standard_hours,
-                    'Diferență': total_hours - total_standard_hours
-                })
-        
-        weekly_df = pd.DataFrame(weekly_data)
-        
-        # Calculate monthly totals
-        monthly_data = []
-        
-        if not df.empty and 'Luna' in df.columns and 'An' in df.columns:
-            for (employee, year, month), month_df in df.groupby(['Angajat', 'An', 'Luna']):
-                if pd.isna(year) or pd.isna(month):
-                    continue
-                    
-                # Calculate actual hours worked
-                total_hours = month_df['Durata (Ore)'].sum()
-                
-                # Calculate standard hours for the month
-                standard_hours = calculate_standard_monthly_hours(int(year), int(month))
-                
-                # Get department
-                department = month_df['Departament'].iloc[0] if 'Departament' in month_df.columns else ""
-                
-                # Get month name
-                month_name = month_df['Luna_Nume'].iloc[0] if not month_df['Luna_Nume'].isna().all() else ""
-                
-                monthly_data.append({
-                    'Angajat': employee,
-                    'Departament': department,
-                    'An': int(year),
-                    'Luna': int(month),
-                    'Luna_Nume': month_name,
-                    'Ore Totale': total_hours,
-                    'Ore Standard': standard_hours,
-                    'Diferență': total_hours - standard_hours,
-                    'Zile Lucrătoare': calculate_working_days(int(year), int(month))
-                })
-        
-        monthly_df = pd.DataFrame(monthly_data)
-        
-        return df, weekly_df, monthly_df, date_range, report_year
+        if new_data.empty:
+            return False
+
+        migrate_legacy_history()
+        record_keys = get_upload_record_keys(upload_key)
+        if set(record_keys) <= history_store.recorded_uploads(record_keys):
+            return False
+
+        # Replace the same Employee + Date in the touched months only
+        history_store.upsert(new_data)
+        history_store.record_uploads(record_keys)
+        return True
     except Exception as e:
-        st.error(f"Eroare la procesarea datelor: {e}")
-        st.exception(e)
-        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), "N/A", datetime.now().year
+        st.warning(f"Nu s-a putut salva istoricul: {e}")
+        return False
+
+# Function to export a table as CSV bytes, with entry/exit as 'HH:MM'; cached per data version and filters
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL, show_spinner=False)
+def export_csv(export_key, _df):
+    return format_clock_columns(_df).to_csv(index=False).encode('utf-8')
+
+# Function to export a table as XLSX bytes; cached per data version and filters
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL, show_spinner=False)
+def export_excel(export_key, _df):
+    return workbook_bytes({'Sheet1': _df})
+
+# Function to export the daily, weekly and monthly tables and the holidays as one workbook; cached per data version
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL, show_spinner=False)
+def export_report(export_key, _daily_df, _weekly_df, _monthly_df):
+    return workbook_bytes(report_sheets(_daily_df, _weekly_df, _monthly_df))
+
+# Function to show the CSV/Excel download buttons of a table; the files are only built when a button is clicked
+def show_download_buttons(export_key, original_df, display_df, file_prefix):
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("📥 Descărcați Date Originale (CSV)", data=lambda: export_csv(export_key, original_df),
+                           file_name=f"{file_prefix}_original.csv", mime="text/csv",
+                           key=f"{file_prefix}_csv", on_click="ignore")
+    with col2:
+        st.download_button("📥 Descărcați Date Afișate (Excel)", data=lambda: export_excel(export_key, display_df),
+                           file_name=f"{file_prefix}_afisate.xlsx",
+                           mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                           key=f"{file_prefix}_xlsx", on_click="ignore")
+
+
+# Styles of the table cells: absent days, and positive/negative differences
+ABSENT_ROW_STYLE = 'background-color: #fff3f3'
+POSITIVE_DIFFERENCE_STYLE = 'background-color: #c6efce; color: #006100'
+NEGATIVE_DIFFERENCE_STYLE = 'background-color: #ffc7ce; color: #9c0006'
+
+# Rows shown, styled and sent to the browser at a time, and the page sizes offered for the daily records
+TABLE_PAGE_SIZE = 500
+DAILY_PAGE_SIZES = [50, 100, 250, 500, 1000]
+
+# Levels of detail of the department totals
+CUBE_PERIOD_LABELS = {'Tot intervalul': 'total', 'Lunar': 'monthly', 'Săptămânal': 'weekly'}
+
+# Levels of the history trends, from the stored weekly, monthly and yearly totals
+HISTORY_TREND_LEVELS = {'Săptămânal': 'weekly', 'Lunar': 'monthly', 'Anual': 'yearly'}
+
+# Function to build the styles of a whole table at once: 'Diferență' green when positive and red when negative,
+# and the whole row shaded for absent days (no entry time)
+def difference_style_mask(df):
+    styles = np.full(df.shape, '', dtype=object)
+    if 'Diferență' in df.columns:
+        difference = df['Diferență'].to_numpy(dtype=float, na_value=np.nan)
+        styles[:, df.columns.get_loc('Diferență')] = np.where(
+            difference > 0, POSITIVE_DIFFERENCE_STYLE, np.where(difference < 0, NEGATIVE_DIFFERENCE_STYLE, '')
+        )
+    if 'Ora Sosire' in df.columns:
+        absent = (df['Ora Sosire'].isna() | (df['Ora Sosire'] == '')).to_numpy()
+        styles[absent, :] = ABSENT_ROW_STYLE
+    return pd.DataFrame(styles, index=df.index, columns=df.columns)
+
+# Function to show a table one page at a time; only the rows of the current page are formatted, styled and
+# sent to the browser. With page_sizes the page size can be chosen too
+def show_table_page(df, key, page_sizes=None):
+    page_size = TABLE_PAGE_SIZE
+    size_column = page_column = caption_column = st.container()
+    if page_sizes:
+        size_column, page_column, caption_column = st.columns([1, 1, 2])
+        with size_column:
+            page_size = st.selectbox("Rânduri pe pagină", page_sizes, index=page_sizes.index(TABLE_PAGE_SIZE),
+                                     key=f"{key}_page_size")
+
+    page_count = max(1, -(-len(df) // page_size))
+    page_key = f"{key}_page"
+    page = 1
+    if page_count > 1:
+        # Keep the selected page valid when a filter or a larger page size shortens the table
+        if st.session_state.get(page_key, 1) > page_count:
+            st.session_state[page_key] = page_count
+        with page_column:
+            page = st.number_input(f"Pagina (din {page_count})", min_value=1, max_value=page_count, step=1,
+                                   key=page_key)
+
+    start = (page - 1) * page_size
+    page_df = format_clock_columns(df.iloc[start:start + page_size])
+    with caption_column:
+        st.caption(f"Rândurile {start + 1}–{start + len(page_df)} din {len(df)}")
+    st.dataframe(page_df.style.apply(difference_style_mask, axis=None), width="stretch")
+
+# Function to index the rows of each employee, once per data version and table
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL, show_spinner=False)
+def get_employee_row_ranges(data_key, _df):
+    return employee_row_ranges(_df)
+
+# Function to select the rows of one employee by their row range ('Toți' keeps all the rows)
+def select_employee_rows(df, employee_rows, employee):
+    if employee == 'Toți':
+        return df
+    return df.iloc[slice(*employee_rows.get(employee, (0, 0)))]
+
+# Function to scale the positive worked hours by the rounding percentage and recompute the differences
+def apply_rounding(df, hours_column, percentage):
+    if df.empty:
+        return df
+    hours = df[hours_column].to_numpy(dtype=float)
+    scaled = hours * (1 + percentage / 100)
+    # Python's round() rounds the exact binary value, np.round() can differ by 0.01 on ties like 7.245
+    scaled = np.fromiter((round(value, 2) for value in scaled.tolist()), dtype=float, count=len(scaled))
+    rounded_df = df.copy()
+    rounded_df[hours_column] = np.where(hours > 0, scaled, hours)
+    rounded_df['Diferență'] = rounded_df[hours_column] - rounded_df['Ore Standard']
+    return rounded_df
+
+# Function to apply the rounding percentage to the daily, weekly and monthly results, once per data version and percentage
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL, show_spinner=False)
+def round_results(data_key, percentage, _daily_df, _weekly_df, _monthly_df):
+    return (apply_rounding(_daily_df, 'Durata (Ore)', percentage),
+            apply_rounding(_weekly_df, 'Ore Totale', percentage),
+            apply_rounding(_monthly_df, 'Ore Totale', percentage))
+
+# Function to build the department cube of the results as shown, once per data version and rounding percentage
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL, show_spinner=False)
+def get_attendance_cube(data_key, percentage, _daily_df):
+    return build_attendance_cube(_daily_df)
+
+# Function to prepare a level of the department cube for display
+def format_cube_level(level):
+    return level.drop(columns=['Început'], errors='ignore').round(2)
+
+# Function to get the results as shown with the rounding percentage; without rounding they are the results themselves
+def get_rounded_results(data_key, percentage, daily_df, weekly_df, monthly_df):
+    if percentage <= 0:
+        return daily_df, weekly_df, monthly_df
+    return round_results(data_key, percentage, daily_df, weekly_df, monthly_df)
+
+# Function to hash the content of an uploaded file
+def get_upload_hash(file_bytes):
+    return hashlib.sha256(file_bytes).hexdigest()
+
+# Function to list the sheets of an uploaded workbook, cached per upload content
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL, show_spinner=False)
+def get_sheet_names(upload_hash, _file_bytes):
+    return get_workbook_sheet_names(io.BytesIO(_file_bytes))
+
+# Function to read and process an uploaded file, cached per upload content and sheet
+@st.cache_data(max_entries=UPLOAD_CACHE_ENTRIES, ttl=UPLOAD_CACHE_TTL, show_spinner="Se procesează datele...")
+def process_uploaded_file(upload_hash, sheet_name, file_name, _file_bytes):
+    # Worksheet rows are streamed straight into the report parser; errors are raised, so they are not cached
+    return process_attendance_data(read_report_lines(file_name, _file_bytes, sheet_name))
+
+# Function to process a batch of uploaded files in a process pool with a progress bar; the last batch is kept per session
+def process_uploaded_batch(uploaded_files, all_sheets):
+    sources = []
+    batch_key = []
+    for uploaded in uploaded_files:
+        file_bytes = uploaded.getvalue()
+        upload_hash = get_upload_hash(file_bytes)
+        for source in list_sources(uploaded.name, file_bytes, all_sheets):
+            sources.append(source)
+            batch_key.append((upload_hash, source.sheet_name))
+    batch_key = tuple(batch_key)
+
+    if st.session_state.get('batch_key') != batch_key:
+        progress_bar = st.progress(0.0, text=f"Se procesează {len(sources)} rapoarte...")
+
+        def report_progress(done, total, label):
+            progress_bar.progress(done / total, text=f"Procesat {done}/{total}: {label}")
+
+        # The server process runs threads and Streamlit installs this script as __main__, so the pool runs in a
+        # separate worker process
+        st.session_state.batch_result = process_batch_in_worker(sources, progress_callback=report_progress)
+        st.session_state.batch_key = batch_key
+        progress_bar.empty()
+
+    result, errors = st.session_state.batch_result
+    for label, error in errors:
+        st.warning(f"Nu s-a putut procesa {label}: {error}")
+    return result, batch_key
 
 # Custom CSS
 st.markdown("""
 <style>
     .main { padding: 2rem; }
-    .download-link {
-        background-color: #4CAF50;
-        color: white;
-        padding: 10px 15px;
-        text-align: center;
-        text-decoration: none;
-        display: inline-block;
-        font-size: 16px;
-        margin: 4px 2px;
-        cursor: pointer;
-        border-radius: 5px;
-        transition: background-color 0.3s;
-    }
-    .download-link:hover {
-        background-color: #45a049;
-    }
     .highlight-positive { color: green; font-weight: bold; }
     .highlight-negative { color: red; font-weight: bold; }
     .absent-row { background-color: #fff3f3; }
@@ -567,36 +363,58 @@ st.markdown("Încărcați datele de prezență și obțineți o analiză complet
 
 # File upload section
 st.markdown("### Încărcați Datele de Prezență")
-uploaded_file = st.file_uploader("Alegeți un fișier", type=['xlsx', 'csv'])
+batch_mode = st.checkbox("Procesare în lot (mai multe fișiere sau toate foile unui registru)", key="batch_mode")
+if batch_mode:
+    uploaded_files = st.file_uploader("Alegeți fișierele", type=['xlsx', 'csv'], accept_multiple_files=True)
+    all_sheets = st.checkbox("Toate foile din fiecare registru Excel", value=True, key="batch_all_sheets")
+else:
+    uploaded_file = st.file_uploader("Alegeți un fișier", type=['xlsx', 'csv'])
+    uploaded_files = [uploaded_file] if uploaded_file is not None else []
 
-# Load historical data
-historical_df = load_historical_data()
+# Count historical data
+history_count = count_historical_records()
 
-if not historical_df.empty:
-    st.info(f"📊 Istoric disponibil: {len(historical_df)} înregistrări")
+if history_count:
+    st.info(f"📊 Istoric disponibil: {history_count} înregistrări")
 
 # Main application logic
-if uploaded_file is not None:
+if uploaded_files:
     try:
-        # Process the uploaded file
-        if uploaded_file.name.endswith('.xlsx'):
-            # For Excel files
-            xls = pd.ExcelFile(uploaded_file)
-            sheet_name = st.selectbox("Selectați Foaia", xls.sheet_names)
-            df_raw = pd.read_excel(uploaded_file, sheet_name=sheet_name)
-            file_content = df_raw.to_csv(index=False)
+        if batch_mode:
+            # Process all files and sheets in parallel (one after the other on a single core), merged into one result
+            (daily_df, weekly_df, monthly_df, date_range, report_year), upload_key = process_uploaded_batch(
+                uploaded_files, all_sheets
+            )
         else:
-            # For CSV files
-            file_content = uploaded_file.getvalue().decode('utf-8')
-        
-        # Process the data
-        daily_df, weekly_df, monthly_df, date_range, report_year = process_attendance_data(file_content)
+            # Process the uploaded file, once per distinct content and sheet
+            file_bytes = uploaded_file.getvalue()
+            upload_hash = get_upload_hash(file_bytes)
+            sheet_name = None
+            if uploaded_file.name.endswith('.xlsx'):
+                # For Excel files
+                sheet_name = st.selectbox("Selectați Foaia", get_sheet_names(upload_hash, file_bytes))
+            
+            # Process the data; a failure is shown here, outside the cached call, and retried on the next run
+            try:
+                daily_df, weekly_df, monthly_df, date_range, report_year = process_uploaded_file(
+                    upload_hash, sheet_name, uploaded_file.name, file_bytes
+                )
+            except Exception as e:
+                st.error(f"Eroare la procesarea datelor: {e}")
+                st.exception(e)
+                daily_df = weekly_df = monthly_df = pd.DataFrame()
+            upload_key = ((upload_hash, sheet_name),)
         
         if not daily_df.empty:
-            # Save new data to history
-            updated_history = save_to_historical_data(daily_df)
+            # Save new data to history, only the first time this content is seen
+            save_to_historical_data(daily_df, upload_key)
             
             st.success(f"✅ Date procesate cu succes! Interval de date: {date_range}")
+            st.download_button("📥 Descărcați Raportul Complet (Excel)",
+                               data=lambda: export_report(upload_key, daily_df, weekly_df, monthly_df),
+                               file_name="raport_prezenta.xlsx",
+                               mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                               key="report_xlsx", on_click="ignore")
             
             # Add rounding percentage selector
             col1, col2 = st.columns([1, 3])
@@ -610,51 +428,34 @@ if uploaded_file is not None:
                 if rounding_percentage > 0:
                     st.info(f"Valorile pozitive din coloana 'Durata (Ore)' vor fi rotunjite în sus cu {rounding_percentage}%")
             
+            # Rounded hours and differences, shared by every tab and chart
+            rounded_daily_df, rounded_weekly_df, rounded_monthly_df = get_rounded_results(
+                upload_key, rounding_percentage, daily_df, weekly_df, monthly_df
+            )
+            
             # Create tabs for different views
-            tab1, tab2, tab3, tab4 = st.tabs(["📋 Analiză Zilnică", "📅 Sumar Săptămânal", "📆 Prezentare Lunară", "📊 Vizualizări"])
+            # Tab changes rerun the script, so the charts are only built while their tab is open
+            tab1, tab2, tab3, tab4, tab5 = st.tabs(["📋 Analiză Zilnică", "📅 Sumar Săptămânal", "📆 Prezentare Lunară",
+                                                    "📊 Vizualizări", "🏢 Departamente"],
+                                                   key="main_tabs", on_change="rerun")
 
             with tab1:
                 st.markdown("### Înregistrări Zilnice de Prezență")
                 
-                # Filter by employee
-                if 'Angajat' in daily_df.columns:
-                    employees = sorted(daily_df['Angajat'].unique())
-                    selected_employee = st.selectbox("Selectați Angajatul", ['Toți'] + list(employees), key="daily_employee")
-                    
-                    if selected_employee != 'Toți':
-                        filtered_df = daily_df[daily_df['Angajat'] == selected_employee]
-                    else:
-                        filtered_df = daily_df
-                else:
-                    filtered_df = daily_df
+                # Filter by employee: the daily rows are sorted by employee and date, so an employee is a row range
+                employee_rows = get_employee_row_ranges((upload_key, 'daily'), daily_df)
+                selected_employee = st.selectbox("Selectați Angajatul", ['Toți'] + list(employee_rows), key="daily_employee")
+                
+                filtered_df = select_employee_rows(daily_df, employee_rows, selected_employee)
+                filtered_rounded_df = select_employee_rows(rounded_daily_df, employee_rows, selected_employee)
                 
                 # Display the DataFrame
                 if not filtered_df.empty:
-                    # Create copy for display, dropping unwanted columns
-                    display_df = filtered_df.drop(columns=['Departament', 'ID Legitimație'])
-                    
-                    # Apply rounding if selected
-                    if rounding_percentage > 0:
-                        display_df['Durata (Ore)'] = display_df.apply(
-                            lambda row: round(row['Durata (Ore)'] * (1 + rounding_percentage/100), 2) if row['Durata (Ore)'] > 0 else row['Durata (Ore)'], 
-                            axis=1
-                        )
-                        # Recalculate difference
-                        display_df['Diferență'] = display_df['Durata (Ore)'] - display_df['Ore Standard']
+                    # Create copy for display, dropping unwanted columns; entry/exit times are formatted per page
+                    display_df = filtered_rounded_df.drop(columns=['Departament', 'ID Legitimație'])
                                     
-                    # Highlight differences
-                    def highlight_difference(row):
-                        if pd.isna(row['Ora Sosire']) or row['Ora Sosire'] == '':
-                            return ['background-color: #fff3f3'] * len(row)
-                        if row['Diferență'] > 0:
-                            return ['background-color: #c6efce; color: #006100' if col == 'Diferență' else '' for col in row.index]
-                        elif row['Diferență'] < 0:
-                            return ['background-color: #ffc7ce; color: #9c0006' if col == 'Diferență' else '' for col in row.index]
-                        return [''] * len(row)
-                                    
-                    styled_df = display_df.style.apply(highlight_difference, axis=1)
-                                    
-                    st.dataframe(styled_df, use_container_width=True)
+                    # Highlight differences and absences, on the current page only
+                    show_table_page(display_df, "daily_table", DAILY_PAGE_SIZES)
                     
                     # Summary for displayed data
                     total_presence = display_df['Durata (Ore)'].sum()
@@ -671,54 +472,28 @@ if uploaded_file is not None:
                         st.metric("Diferență", f"{total_difference:.2f}", 
                                 delta=f"{(total_difference/total_standard*100):.1f}%" if total_standard > 0 else None)
                     
-                    # Download links
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown(get_download_link(filtered_df, "prezenta_zilnica_original.csv", "📥 Descărcați Date Originale (CSV)"), unsafe_allow_html=True)
-                    with col2:
-                        st.markdown(get_excel_download_link(display_df, "prezenta_zilnica_afisate.xlsx", "📥 Descărcați Date Afișate (Excel)"), unsafe_allow_html=True)
+                    # Downloads, built on demand
+                    show_download_buttons((upload_key, 'daily', selected_employee, rounding_percentage),
+                                          filtered_df, display_df, "prezenta_zilnica")
                 else:
                     st.info("Nu există date de afișat pentru selecția curentă.")
 
             with tab2:
                 st.markdown("### Sumar Săptămânal")
                 
-                # Filter by employee
-                if 'Angajat' in weekly_df.columns:
-                    weekly_employees = sorted(weekly_df['Angajat'].unique())
-                    selected_weekly_employee = st.selectbox("Selectați Angajatul", ['Toți'] + list(weekly_employees), key="weekly_employee")
-                    
-                    if selected_weekly_employee != 'Toți':
-                        filtered_weekly_df = weekly_df[weekly_df['Angajat'] == selected_weekly_employee]
-                    else:
-                        filtered_weekly_df = weekly_df
-                else:
-                    filtered_weekly_df = weekly_df
+                # Filter by employee: the totals are grouped by employee, so an employee is a row range
+                weekly_employee_rows = get_employee_row_ranges((upload_key, 'weekly'), weekly_df)
+                selected_weekly_employee = st.selectbox("Selectați Angajatul", ['Toți'] + list(weekly_employee_rows), key="weekly_employee")
+                filtered_weekly_df = select_employee_rows(weekly_df, weekly_employee_rows, selected_weekly_employee)
+                filtered_rounded_weekly_df = select_employee_rows(rounded_weekly_df, weekly_employee_rows, selected_weekly_employee)
                 
                 # Display the DataFrame
                 if not filtered_weekly_df.empty:
                     # Create copy for display, dropping unwanted columns
-                    display_weekly_df = filtered_weekly_df.drop(columns=['Departament'])
-                    
-                    # Apply rounding if selected
-                    if rounding_percentage > 0:
-                        display_weekly_df['Ore Totale'] = display_weekly_df['Ore Totale'].apply(
-                            lambda x: round(x * (1 + rounding_percentage/100), 2) if x > 0 else x
-                        )
-                        # Recalculate difference
-                        display_weekly_df['Diferență'] = display_weekly_df['Ore Totale'] - display_weekly_df['Ore Standard']
-                    
-                    # Format the DataFrame for display
-                    def highlight_weekly_diff(row):
-                        if row['Diferență'] > 0:
-                            return ['background-color: #c6efce; color: #006100' if col == 'Diferență' else '' for col in row.index]
-                        elif row['Diferență'] < 0:
-                            return ['background-color: #ffc7ce; color: #9c0006' if col == 'Diferență' else '' for col in row.index]
-                        return [''] * len(row)
-                    
-                    styled_weekly_df = display_weekly_df.style.apply(highlight_weekly_diff, axis=1)
+                    display_weekly_df = filtered_rounded_weekly_df.drop(columns=['Departament'])
                     
-                    st.dataframe(styled_weekly_df, use_container_width=True)
+                    # Highlight differences, on the current page only
+                    show_table_page(display_weekly_df, "weekly_table")
                     
                     # Weekly metrics
                     week_total_hours = display_weekly_df['Ore Totale'].sum()
@@ -734,53 +509,27 @@ if uploaded_file is not None:
                         st.metric("Balanță", f"{week_diff:.2f}", 
                                delta=f"{(week_diff/week_standard_hours*100):.1f}%" if week_standard_hours > 0 else None)
                     
-                    # Download links
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown(get_download_link(filtered_weekly_df, "prezenta_saptamanala_original.csv", "📥 Descărcați Date Originale (CSV)"), unsafe_allow_html=True)
-                    with col2:
-                        st.markdown(get_excel_download_link(display_weekly_df, "prezenta_saptamanala_afisate.xlsx", "📥 Descărcați Date Afișate (Excel)"), unsafe_allow_html=True)
+                    # Downloads, built on demand
+                    show_download_buttons((upload_key, 'weekly', selected_weekly_employee, rounding_percentage),
+                                          filtered_weekly_df, display_weekly_df, "prezenta_saptamanala")
                 else:
                     st.info("Nu există date săptămânale de afișat pentru selecția curentă.")
 
             with tab3:
                 st.markdown("### Prezentare Lunară")
                 
-                # Filter by employee
-                if 'Angajat' in monthly_df.columns:
-                    monthly_employees = sorted(monthly_df['Angajat'].unique())
-                    selected_monthly_employee = st.selectbox("Selectați Angajatul", ['Toți'] + list(monthly_employees), key="monthly_employee")
-                    
-                    if selected_monthly_employee != 'Toți':
-                        filtered_monthly_df = monthly_df[monthly_df['Angajat'] == selected_monthly_employee]
-                    else:
-                        filtered_monthly_df = monthly_df
-                else:
-                    filtered_monthly_df = monthly_df
+                # Filter by employee: the totals are grouped by employee, so an employee is a row range
+                monthly_employee_rows = get_employee_row_ranges((upload_key, 'monthly'), monthly_df)
+                selected_monthly_employee = st.selectbox("Selectați Angajatul", ['Toți'] + list(monthly_employee_rows), key="monthly_employee")
+                filtered_monthly_df = select_employee_rows(monthly_df, monthly_employee_rows, selected_monthly_employee)
+                filtered_rounded_monthly_df = select_employee_rows(rounded_monthly_df, monthly_employee_rows, selected_monthly_employee)
                 
                 if not filtered_monthly_df.empty:
                     # Create copy for display, dropping unwanted columns
-                    display_monthly_df = filtered_monthly_df.drop(columns=['Departament'])
-                    
-                    # Apply rounding if selected
-                    if rounding_percentage > 0:
-                        display_monthly_df['Ore Totale'] = display_monthly_df['Ore Totale'].apply(
-                            lambda x: round(x * (1 + rounding_percentage/100), 2) if x > 0 else x
-                        )
-                        # Recalculate difference
-                        display_monthly_df['Diferență'] = display_monthly_df['Ore Totale'] - display_monthly_df['Ore Standard']
+                    display_monthly_df = filtered_rounded_monthly_df.drop(columns=['Departament'])
                     
-                    # Format the DataFrame for display
-                    def highlight_monthly_diff(row):
-                        if row['Diferență'] > 0:
-                            return ['background-color: #c6efce; color: #006100' if col == 'Diferență' else '' for col in row.index]
-                        elif row['Diferență'] < 0:
-                            return ['background-color: #ffc7ce; color: #9c0006' if col == 'Diferență' else '' for col in row.index]
-                        return [''] * len(row)
-                    
-                    styled_monthly_df = display_monthly_df.style.apply(highlight_monthly_diff, axis=1)
-                    
-                    st.dataframe(styled_monthly_df, use_container_width=True)
+                    # Highlight differences, on the current page only
+                    show_table_page(display_monthly_df, "monthly_table")
                     
                     # Calculate working days for the selected month-year combination
                     if 'Luna' in filtered_monthly_df.columns and 'An' in filtered_monthly_df.columns:
@@ -788,98 +537,63 @@ if uploaded_file is not None:
                         month_year_combinations = filtered_monthly_df[['Luna_Nume', 'Luna', 'An']].drop_duplicates()
                         
                         if not month_year_combinations.empty:
-                            # Format options for select box
-                            month_year_options = [f"{row['Luna_Nume']} {row['An']}" for _, row in month_year_combinations.iterrows()]
-                            selected_month_year = st.selectbox("Selectați Luna pentru Analiza Detaliată", month_year_options)
+                            # Options labelled with the month name, mapped to their year and month
+                            month_year_options = {f"{name} {year}": (int(year), int(month))
+                                                  for name, month, year in month_year_combinations.itertuples(index=False)}
+                            selected_month_year = st.selectbox("Selectați Luna pentru Analiza Detaliată", list(month_year_options))
+                            selected_year, month_num = month_year_options[selected_month_year]
                             
-                            # Parse selection to get month and year
-                            selected_month_name = selected_month_year.split(' ')[0]
-                            selected_year = int(selected_month_year.split(' ')[1])
+                            # Look up the month in the precomputed calendar metrics
+                            month_metrics = get_month_metrics(selected_year, month_num)
                             
-                            # Map month name to number
-                            month_map = {
-                                'January': 1, 'February': 2, 'March': 3, 'April': 4, 'May': 5, 'June': 6,
-                                'July': 7, 'August': 8, 'September': 9, 'October': 10, 'November': 11, 'December': 12
-                            }
+                            # Display month information
+                            col1, col2, col3, col4 = st.columns(4)
+                            with col1:
+                                st.metric("Zile în Lună", int(month_metrics['Zile în Lună']))
+                            with col2:
+                                st.metric("Zile Lucrătoare", int(month_metrics['Zile Lucrătoare']))
+                            with col3:
+                                st.metric("Ore Standard Totale", f"{month_metrics['Ore Standard']:.1f}")
+                            with col4:
+                                st.metric("Sărbători Legale", int(month_metrics['Sărbători Legale']))
                             
-                            if selected_month_name in month_map:
-                                month_num = month_map[selected_month_name]
-                                
-                                # Calculate working days and standard hours dynamically
-                                working_days = calculate_working_days(selected_year, month_num)
-                                standard_hours = calculate_standard_monthly_hours(selected_year, month_num)
-                                
-                                # First and last day of the month
-                                first_day = date(selected_year, month_num, 1)
-                                last_day = date(selected_year, month_num, calendar.monthrange(selected_year, month_num)[1])
+                            # Detailed employee information for the selected month
+                            month_data = display_monthly_df[
+                                (display_monthly_df['Luna'] == month_num) & 
+                                (display_monthly_df['An'] == selected_year)
+                            ]
+                            
+                            if not month_data.empty:
+                                total_month_hours = month_data['Ore Totale'].sum() 
+                                total_month_standard = month_data['Ore Standard'].sum()
                                 
-                                # Display month information
-                                col1, col2, col3, col4 = st.columns(4)
+                                # Calculate monthly metrics
+                                col1, col2, col3 = st.columns(3)
                                 with col1:
-                                    st.metric("Zile în Lună", calendar.monthrange(selected_year, month_num)[1])
+                                    st.metric("Total Ore Lucrate în Lună", f"{total_month_hours:.1f}")
                                 with col2:
-                                    st.metric("Zile Lucrătoare", working_days)
+                                    st.metric("Total Ore Standard în Lună", f"{total_month_standard:.1f}")
                                 with col3:
-                                    st.metric("Ore Standard Totale", f"{standard_hours:.1f}")
-                                with col4:
-                                    # Calculate holidays
-                                    holidays = get_holidays_for_year(selected_year)
-                                    holiday_count = sum(1 for h in holidays if h.startswith(f"{selected_year}-{month_num:02d}"))
-                                    st.metric("Sărbători Legale", holiday_count)
-                                
-                                # Detailed employee information for the selected month
-                                month_data = display_monthly_df[
-                                    (display_monthly_df['Luna'] == month_num) & 
-                                    (display_monthly_df['An'] == selected_year)
-                                ]
-                                
-                                if not month_data.empty:
-                                    total_month_hours = month_data['Ore Totale'].sum() 
-                                    total_month_standard = month_data['Ore Standard'].sum()
-                                    
-                                    # Calculate monthly metrics
-                                    col1, col2, col3 = st.columns(3)
-                                    with col1:
-                                        st.metric("Total Ore Lucrate în Lună", f"{total_month_hours:.1f}")
-                                    with col2:
-                                        st.metric("Total Ore Standard în Lună", f"{total_month_standard:.1f}")
-                                    with col3:
-                                        month_diff = total_month_hours - total_month_standard
-                                        st.metric("Balanță Lunară", f"{month_diff:.1f}", 
-                                               delta=f"{(month_diff/total_month_standard*100):.1f}%" if total_month_standard > 0 else None)
+                                    month_diff = total_month_hours - total_month_standard
+                                    st.metric("Balanță Lunară", f"{month_diff:.1f}", 
+                                           delta=f"{(month_diff/total_month_standard*100):.1f}%" if total_month_standard > 0 else None)
                     
-                    # Download links
-                    col1, col2 = st.columns(2)
-                    with col1:
-                        st.markdown(get_download_link(filtered_monthly_df, "prezenta_lunara_original.csv", "📥 Descărcați Date Originale (CSV)"), unsafe_allow_html=True)
-                    with col2:
-                        st.markdown(get_excel_download_link(display_monthly_df, "prezenta_lunara_afisate.xlsx", "📥 Descărcați Date Afișate (Excel)"), unsafe_allow_html=True)
+                    # Downloads, built on demand
+                    show_download_buttons((upload_key, 'monthly', selected_monthly_employee, rounding_percentage),
+                                          filtered_monthly_df, display_monthly_df, "prezenta_lunara")
                 else:
                     st.info("Nu există date lunare de afișat pentru selecția curentă.")
 
             with tab4:
                 st.markdown("### Vizualizări")
                 
-                if not daily_df.empty:
-                    # Filter by employee
-                    if 'Angajat' in daily_df.columns:
-                        viz_employees = sorted(daily_df['Angajat'].unique())
-                        selected_viz_employee = st.selectbox("Selectați Angajatul", ['Toți'] + list(viz_employees), key="viz_employee")
-                        
-                        if selected_viz_employee != 'Toți':
-                            filtered_viz_df = daily_df[daily_df['Angajat'] == selected_viz_employee]
-                        else:
-                            filtered_viz_df = daily_df
-                    else:
-                        filtered_viz_df = daily_df
-                    
-                    # Apply rounding for visualization if selected
-                    viz_df = filtered_viz_df.copy()
-                    if rounding_percentage > 0:
-                        viz_df['Durata (Ore)'] = viz_df.apply(
-                            lambda row: round(row['Durata (Ore)'] * (1 + rounding_percentage/100), 2) if row['Durata (Ore)'] > 0 else row['Durata (Ore)'],
-                            axis=1
-                        )
+                if tab4.open and not daily_df.empty:
+                    # plotly is only imported once the charts are shown
+                    import plotly.express as px
+
+                    # Filter by employee, with the row ranges of the daily tab
+                    selected_viz_employee = st.selectbox("Selectați Angajatul", ['Toți'] + list(employee_rows), key="viz_employee")
+                    viz_df = select_employee_rows(rounded_daily_df, employee_rows, selected_viz_employee)
                     
                     # Select visualization type
                     viz_type = st.selectbox(
@@ -891,8 +605,8 @@ if uploaded_file is not None:
                         if viz_type == "Ore Zilnice per Angajat":
                             # If filtering by employee, show day by day data
                             if selected_viz_employee != 'Toți':
-                                daily_emp_df = viz_df.groupby('Data')['Durata (Ore)'].sum().reset_index()
-                                daily_std_df = viz_df.groupby('Data')['Ore Standard'].sum().reset_index()
+                                daily_emp_df = viz_df.groupby('Data', observed=True)['Durata (Ore)'].sum().reset_index()
+                                daily_std_df = viz_df.groupby('Data', observed=True)['Ore Standard'].sum().reset_index()
                                 
                                 daily_merged = pd.merge(daily_emp_df, daily_std_df, on='Data')
                                 
@@ -913,14 +627,15 @@ if uploaded_file is not None:
                                     color_discrete_map={'Durata (Ore)': '#4CAF50', 'Ore Standard': '#2196F3'}
                                 )
                                 
-                                st.plotly_chart(fig, use_container_width=True)
+                                st.plotly_chart(fig, width="stretch")
                             else:
                                 # Group by employee and date
                                 pivot_df = viz_df.pivot_table(
                                     index='Data', 
                                     columns='Angajat', 
                                     values='Durata (Ore)',
-                                    aggfunc='sum'
+                                    aggfunc='sum',
+                                    observed=True
                                 ).fillna(0)
                                 
                                 # Sort pivot table by date if possible
@@ -942,24 +657,13 @@ if uploaded_file is not None:
                                     height=600
                                 )
                                 
-                                st.plotly_chart(fig, use_container_width=True)
+                                st.plotly_chart(fig, width="stretch")
                             
                         elif viz_type == "Comparație Săptămânală":
                             # Filter weekly df based on selected employee
-                            if selected_viz_employee != 'Toți':
-                                filtered_weekly_viz = weekly_df[weekly_df['Angajat'] == selected_viz_employee]
-                            else:
-                                filtered_weekly_viz = weekly_df
+                            weekly_viz_df = select_employee_rows(rounded_weekly_df, weekly_employee_rows, selected_viz_employee)
                             
-                            if not filtered_weekly_viz.empty:
-                                # Apply rounding if selected
-                                weekly_viz_df = filtered_weekly_viz.copy()
-                                if rounding_percentage > 0:
-                                    weekly_viz_df['Ore Totale'] = weekly_viz_df['Ore Totale'].apply(
-                                        lambda x: round(x * (1 + rounding_percentage/100), 2) if x > 0 else x
-                                    )
-                                    weekly_viz_df['Diferență'] = weekly_viz_df['Ore Totale'] - weekly_viz_df['Ore Standard']
-                                
+                            if not weekly_viz_df.empty:
                                 # Create comparison chart
                                 weekly_comp_fig = px.bar(
                                     weekly_viz_df,
@@ -972,7 +676,7 @@ if uploaded_file is not None:
                                     color_discrete_map={'Ore Totale': '#4CAF50', 'Ore Standard': '#2196F3'}
                                 )
                                 
-                                st.plotly_chart(weekly_comp_fig, use_container_width=True)
+                                st.plotly_chart(weekly_comp_fig, width="stretch")
                                 
                                 # Create difference chart
                                 weekly_diff_fig = px.bar(
@@ -988,18 +692,16 @@ if uploaded_file is not None:
                                 
                                 weekly_diff_fig.add_hline(y=0, line_width=2, line_dash="dash", line_color="gray")
                                 
-                                st.plotly_chart(weekly_diff_fig, use_container_width=True)
+                                st.plotly_chart(weekly_diff_fig, width="stretch")
                             else:
                                 st.warning("Nu există date săptămânale pentru vizualizare.")
                             
                         elif viz_type == "Distribuția Orelor de Sosire":
-                            # Convert time strings to numeric for visualization
+                            # Convert entry minutes to fractional hours for visualization
                             arrival_df = viz_df.copy()
-                            arrival_df['Ora Sosire (Numeric)'] = arrival_df['Ora Sosire'].apply(
-                                lambda x: int(x.split(':')[0]) + int(x.split(':')[1])/60 if isinstance(x, str) and ':' in x else None
-                            )
+                            arrival_df['Ora Sosire (Numeric)'] = arrival_df['Minut Sosire'].to_numpy(dtype=float, na_value=np.nan) / 60
                             
-                            # Filter out None values
+                            # Filter out absent days
                             arrival_df = arrival_df.dropna(subset=['Ora Sosire (Numeric)'])
                             
                             if not arrival_df.empty:
@@ -1030,18 +732,25 @@ if uploaded_file is not None:
                                 # Add reference line for standard start time (8:30 AM)
                                 arrival_fig.add_vline(x=8.5, line_width=2, line_dash="dash", line_color="red", annotation_text="Ora Standard de Început (8:30)")
                                 
-                                st.plotly_chart(arrival_fig, use_container_width=True)
+                                st.plotly_chart(arrival_fig, width="stretch")
+                                
+                                # Lateness against the standard start time, in minutes
+                                lateness = arrival_df['Minut Sosire'].to_numpy(dtype=float) - STANDARD_START_MINUTE
+                                late_arrivals = lateness > 0
+                                col1, col2 = st.columns(2)
+                                with col1:
+                                    st.metric("Sosiri după 8:30", f"{late_arrivals.sum()} ({late_arrivals.mean() * 100:.1f}%)")
+                                with col2:
+                                    st.metric("Întârziere Medie (min)", f"{lateness[late_arrivals].mean():.0f}" if late_arrivals.any() else "0")
                             else:
                                 st.warning("Nu există date de sosire pentru vizualizare.")
                             
                         elif viz_type == "Distribuția Orelor de Plecare":
-                            # Convert time strings to numeric for visualization
+                            # Convert exit minutes to fractional hours for visualization
                             departure_df = viz_df.copy()
-                            departure_df['Ora Plecare (Numeric)'] = departure_df['Ora Plecare'].apply(
-                                lambda x: int(x.split(':')[0]) + int(x.split(':')[1])/60 if isinstance(x, str) and ':' in x else None
-                            )
+                            departure_df['Ora Plecare (Numeric)'] = departure_df['Minut Plecare'].to_numpy(dtype=float, na_value=np.nan) / 60
                             
-                            # Filter out None values
+                            # Filter out absent days
                             departure_df = departure_df.dropna(subset=['Ora Plecare (Numeric)'])
                             
                             if not departure_df.empty:
@@ -1073,7 +782,7 @@ if uploaded_file is not None:
                                 departure_fig.add_vline(x=17, line_width=2, line_dash="dash", line_color="red", annotation_text="Sfârșit Luni-Joi (17:00)")
                                 departure_fig.add_vline(x=14.5, line_width=2, line_dash="dash", line_color="orange", annotation_text="Sfârșit Vineri (14:30)")
                                 
-                                st.plotly_chart(departure_fig, use_container_width=True)
+                                st.plotly_chart(departure_fig, width="stretch")
                             else:
                                 st.warning("Nu există date de plecare pentru vizualizare.")
                                 
@@ -1098,7 +807,8 @@ if uploaded_file is not None:
                                     pivot_presence = presence_df.pivot_table(
                                         index='Data',
                                         values='Durata (Ore)',
-                                        aggfunc='sum'
+                                        aggfunc='sum',
+                                        observed=True
                                     ).fillna(0)
                                     
                                     # Create heatmap
@@ -1115,7 +825,8 @@ if uploaded_file is not None:
                                         index='Angajat',
                                         columns='Data',
                                         values='Durata (Ore)',
-                                        aggfunc='sum'
+                                        aggfunc='sum',
+                                        observed=True
                                     ).fillna(0)
                                     
                                     # Create heatmap
@@ -1127,18 +838,18 @@ if uploaded_file is not None:
                                         height=400
                                     )
                                 
-                                st.plotly_chart(presence_heatmap, use_container_width=True)
+                                st.plotly_chart(presence_heatmap, width="stretch")
                                 
                                 # Create bar chart for daily presence
                                 try:
                                     if selected_viz_employee != 'Toți':
                                         # For single employee
-                                        daily_presence = presence_df.groupby('Data')['Durata (Ore)'].sum().reset_index()
-                                        daily_std = presence_df.groupby('Data')['Ore Standard'].sum().reset_index()
+                                        daily_presence = presence_df.groupby('Data', observed=True)['Durata (Ore)'].sum().reset_index()
+                                        daily_std = presence_df.groupby('Data', observed=True)['Ore Standard'].sum().reset_index()
                                     else:
                                         # For all employees
-                                        daily_presence = viz_df.groupby('Data')['Durata (Ore)'].sum().reset_index()
-                                        daily_std = viz_df.groupby('Data')['Ore Standard'].sum().reset_index()
+                                        daily_presence = viz_df.groupby('Data', observed=True)['Durata (Ore)'].sum().reset_index()
+                                        daily_std = viz_df.groupby('Data', observed=True)['Ore Standard'].sum().reset_index()
                                     
                                     daily_combined = pd.merge(daily_presence, daily_std, on='Data', suffixes=('_Actual', '_Standard'))
                                     
@@ -1164,7 +875,7 @@ if uploaded_file is not None:
                                             color_discrete_map={'Durata (Ore)_Actual': '#4CAF50', 'Ore Standard_Standard': '#2196F3'}
                                         )
                                         
-                                        st.plotly_chart(daily_bar, use_container_width=True)
+                                        st.plotly_chart(daily_bar, width="stretch")
                                     else:
                                         st.warning("⚠️ Nu există suficiente date valide pentru generarea graficului zilnic.")
                                 except Exception as e:
@@ -1172,8 +883,57 @@ if uploaded_file is not None:
                     except Exception as e:
                         st.error(f"Eroare la generarea vizualizărilor: {e}")
                         st.exception(e)
-                else:
+                elif daily_df.empty:
                     st.info("Încărcați date pentru a vizualiza grafice.")
+
+            with tab5:
+                st.markdown("### Analiză pe Departamente")
+
+                if tab5.open:
+                    # Department, employee, week and month totals, built once; the drill-down only selects rows
+                    cube = get_attendance_cube(upload_key, rounding_percentage, rounded_daily_df)
+                    cube_period_label = st.radio("Perioadă", list(CUBE_PERIOD_LABELS), horizontal=True, key="cube_period")
+                    cube_period = CUBE_PERIOD_LABELS[cube_period_label]
+
+                    company_totals = drill_down(cube, 'company', 'total').iloc[0]
+                    department_totals = drill_down(cube, 'department', 'total')
+                    col1, col2, col3, col4 = st.columns(4)
+                    with col1:
+                        st.metric("Departamente", len(department_totals))
+                    with col2:
+                        st.metric("Angajați", int(company_totals['Angajați']))
+                    with col3:
+                        st.metric("Rată Absență", f"{company_totals['Rată Absență (%)']:.1f}%")
+                    with col4:
+                        st.metric("Ore Suplimentare", f"{company_totals['Ore Suplimentare']:.2f}")
+
+                    selected_department = st.selectbox("Selectați Departamentul",
+                                                       ['Toate'] + department_totals['Departament'].astype(str).tolist(),
+                                                       key="cube_department")
+                    if selected_department == 'Toate':
+                        show_table_page(format_cube_level(drill_down(cube, 'department', cube_period)),
+                                        "cube_department_table")
+                    else:
+                        if cube_period != 'total':
+                            show_table_page(format_cube_level(drill_down(cube, 'department', cube_period,
+                                                                         selected_department)),
+                                            "cube_department_periods_table")
+
+                        st.markdown(f"#### Angajații din {selected_department}")
+                        show_table_page(format_cube_level(drill_down(cube, 'employee', cube_period, selected_department)),
+                                        "cube_employee_table")
+
+                        department_employees = drill_down(cube, 'employee', 'total', selected_department)['Angajat']
+                        selected_cube_employee = st.selectbox("Selectați Angajatul",
+                                                              ['Toți'] + department_employees.astype(str).tolist(),
+                                                              key=f"cube_employee_{selected_department}")
+                        if selected_cube_employee != 'Toți':
+                            # The days of the employee, by its row range in the daily records
+                            employee_days = select_employee_rows(rounded_daily_df, employee_rows, selected_cube_employee)
+                            employee_days = employee_days[employee_days['Departament'] == selected_department]
+                            st.markdown(f"#### Înregistrări Zilnice: {selected_cube_employee}")
+                            show_table_page(employee_days.drop(columns=['Departament', 'ID Legitimație']),
+                                            "cube_day_table", DAILY_PAGE_SIZES)
     except Exception as e:
         st.error(f"A apărut o eroare: {e}")
         st.exception(e)
@@ -1202,11 +962,104 @@ else:
     - **Comparație cu Programul Standard**: Compară orele efective cu programul standard de lucru
     - **Analiză Completă**: Vizualizează rapoarte de prezență zilnice, săptămânale și lunare
     - **Informații Vizuale**: Vizualizează modele de prezență cu grafice interactive
+    - **Analiză pe Departamente**: Totaluri, rata absențelor și orele suplimentare pe departamente, cu detalii pe angajați și zile
     - **Funcționalitate de Export**: Descarcă datele procesate în formate CSV sau Excel
     - **Păstrarea Istoricului**: Aplicația păstrează datele încărcate anterior și actualizează doar înregistrările noi
     - **Calculul Zilelor Lucrătoare**: Aplicația calculează automat numărul de zile lucrătoare pentru fiecare lună
     """)
 
+# History analytics over any date interval, answered from the stored rollups instead of the daily rows
+if history_count or uploaded_files:
+    st.markdown("---")
+    if st.toggle("📚 Analiza istoricului", key="show_history_analytics"):
+        history_bounds = get_history_bounds()
+        if history_bounds is None:
+            st.info("Istoricul nu conține încă date.")
+        else:
+            st.markdown("### Analiza Istoricului")
+            range_column, scope_column = st.columns([2, 1])
+            with range_column:
+                history_range = st.date_input("Interval", value=history_bounds, min_value=history_bounds[0],
+                                              max_value=history_bounds[1], format="DD.MM.YYYY", key="history_range")
+            with scope_column:
+                history_scope = st.radio("Grupare", ['Angajat', 'Departament'], horizontal=True, key="history_scope")
+            entity_label = "Angajatul" if history_scope == 'Angajat' else "Departamentul"
+
+            if len(history_range) != 2:
+                st.info("Selectați și ultima zi a intervalului.")
+            else:
+                history_start, history_end = history_range
+                totals_tab, trend_tab, year_tab = st.tabs(["Totaluri pe Interval", "Tendințe", "Comparație An la An"],
+                                                          key="history_tabs", on_change="rerun")
+
+                with totals_tab:
+                    if totals_tab.open:
+                        totals_df, plan = load_history_totals(history_start, history_end, history_scope)
+                        if totals_df.empty:
+                            st.info("Nu există date în istoric pentru intervalul selectat.")
+                        else:
+                            show_table_page(totals_df.round(2), "history_totals_table")
+                            st.caption(f"Calculat din {plan['years']} ani și {plan['months']} luni întregi din "
+                                       f"totalurile stocate și din {plan['days']} zile din înregistrările zilnice.")
+
+                with trend_tab:
+                    if trend_tab.open:
+                        level_label = st.selectbox("Nivel", list(HISTORY_TREND_LEVELS), index=1,
+                                                   key="history_trend_level")
+                        history_entities = load_history_entities(history_start, history_end, history_scope)
+                        selected_trend = st.selectbox(f"Selectați {entity_label}", ['Toți'] + history_entities,
+                                                      key=f"history_trend_{history_scope}")
+                        # Only the rows of the selected employee or department are read from the store
+                        trend_entity = None if selected_trend == 'Toți' else selected_trend
+                        trend_df = load_history_trend(HISTORY_TREND_LEVELS[level_label], history_start, history_end,
+                                                      history_scope, trend_entity)
+                        if trend_df.empty:
+                            st.info("Nu există date în istoric pentru intervalul selectat.")
+                        else:
+                            # plotly is only imported once the charts are shown
+                            import plotly.express as px
+
+                            if history_scope == 'Angajat' and selected_trend == 'Toți':
+                                # All employees together, as one total line against the standard hours
+                                chart_df = trend_df.groupby(['Început', 'Perioadă'], as_index=False)[
+                                    ['Ore Totale', 'Ore Standard']].sum()
+                                trend_fig = px.line(chart_df, x='Început', y=['Ore Totale', 'Ore Standard'],
+                                                    markers=True, hover_data=['Perioadă'],
+                                                    labels={'Început': 'Perioadă', 'value': 'Ore', 'variable': ''})
+                            else:
+                                trend_fig = px.line(trend_df, x='Început', y='Ore Totale', color=history_scope,
+                                                    markers=True, hover_data=['Perioadă'],
+                                                    labels={'Început': 'Perioadă'})
+                            st.plotly_chart(trend_fig, width="stretch")
+                            show_table_page(trend_df.drop(columns=['Început', 'Sfârșit']).round(2),
+                                            "history_trend_table")
+
+                with year_tab:
+                    if year_tab.open:
+                        history_entities = load_history_entities(history_start, history_end, history_scope)
+                        selected_year_entity = st.selectbox(f"Selectați {entity_label}", ['Toți'] + history_entities,
+                                                            key=f"history_year_{history_scope}")
+                        year_df = load_history_trend('monthly', history_start, history_end, history_scope,
+                                                     None if selected_year_entity == 'Toți' else selected_year_entity)
+                        if year_df.empty:
+                            st.info("Nu există date în istoric pentru intervalul selectat.")
+                        else:
+                            # One bar per year for each month
+                            month_df = year_df.groupby(['An', 'Luna'], as_index=False)['Ore Totale'].sum()
+                            month_df['Luna_Nume'] = [ROMANIAN_MONTH_NAMES[month - 1] for month in month_df['Luna']]
+                            month_df['An'] = month_df['An'].astype(str)
+
+                            import plotly.express as px
+
+                            year_fig = px.bar(month_df, x='Luna_Nume', y='Ore Totale', color='An', barmode='group',
+                                              category_orders={'Luna_Nume': list(ROMANIAN_MONTH_NAMES)},
+                                              labels={'Luna_Nume': 'Luna'})
+                            st.plotly_chart(year_fig, width="stretch")
+
+                            year_table = month_df.pivot(index='Luna', columns='An', values='Ore Totale')
+                            year_table.index = [ROMANIAN_MONTH_NAMES[month - 1] for month in year_table.index]
+                            st.dataframe(year_table.round(2), width="stretch")
+
 # Footer
 st.markdown("---")
 st.markdown("### 📋 Ore Standard de Lucru")
@@ -1240,50 +1093,15 @@ with st.expander("📅 Sărbători Legale"):
         # Determine which years to show based on data and current year
         years_to_show = [datetime.now().year, datetime.now().year + 1]
         
-        all_holidays = {}
-        for year in years_to_show:
-            holidays = get_holidays_for_year(year)
-            all_holidays[year] = holidays
-        
         # Create tabs for each year
         year_tabs = st.tabs([str(year) for year in years_to_show])
         
         for i, year in enumerate(years_to_show):
             with year_tabs[i]:
-                if year in all_holidays and all_holidays[year]:
-                    # Generate descriptions based on dates
-                    descriptions = []
-                    for holiday_date in all_holidays[year]:
-                        month_day = holiday_date[5:]  # Gets MM-DD
-                        
-                        # Map common Romanian holidays
-                        if month_day == "01-01":
-                            descriptions.append("Anul Nou")
-                        elif month_day == "01-02":
-                            descriptions.append("A doua zi după Anul Nou")
-                        elif month_day == "01-24":
-                            descriptions.append("Ziua Unirii Principatelor Române")
-                        elif month_day == "05-01":
-                            descriptions.append("Ziua Muncii")
-                        elif month_day == "08-15":
-                            descriptions.append("Adormirea Maicii Domnului")
-                        elif month_day == "11-30":
-                            descriptions.append("Sfântul Andrei")
-                        elif month_day == "12-01":
-                            descriptions.append("Ziua Națională a României")
-                        elif month_day == "12-25":
-                            descriptions.append("Crăciunul")
-                        elif month_day == "12-26":
-                            descriptions.append("A doua zi de Crăciun")
-                        else:
-                            descriptions.append("Sărbătoare legală")
-                    
-                    holidays_df = pd.DataFrame({
-                        "Data": all_holidays[year],
-                        "Descriere": descriptions
-                    })
-                    
-                    st.dataframe(holidays_df, use_container_width=True)
+                holidays_df = get_holidays_frame([year])
+                if not holidays_df.empty:
+                    holidays_df['Data'] = holidays_df['Data'].dt.strftime('%Y-%m-%d')
+                    st.dataframe(holidays_df, width="stretch")
                 else:
                     st.info(f"Nu există informații despre sărbătorile legale pentru anul {year}")
     except Exception as e:
@@ -0,0 +1,273 @@
+"""Batch processing of many attendance reports (files or workbook sheets) in a process pool, with a CLI for nightly runs:
+
+    python -m attendance_batch process in/*.csv in/*.xlsx --out out/ [--format parquet] [--workers N]
+
+The app runs its pool in a separate worker process ('python -m attendance_batch worker').
+"""
+import argparse
+import io
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from typing import NamedTuple, Optional, Union
+
+import pandas as pd
+
+from attendance_core import (apply_daily_schema, calculate_monthly_summary, calculate_weekly_summary, format_clock_columns,
+                             process_attendance_data, read_report_lines, timed_stage)
+from card_report_parser import get_workbook_sheet_names
+from excel_export import report_sheets, write_workbook
+from history_store import HISTORY_KEY_COLUMNS
+
+
+# One report to process: a file (its content as bytes, or its path) and optionally one of its sheets
+class BatchSource(NamedTuple):
+    file_name: str
+    content: Union[bytes, str]
+    sheet_name: Optional[str] = None
+
+
+# Function to list the sources of a file: every sheet of a workbook, or the file itself
+def list_sources(file_name, content, all_sheets=True):
+    if not (all_sheets and file_name.endswith('.xlsx')):
+        return [BatchSource(file_name, content)]
+    try:
+        sheet_names = get_workbook_sheet_names(io.BytesIO(content) if isinstance(content, bytes) else content)
+    except Exception:
+        # Unreadable workbook: processing it reports the error along with the other sources
+        return [BatchSource(file_name, content)]
+    return [BatchSource(file_name, content, sheet_name) for sheet_name in sheet_names]
+
+
+# Function to name a source in progress and error messages
+def source_label(source):
+    file_name = os.path.basename(source.file_name)
+    return f"{file_name} [{source.sheet_name}]" if source.sheet_name else file_name
+
+
+# Function to process a single source, with the seconds spent in each stage; runs in a worker process
+def process_source(source):
+    timings = {}
+    with timed_stage(timings, 'read'):
+        file_content = read_report_lines(source.file_name, source.content, source.sheet_name)
+    return process_attendance_data(file_content, timings), timings
+
+
+# Function to merge the daily frames of several reports and recompute the weekly and monthly totals
+def merge_results(daily_frames):
+    daily_frames = [daily_df for daily_df in daily_frames if not daily_df.empty]
+    if not daily_frames:
+        return pd.DataFrame(), pd.DataFrame(), pd.DataFrame(), "N/A", datetime.now().year
+
+    # Reports may overlap: for the same employee, badge and day a day with entry/exit times wins over an absence
+    # (which may only be a day the other report backfilled), then the later source wins
+    daily_df = apply_daily_schema(pd.concat(daily_frames, ignore_index=True))
+    punched = daily_df['Minut Sosire'].notna() | daily_df['Minut Plecare'].notna()
+    daily_df = daily_df.iloc[punched.argsort(kind='stable')]
+    dated = daily_df['Data_Obiect'].notna()
+    daily_df = daily_df[~(daily_df.duplicated(list(HISTORY_KEY_COLUMNS), keep='last') & dated)]
+    daily_df = daily_df.sort_values(['Angajat', 'Data_Obiect']).reset_index(drop=True)
+
+    # Weeks and months can span several reports, so the totals are computed on the merged days
+    weekly_df = calculate_weekly_summary(daily_df)
+    monthly_df = calculate_monthly_summary(daily_df)
+
+    dates = pd.to_datetime(daily_df['Data_Obiect']).dropna()
+    if dates.empty:
+        return daily_df, weekly_df, monthly_df, "N/A", datetime.now().year
+    date_range = f"{dates.min().strftime('%d %B %Y')} - {dates.max().strftime('%d %B %Y')}"
+    return daily_df, weekly_df, monthly_df, date_range, dates.min().year
+
+
+# Function to pick how pool processes start: forked where possible, so they start at once with everything imported.
+# Only the CLI and the batch worker process run a pool, and neither runs other threads
+def get_worker_context():
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context('spawn')
+
+
+# Function to get the number of pool processes for a batch
+def worker_count(sources, max_workers=None):
+    return min(max_workers or os.cpu_count() or 1, len(sources))
+
+
+# Function to process many sources in a process pool, reporting progress as each one finishes; the stage timings
+# of all sources (summed over the workers) are added to the given dict. The pool is started from the calling
+# process, so a process running threads (the Streamlit server) uses process_batch_in_worker instead
+def process_batch(sources, max_workers=None, progress_callback=None, timings=None):
+    results = [None] * len(sources)
+    errors = []
+
+    def record(index, run):
+        try:
+            results[index], source_timings = run()
+        except Exception as e:
+            errors.append((source_label(sources[index]), e))
+            return
+        if timings is not None:
+            for stage, seconds in source_timings.items():
+                timings[stage] = timings.get(stage, 0.0) + seconds
+
+    max_workers = worker_count(sources, max_workers)
+    if max_workers <= 1:
+        # A single report or a single core: not worth starting worker processes
+        for index, source in enumerate(sources):
+            record(index, lambda: process_source(source))
+            if progress_callback:
+                progress_callback(index + 1, len(sources), source_label(source))
+    else:
+        with ProcessPoolExecutor(max_workers, mp_context=get_worker_context()) as executor:
+            futures = {executor.submit(process_source, source): index for index, source in enumerate(sources)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                record(index, future.result)
+                if progress_callback:
+                    progress_callback(done, len(sources), source_label(sources[index]))
+
+    # Merge in the order of the sources, not of completion
+    daily_frames = [result[0] for result in results if result is not None]
+    with timed_stage(timings, 'merge'):
+        merged = merge_results(daily_frames)
+    return merged, errors
+
+
+# Function to process many sources like process_batch, from a process that runs threads: the pool runs in a
+# separate worker process started as 'python -m attendance_batch worker', which gets the sources and sends back the
+# progress and the results through its stdin and stdout. Spawned pool processes would instead re-import the
+# caller's __main__ (for Streamlit, the whole app script). A batch with a single worker runs in the calling process
+def process_batch_in_worker(sources, max_workers=None, progress_callback=None):
+    max_workers = worker_count(sources, max_workers)
+    if max_workers <= 1:
+        return process_batch(sources, max_workers, progress_callback)
+
+    module_dir = os.path.dirname(os.path.abspath(__file__))
+    python_path = os.pathsep.join(filter(None, [module_dir, os.environ.get('PYTHONPATH')]))
+    environment = dict(os.environ, PYTHONPATH=python_path)
+    command = [sys.executable, '-m', 'attendance_batch', 'worker', '--workers', str(max_workers)]
+    with subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, env=environment) as worker:
+        pickle.dump(list(sources), worker.stdin)
+        worker.stdin.close()
+        result = None
+        try:
+            while result is None:
+                kind, payload = pickle.load(worker.stdout)
+                if kind == 'result':
+                    result = payload
+                elif progress_callback:
+                    progress_callback(*payload)
+        except EOFError:
+            pass
+    if result is None:
+        raise RuntimeError(f"Procesul de procesare în lot s-a oprit (cod {worker.returncode})")
+    return result
+
+
+# Output formats of the CLI: CSV with 'HH:MM' entry/exit like the app downloads, Parquet keeping the minutes,
+# or one XLSX workbook with a sheet per table plus the holidays
+OUTPUT_FORMATS = ('csv', 'parquet', 'xlsx')
+
+
+# Function to write the daily, weekly and monthly results to a directory
+def write_results(out_dir, daily_df, weekly_df, monthly_df, output_format='csv'):
+    os.makedirs(out_dir, exist_ok=True)
+    if output_format == 'xlsx':
+        path = os.path.join(out_dir, 'raport_prezenta.xlsx')
+        write_workbook(path, report_sheets(daily_df, weekly_df, monthly_df))
+        return [path]
+
+    if output_format == 'csv':
+        daily_df = format_clock_columns(daily_df)
+    outputs = {'prezenta_zilnica': daily_df, 'sumar_saptamanal': weekly_df, 'sumar_lunar': monthly_df}
+
+    paths = []
+    for name, df in outputs.items():
+        path = os.path.join(out_dir, f"{name}.{output_format}")
+        if output_format == 'parquet':
+            df.to_parquet(path, index=False)
+        else:
+            df.to_csv(path, index=False)
+        paths.append(path)
+    return paths
+
+
+# Function to run the 'process' command: process the reports, write the results and report the stage timings
+def run_process(args):
+    timings = {}
+    started = time.perf_counter()
+
+    with timed_stage(timings, 'list'):
+        sources = [source for path in args.inputs
+                   for source in list_sources(path, path, all_sheets=not args.first_sheet_only)]
+
+    def report_progress(done, total, label):
+        if not args.quiet:
+            print(f"[{done}/{total}] {label}", file=sys.stderr)
+
+    (daily_df, weekly_df, monthly_df, date_range, _), errors = process_batch(
+        sources, args.workers, report_progress, timings
+    )
+    for label, error in errors:
+        print(f"Eroare la procesarea {label}: {error}", file=sys.stderr)
+
+    with timed_stage(timings, 'write'):
+        paths = write_results(args.out, daily_df, weekly_df, monthly_df, args.format)
+    for path in paths:
+        print(path)
+
+    # Per-source stages are summed over all sources, so with several workers they can exceed the wall time
+    print(f"{len(sources)} rapoarte, {len(daily_df)} înregistrări zilnice, interval: {date_range}", file=sys.stderr)
+    for stage, seconds in timings.items():
+        print(f"  {stage:<10} {seconds:8.3f} s", file=sys.stderr)
+    print(f"  {'total':<10} {time.perf_counter() - started:8.3f} s", file=sys.stderr)
+    return 1 if errors else 0
+
+
+# Function to run the 'worker' command for process_batch_in_worker: read the sources from stdin, then write the
+# progress messages and the results to stdout
+def run_worker(args):
+    channel = sys.stdout.buffer
+    # Nothing else may write to the channel
+    sys.stdout = sys.stderr
+    sources = pickle.load(sys.stdin.buffer)
+
+    def report_progress(done, total, label):
+        pickle.dump(('progress', (done, total, label)), channel)
+        channel.flush()
+
+    pickle.dump(('result', process_batch(sources, args.workers, report_progress)), channel)
+    channel.flush()
+    return 0
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(prog='python -m attendance_batch',
+                                         description="Procesarea rapoartelor de prezență fără interfața Streamlit.")
+    commands = arg_parser.add_subparsers(dest='command', required=True)
+
+    process_parser = commands.add_parser('process', help="procesează rapoartele (.csv sau .xlsx) și scrie sumarele")
+    process_parser.add_argument('inputs', nargs='+', help="fișierele de procesat")
+    process_parser.add_argument('--out', required=True, help="directorul pentru rezultate")
+    process_parser.add_argument('--format', choices=OUTPUT_FORMATS, default='csv', help="formatul rezultatelor")
+    process_parser.add_argument('--workers', type=int, default=None,
+                                help="numărul de procese (implicit: nucleele CPU)")
+    process_parser.add_argument('--first-sheet-only', action='store_true',
+                                help="doar prima foaie din fiecare registru Excel")
+    process_parser.add_argument('--quiet', action='store_true', help="fără mesaje de progres")
+    process_parser.set_defaults(run=run_process)
+
+    worker_parser = commands.add_parser('worker', help="procesează un lot trimis de aplicație (intern)")
+    worker_parser.add_argument('--workers', type=int, default=None, help="numărul de procese")
+    worker_parser.set_defaults(run=run_worker)
+
+    args = arg_parser.parse_args(argv)
+    return args.run(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
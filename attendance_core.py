@@ -0,0 +1,396 @@
+"""Attendance report processing core: holiday calendar, daily frame, backfill and summaries, without Streamlit."""
+import io
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from card_report_parser import CardReportParser, CardRecord, iter_workbook_lines
+
+# Romanian legal holidays with a fixed date (month, day)
+ROMANIAN_FIXED_HOLIDAYS = [
+    (1, 1), (1, 2), (1, 24), (5, 1), (8, 15),
+    (11, 30), (12, 1), (12, 25), (12, 26)
+]
+
+# Names of the fixed-date holidays; the ones that move with Easter are shown as 'Sărbătoare legală'
+ROMANIAN_HOLIDAY_NAMES = {
+    (1, 1): "Anul Nou",
+    (1, 2): "A doua zi după Anul Nou",
+    (1, 24): "Ziua Unirii Principatelor Române",
+    (5, 1): "Ziua Muncii",
+    (8, 15): "Adormirea Maicii Domnului",
+    (11, 30): "Sfântul Andrei",
+    (12, 1): "Ziua Națională a României",
+    (12, 25): "Crăciunul",
+    (12, 26): "A doua zi de Crăciun"
+}
+
+# Romanian legal holidays that move with Orthodox Easter (offset in days):
+# Good Friday, Easter Sunday, Easter Monday, Pentecost Sunday and Monday
+ROMANIAN_EASTER_OFFSETS = [-2, 0, 1, 49, 50]
+
+# Function to compute the Orthodox Easter Sunday (Gregorian date) for a year
+def calculate_orthodox_easter(year):
+    # Meeus Julian algorithm, converted to the Gregorian calendar
+    a = year % 4
+    b = year % 7
+    c = year % 19
+    d = (19 * c + 15) % 30
+    e = (2 * a + 4 * b - d + 34) % 7
+    month = (d + e + 114) // 31
+    day = (d + e + 114) % 31 + 1
+    julian_offset = year // 100 - year // 400 - 2
+    return date(year, month, day) + timedelta(days=julian_offset)
+
+# Holiday calendar for a single year, built once and reused for every lookup: the dates, and the same days as a
+# sorted datetime64 array for the vectorized mask and the np.busday_count month metrics
+class HolidayCalendar:
+    def __init__(self, year):
+        easter = calculate_orthodox_easter(year)
+        holidays = [date(year, month, day) for month, day in ROMANIAN_FIXED_HOLIDAYS]
+        holidays += [easter + timedelta(days=offset) for offset in ROMANIAN_EASTER_OFFSETS]
+
+        self.year = year
+        self.dates = sorted(set(holidays))
+        self.days = np.array(self.dates, dtype='datetime64[D]')
+
+# Function to get the (memoized) holiday calendar for a specific year
+@lru_cache(maxsize=None)
+def get_holiday_calendar(year):
+    return HolidayCalendar(int(year))
+
+# Function to list the holidays of some years with their description
+def get_holidays_frame(years):
+    holidays = [holiday for year in years for holiday in get_holiday_calendar(year).dates]
+    return pd.DataFrame({
+        'Data': pd.to_datetime(holidays),
+        'Descriere': [ROMANIAN_HOLIDAY_NAMES.get((holiday.month, holiday.day), "Sărbătoare legală")
+                      for holiday in holidays]
+    })
+
+# Function to flag the holidays in a whole array of dates
+def holiday_mask(dates):
+    days = pd.DatetimeIndex(dates).values.astype('datetime64[D]')
+    valid_days = days[~np.isnat(days)]
+    if len(valid_days) == 0:
+        return np.zeros(len(days), dtype=bool)
+
+    years = np.unique(valid_days.astype('datetime64[Y]').astype(int) + 1970)
+    holidays = np.concatenate([get_holiday_calendar(year).days for year in years])
+    return np.isin(days, holidays)
+
+# Standard hours for each weekday (Monday to Sunday)
+WEEKDAY_NAMES = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+WEEKDAY_STANDARD_HOURS = [8.5, 8.5, 8.5, 8.5, 6.0, 0.0, 0.0]
+STANDARD_HOURS_BY_WEEKDAY = dict(zip(WEEKDAY_NAMES, WEEKDAY_STANDARD_HOURS))
+
+# Standard start of the working day, in minutes since midnight (08:30)
+STANDARD_START_MINUTE = 8 * 60 + 30
+
+# Columns holding entry/exit as minutes since midnight, with the 'HH:MM' columns shown in their place
+CLOCK_COLUMNS = {'Minut Sosire': 'Ora Sosire', 'Minut Plecare': 'Ora Plecare'}
+
+# Romanian month names by month number, independent of the server locale
+ROMANIAN_MONTH_NAMES = ['Ianuarie', 'Februarie', 'Martie', 'Aprilie', 'Mai', 'Iunie', 'Iulie', 'August',
+                        'Septembrie', 'Octombrie', 'Noiembrie', 'Decembrie']
+
+# English month abbreviations of the weekly interval labels, like the day labels of the report
+MONTH_ABBREVIATIONS = np.array(['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec'])
+
+# Compact column types of the daily frame: the texts repeated on every row are categoricals, the minutes and
+# calendar parts small nullable integers (undated rows have none); hours stay float64, since they are summed into
+# totals and written to the history and the exports
+DAILY_CATEGORY_COLUMNS = ['Angajat', 'Departament', 'ID Legitimație', 'Zi', 'Data', 'Luna_Nume']
+DAILY_INTEGER_COLUMNS = {'Minut Sosire': 'Int16', 'Minut Plecare': 'Int16', 'An': 'Int16', 'Luna': 'Int8',
+                         'Săptămână': 'Int8'}
+
+# Function to build the calendar metrics of every month in a range of years, keyed by (An, Luna)
+@lru_cache(maxsize=None)
+def calculate_month_metrics(first_year, last_year):
+    months = np.arange(np.datetime64(f"{first_year:04d}-01", 'M'), np.datetime64(f"{last_year + 1:04d}-01", 'M'))
+    month_starts = months.astype('datetime64[D]')
+    month_ends = (months + 1).astype('datetime64[D]')
+    holidays = np.concatenate([get_holiday_calendar(year).days for year in range(first_year, last_year + 1)])
+
+    metrics = pd.DataFrame({
+        'An': months.astype('datetime64[Y]').astype(int) + 1970,
+        'Luna': months.astype(int) % 12 + 1,
+        'Zile în Lună': (month_ends - month_starts).astype(int),
+        'Zile Lucrătoare': np.busday_count(month_starts, month_ends, weekmask='1111100', holidays=holidays),
+        'Sărbători Legale': np.searchsorted(holidays, month_ends) - np.searchsorted(holidays, month_starts)
+    })
+
+    # Standard hours contributed by each working weekday, skipping holidays
+    weekday_columns = []
+    for weekday, hours in enumerate(WEEKDAY_STANDARD_HOURS[:5]):
+        weekmask = ''.join('1' if i == weekday else '0' for i in range(7))
+        column = f"Ore Standard {WEEKDAY_NAMES[weekday]}"
+        metrics[column] = np.busday_count(month_starts, month_ends, weekmask=weekmask, holidays=holidays) * hours
+        weekday_columns.append(column)
+    metrics['Ore Standard'] = metrics[weekday_columns].sum(axis=1)
+
+    return metrics.set_index(['An', 'Luna'])
+
+# Function to get the calendar metrics of a single month
+def get_month_metrics(year, month):
+    return calculate_month_metrics(int(year), int(year)).loc[(int(year), int(month))]
+
+# Function to build the daily attendance frame from the parsed card records, column by column
+def create_daily_frame(records):
+    records_df = pd.DataFrame(records, columns=CardRecord._fields)
+    if records_df.empty:
+        return pd.DataFrame()
+
+    # Duration from the entry/exit minutes; absent days have no times and count 0 hours
+    entry_minutes = records_df['entry_minute'].astype('Int16')
+    exit_minutes = records_df['exit_minute'].astype('Int16')
+    durations = (exit_minutes - entry_minutes).to_numpy(dtype=float, na_value=np.nan) / 60
+    durations = np.nan_to_num(np.round(durations, 2))
+
+    # Calculate standard hours based on weekday, none on holidays
+    standard_hours = records_df['weekday'].map(STANDARD_HOURS_BY_WEEKDAY).fillna(0).to_numpy(dtype=float)
+    standard_hours = np.where(holiday_mask(records_df['date']), 0.0, standard_hours)
+
+    return pd.DataFrame({
+        'Angajat': records_df['employee'],
+        'Departament': records_df['department'],
+        'ID Legitimație': records_df['badge'],
+        'Zi': records_df['weekday'],
+        'Data': records_df['date_text'],
+        'Data_Obiect': pd.to_datetime(records_df['date']).astype('datetime64[ns]'),
+        'Minut Sosire': entry_minutes,
+        'Minut Plecare': exit_minutes,
+        'Durata (Ore)': durations,
+        'Ore Standard': standard_hours,
+        'Diferență': durations - standard_hours
+    })
+
+# Function to convert a daily frame to the compact column types; categories are kept sorted, so sorting by a
+# category column sorts by its text (frames concatenated with different categories are converted back as well)
+def apply_daily_schema(df):
+    if df.empty:
+        return df
+    columns = {}
+    for column in DAILY_CATEGORY_COLUMNS:
+        if column in df.columns:
+            columns[column] = df[column].astype(pd.CategoricalDtype(sorted(df[column].dropna().unique())))
+    for column, dtype in DAILY_INTEGER_COLUMNS.items():
+        if column in df.columns:
+            columns[column] = df[column].astype(dtype)
+    if 'Data_Obiect' in df.columns:
+        columns['Data_Obiect'] = pd.to_datetime(df['Data_Obiect']).astype('datetime64[ns]')
+    return df.assign(**columns)
+
+# Function to derive the calendar columns of a datetime64 column in one step: year, month, Romanian month name and
+# ISO week (all missing for undated rows)
+def calendar_columns(dates):
+    months = dates.dt.month
+    month_codes = months.fillna(0).to_numpy(dtype=int) - 1
+    return pd.DataFrame({
+        'An': dates.dt.year.astype('Int16'),
+        'Luna': months.astype('Int8'),
+        'Luna_Nume': pd.Categorical.from_codes(month_codes, categories=ROMANIAN_MONTH_NAMES),
+        'Săptămână': dates.dt.isocalendar().week.astype('Int8')
+    }, index=dates.index)
+
+# Function to convert a column of 'HH:MM' strings to minutes since midnight
+def parse_clock_minutes(clock_strings):
+    parts = clock_strings.astype('string').str.strip().str.extract(r'^(\d{1,2}):(\d{2})$')
+    hours = pd.to_numeric(parts[0]).astype('Int16')
+    minutes = pd.to_numeric(parts[1]).astype('Int16')
+    return (hours * 60 + minutes).where((hours < 24) & (minutes < 60))
+
+# Function to format a column of minutes since midnight as 'HH:MM' strings ('' when absent)
+def format_clock_minutes(minutes):
+    clock_strings = pd.Series('', index=minutes.index)
+    present = minutes.notna()
+    present_minutes = minutes[present].astype(int)
+    clock_strings[present] = ((present_minutes // 60).astype(str).str.zfill(2) + ':' +
+                              (present_minutes % 60).astype(str).str.zfill(2))
+    return clock_strings
+
+# Function to format a column of dates as 'DD Mon' labels ('' when missing), without locale formatting
+def format_day_month(dates):
+    labels = pd.Series('', index=dates.index)
+    present = dates.notna()
+    present_dates = dates[present]
+    labels[present] = (present_dates.dt.day.astype(str).str.zfill(2) + ' ' +
+                       MONTH_ABBREVIATIONS[present_dates.dt.month.to_numpy() - 1])
+    return labels
+
+# Function to replace the minute columns with their 'HH:MM' display columns, in place of the originals
+def format_clock_columns(df):
+    display_df = df.copy()
+    for minute_column, clock_column in CLOCK_COLUMNS.items():
+        if minute_column in display_df.columns:
+            position = display_df.columns.get_loc(minute_column)
+            clock_strings = format_clock_minutes(display_df.pop(minute_column))
+            display_df.insert(position, clock_column, clock_strings)
+    return display_df
+
+# Function to add the working days missing from the report as absences
+def add_missing_working_days(df, start_date, end_date):
+    business_days = pd.bdate_range(start_date, end_date)
+    if business_days.empty:
+        return df
+
+    # Build the calendar columns once for the whole interval
+    weekday_nums = business_days.weekday
+    standard_hours = np.where(weekday_nums == 4, 6.0, 8.5)
+    standard_hours[holiday_mask(business_days)] = 0
+    days_df = pd.DataFrame({
+        'Zi': np.array(['Mon', 'Tue', 'Wed', 'Thu', 'Fri'])[weekday_nums],
+        'Data': [day.strftime("%d %B") for day in business_days],
+        'Data_Obiect': business_days,
+        'Minut Sosire': pd.array([pd.NA] * len(business_days), dtype='Int16'),
+        'Minut Plecare': pd.array([pd.NA] * len(business_days), dtype='Int16'),
+        'Durata (Ore)': 0,
+        'Ore Standard': standard_hours,
+        'Diferență': -standard_hours
+    })
+
+    # Employee x business day grid, keeping the first department and badge seen for each employee
+    employees = df.drop_duplicates('Angajat')[['Angajat', 'Departament', 'ID Legitimație']]
+    grid = employees.merge(days_df, how='cross')
+
+    # Anti-join against the days already present in the report
+    existing = pd.DataFrame({
+        'Angajat': df['Angajat'],
+        'Data_Obiect': pd.to_datetime(df['Data_Obiect']).dt.normalize()
+    }).dropna().drop_duplicates()
+    grid = grid.merge(existing, on=['Angajat', 'Data_Obiect'], how='left', indicator=True)
+    missing_df = grid[grid['_merge'] == 'left_only'][df.columns]
+
+    if missing_df.empty:
+        return df
+    return pd.concat([df, missing_df], ignore_index=True)
+
+# Function to calculate weekly totals for each employee
+def calculate_weekly_summary(df):
+    if df.empty or 'Săptămână' not in df.columns:
+        return pd.DataFrame()
+
+    # Weeks belong to their ISO year, so the days of a week spanning New Year stay in one row and week 1 of
+    # January is not mixed with the last days of December
+    iso_years = df['Data_Obiect'].dt.isocalendar().year.astype('Int16')
+    weekly_df = df.assign(An=iso_years).groupby(['Angajat', 'An', 'Săptămână'], as_index=False, observed=True).agg(**{
+        'Departament': ('Departament', 'first'),
+        'Ore Totale': ('Durata (Ore)', 'sum'),
+        'Ore Standard': ('Ore Standard', 'sum'),
+        'Prima Zi': ('Data_Obiect', 'min'),
+        'Ultima Zi': ('Data_Obiect', 'max')
+    })
+
+    # Interval label from the first and last date of the week
+    first_days = weekly_df['Prima Zi']
+    last_days = weekly_df['Ultima Zi']
+    weekly_df['Interval'] = (format_day_month(first_days) + ' - ' + format_day_month(last_days)).where(
+        first_days.notna() & last_days.notna(), 'Săpt. ' + weekly_df['Săptămână'].astype(str)
+    )
+    weekly_df['Diferență'] = weekly_df['Ore Totale'] - weekly_df['Ore Standard']
+
+    return weekly_df[['Angajat', 'Departament', 'An', 'Săptămână', 'Interval',
+                      'Ore Totale', 'Ore Standard', 'Diferență']]
+
+# Function to calculate monthly totals for each employee
+def calculate_monthly_summary(df):
+    if df.empty or 'Luna' not in df.columns or 'An' not in df.columns:
+        return pd.DataFrame()
+
+    monthly_df = df.groupby(['Angajat', 'An', 'Luna'], as_index=False, observed=True).agg(**{
+        'Departament': ('Departament', 'first'),
+        'Luna_Nume': ('Luna_Nume', 'first'),
+        'Ore Totale': ('Durata (Ore)', 'sum')
+    })
+    if monthly_df.empty:
+        return pd.DataFrame()
+    monthly_df['An'] = monthly_df['An'].astype(int)
+    monthly_df['Luna'] = monthly_df['Luna'].astype(int)
+    monthly_df['Luna_Nume'] = monthly_df['Luna_Nume'].fillna('')
+
+    # Add standard hours and working days from the month metrics table
+    month_metrics = calculate_month_metrics(int(monthly_df['An'].min()), int(monthly_df['An'].max()))
+    monthly_df = monthly_df.merge(
+        month_metrics[['Ore Standard', 'Zile Lucrătoare']],
+        left_on=['An', 'Luna'], right_index=True, how='left'
+    )
+    monthly_df['Diferență'] = monthly_df['Ore Totale'] - monthly_df['Ore Standard']
+
+    return monthly_df[['Angajat', 'Departament', 'An', 'Luna', 'Luna_Nume', 'Ore Totale',
+                       'Ore Standard', 'Diferență', 'Zile Lucrătoare']]
+
+# Function to index the rows of each employee in a frame sorted by employee (as the daily, weekly and monthly
+# frames are): {employee: (start, stop)} in sorted order, so selecting an employee is a positional slice
+def employee_row_ranges(df):
+    if df.empty or 'Angajat' not in df.columns:
+        return {}
+    codes, employees = pd.factorize(df['Angajat'])
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    if len(starts) != len(employees):
+        raise ValueError("Rândurile nu sunt grupate pe angajați")
+    stops = np.r_[starts[1:], len(codes)]
+    return dict(sorted((employee, (int(start), int(stop))) for employee, start, stop in zip(employees, starts, stops)))
+
+# Function to time a processing stage, adding its seconds to a timings dict (nothing is measured without one)
+@contextmanager
+def timed_stage(timings, stage):
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[stage] = timings.get(stage, 0.0) + time.perf_counter() - start
+
+# Function to process attendance data, given the report text or an iterable of its lines
+def process_attendance_data(file_content, timings=None):
+    # Parse the report in a single pass over its lines
+    with timed_stage(timings, 'parse'):
+        lines = file_content.split('\n') if isinstance(file_content, str) else file_content
+        parser = CardReportParser()
+        df = create_daily_frame(parser.parse(lines))
+    
+    date_range = parser.date_range
+    start_date = parser.start_date
+    end_date = parser.end_date
+    report_year = parser.report_year
+    
+    # Add missing working days for each employee
+    with timed_stage(timings, 'backfill'):
+        if not df.empty and start_date and end_date:
+            df = add_missing_working_days(df, start_date, end_date)
+
+    # Extract year, month info and add them as columns
+    with timed_stage(timings, 'calendar'):
+        if not df.empty and 'Data_Obiect' in df.columns:
+            df = df.assign(**calendar_columns(df['Data_Obiect']))
+
+    # Convert to the compact column types, in bulk once the backfilled rows are in
+    with timed_stage(timings, 'schema'):
+        df = apply_daily_schema(df)
+
+    # Sort DataFrame by employee and date
+    with timed_stage(timings, 'sort'):
+        if 'Data_Obiect' in df.columns and not df.empty:
+            df = df.sort_values(['Angajat', 'Data_Obiect']).reset_index(drop=True)
+    
+    # Calculate weekly and monthly totals for each employee
+    with timed_stage(timings, 'summaries'):
+        weekly_df = calculate_weekly_summary(df)
+        monthly_df = calculate_monthly_summary(df)
+    
+    return df, weekly_df, monthly_df, date_range, report_year
+
+# Function to read a report, given as bytes or a file path: streamed worksheet rows for .xlsx, the text otherwise
+def read_report_lines(file_name, source, sheet_name=None):
+    if file_name.endswith('.xlsx'):
+        return iter_workbook_lines(io.BytesIO(source) if isinstance(source, bytes) else source, sheet_name)
+    if isinstance(source, bytes):
+        return source.decode('utf-8')
+    with open(source, encoding='utf-8') as report_file:
+        return report_file.read()
@@ -0,0 +1,89 @@
+"""Department cube: the daily rows summed once per data version over department, employee, ISO week and month, so
+department totals and the drill-down from a department to its employees are answered from small precomputed
+tables instead of the daily rows."""
+import numpy as np
+import pandas as pd
+
+from history_analytics import add_periods
+
+# Additive measures of the cube cells, summed at every level
+CUBE_MEASURES = ['Ore Totale', 'Ore Standard', 'Ore Suplimentare', 'Zile Lucrătoare', 'Zile Absente']
+
+# Grouping levels, from the coarsest to the finest; departments and the company also count their employees
+CUBE_GROUPS = {'company': [], 'department': ['Departament'], 'employee': ['Departament', 'Angajat']}
+
+# Period columns of each level of detail: the whole interval, ISO weeks (keyed by ISO year) and calendar months
+CUBE_PERIODS = {'total': [], 'weekly': ['An ISO', 'Săptămână'], 'monthly': ['An', 'Luna']}
+
+
+# Function to sum the daily rows into the cube cells: one per department, employee, ISO week and month (a week
+# crossing a month end gives two cells), holding the measures every level adds up
+def cube_cells(daily_df):
+    working_days = daily_df['Ore Standard'] > 0
+    rows = pd.DataFrame({
+        'Departament': daily_df['Departament'],
+        'Angajat': daily_df['Angajat'],
+        'An ISO': daily_df['Data_Obiect'].dt.isocalendar().year.astype('Int16'),
+        'Săptămână': daily_df['Săptămână'],
+        'An': daily_df['An'],
+        'Luna': daily_df['Luna'],
+        'Ore Totale': daily_df['Durata (Ore)'],
+        'Ore Standard': daily_df['Ore Standard'],
+        # Overtime is counted day by day, so a short day does not cancel a long one
+        'Ore Suplimentare': daily_df['Diferență'].clip(lower=0),
+        'Zile Lucrătoare': working_days.astype(int),
+        # Absent: a working day without an entry time
+        'Zile Absente': (working_days & daily_df['Minut Sosire'].isna()).astype(int)
+    })
+    # Undated rows are kept in the cells, so they still count in the totals of the whole interval
+    keys = ['Departament', 'Angajat', 'An ISO', 'Săptămână', 'An', 'Luna']
+    return rows.groupby(keys, dropna=False, as_index=False, sort=False, observed=True)[CUBE_MEASURES].sum()
+
+
+# Function to sum the cells of one level, keyed by the given columns, and add the difference and absence rate
+def summarize_cells(cells, keys, count_employees):
+    aggregations = {measure: (measure, 'sum') for measure in CUBE_MEASURES}
+    if count_employees:
+        aggregations = {'Angajați': ('Angajat', 'nunique'), **aggregations}
+
+    if keys:
+        level = cells.groupby(keys, as_index=False, observed=True).agg(**aggregations)
+    else:
+        level = cells.groupby(np.zeros(len(cells), dtype=int)).agg(**aggregations).reset_index(drop=True)
+
+    level.insert(level.columns.get_loc('Ore Standard') + 1, 'Diferență', level['Ore Totale'] - level['Ore Standard'])
+    working_days = level['Zile Lucrătoare']
+    level['Rată Absență (%)'] = (level['Zile Absente'] / working_days.where(working_days > 0) * 100).fillna(0)
+    return level
+
+
+# Function to build every level of the cube from its cells, keyed by (group, period): the company, its departments
+# and their employees, over the whole interval, per ISO week and per month
+def build_attendance_cube(daily_df):
+    if daily_df.empty:
+        return {}
+
+    cells = cube_cells(daily_df)
+    cube = {}
+    for group, group_columns in CUBE_GROUPS.items():
+        for period, period_columns in CUBE_PERIODS.items():
+            level = summarize_cells(cells, group_columns + period_columns, count_employees=group != 'employee')
+            if period != 'total':
+                # Weekly rows are keyed by ISO year, like the weekly summary
+                level = add_periods(level.rename(columns={'An ISO': 'An'}), period).drop(columns=['Sfârșit'])
+                # The period label right after the department and employee
+                level = level[group_columns + ['Perioadă'] + level.columns.drop(group_columns + ['Perioadă']).tolist()]
+            cube[(group, period)] = level.reset_index(drop=True)
+    return cube
+
+
+# Function to select the rows of one level of the cube, for one department and one employee when given
+def drill_down(cube, group, period, department=None, employee=None):
+    level = cube.get((group, period), pd.DataFrame())
+    if level.empty:
+        return level
+    if department is not None:
+        level = level[level['Departament'] == department]
+    if employee is not None:
+        level = level[level['Angajat'] == employee]
+    return level
@@ -0,0 +1,197 @@
+"""Streaming parser for the "Report by first and last card presenting per calendar day" export."""
+import re
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+# Precompiled patterns for the lines of the report
+PERIOD_PATTERN = re.compile(r'from\s+(\d+\s+\w+\s+\d+)\s+to\s+(\d+\s+\w+\s+\d+)')
+EMPLOYEE_PATTERN = re.compile(r',([^,]+\s+[^,]+\s+\d+),([^,]*),')
+BADGE_PATTERN = re.compile(r'(\d{3}[A-Z0-9]+)$')
+DATE_LINE_PATTERN = re.compile(r'\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,')
+DATE_CELL_PATTERN = re.compile(r'\d+\s+\w+')
+TIME_LINE_PATTERN = re.compile(r'(\d{1,2}:\d{2}\s+-\s+\d{1,2}:\d{2})?,(\d{1,2}:\d{2}\s+-\s+\d{1,2}:\d{2})?,')
+TIME_RANGE_PATTERN = re.compile(r'(\d{1,2}):(\d{2})\s*-\s*(\d{1,2}):(\d{2})$')
+WEEKDAY_HEADER = 'Mon,Tue,Wed,Thu,Fri,Sat,Sun'
+
+DATE_FORMATS = ['%d %B %Y', '%d %B', '%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d']
+
+
+# One calendar day of one employee; entry/exit are minutes since midnight (None when absent)
+class CardRecord(NamedTuple):
+    employee: str
+    department: str
+    badge: str
+    weekday: str
+    date_text: str
+    date: Optional[datetime]
+    entry_minute: Optional[int]
+    exit_minute: Optional[int]
+
+
+# Function to convert date string to datetime
+def convert_date_string(date_str, year=None):
+    if not date_str:
+        return None
+
+    # Clean up the date string
+    date_str = date_str.strip()
+
+    # Try different date formats
+    for fmt in DATE_FORMATS:
+        try:
+            if '%Y' not in fmt and year:
+                # If year is not in the format, parse it along with the day, so 29 February is valid in leap years
+                return datetime.strptime(f"{date_str} {year}", f"{fmt} %Y")
+            return datetime.strptime(date_str, fmt)
+        except ValueError:
+            continue
+
+    return None
+
+
+# Function to render a worksheet cell the way it appears in a CSV export
+def format_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+
+# Function to stream the rows of a worksheet as comma-separated lines, opening the workbook once in read-only mode
+def iter_workbook_lines(source, sheet_name=None):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+        for row in worksheet.iter_rows(values_only=True):
+            cells = [format_cell(value) for value in row]
+            # Blank rows separate employees; they carry no data
+            yield ','.join(cells) if any(cells) else ''
+    finally:
+        workbook.close()
+
+
+# Function to list the sheets of a workbook without loading their rows
+def get_workbook_sheet_names(source):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True)
+    try:
+        return workbook.sheetnames
+    finally:
+        workbook.close()
+
+
+# Function to convert clock groups to minutes since midnight (None for an invalid clock time)
+def to_minute(hours, minutes):
+    hours = int(hours)
+    minutes = int(minutes)
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+class CardReportParser:
+    # Line kinds recognised by the state machine
+    EMPTY, EMPLOYEE, WEEKDAYS, DATES, TIMES, OTHER = range(6)
+
+    def __init__(self):
+        self.start_date = None
+        self.end_date = None
+        self.date_range = "N/A"
+        self.report_year = datetime.now().year
+
+        self._employee = None
+        self._department = None
+        self._badge = None
+        self._weekdays = None
+        self._dates = None
+        self._date_cache = {}
+
+    # Function to classify a stripped line, trying each pattern at most once
+    def classify(self, line):
+        if not line:
+            return self.EMPTY, None
+        match = EMPLOYEE_PATTERN.search(line)
+        if match:
+            return self.EMPLOYEE, match
+        if line.startswith(WEEKDAY_HEADER):
+            return self.WEEKDAYS, None
+        if DATE_LINE_PATTERN.match(line):
+            return self.DATES, None
+        if TIME_LINE_PATTERN.match(line):
+            return self.TIMES, None
+        return self.OTHER, None
+
+    # Function to read the reporting period from the second line of the report
+    def read_period(self, line):
+        match = PERIOD_PATTERN.search(line)
+        if not match:
+            return
+        self.date_range = f"{match.group(1)} - {match.group(2)}"
+        self.start_date = convert_date_string(match.group(1))
+        self.end_date = convert_date_string(match.group(2))
+        if self.start_date:
+            self.report_year = self.start_date.year
+
+    # Function to convert a day cell to datetime, once per distinct cell; the cells carry no year, so in a report
+    # spanning New Year the days well before the start of the period belong to the next year
+    def convert_date(self, date_text):
+        if date_text not in self._date_cache:
+            date = convert_date_string(date_text, self.report_year)
+            if (date and self.start_date and self.end_date and self.end_date.year > self.start_date.year
+                    and date < self.start_date - timedelta(days=7)):
+                date = convert_date_string(date_text, self.report_year + 1)
+            self._date_cache[date_text] = date
+        return self._date_cache[date_text]
+
+    # Function to parse the report line by line, yielding a CardRecord per employee day
+    def parse(self, lines):
+        line_number = -1
+        for raw_line in lines:
+            line = raw_line.strip()
+
+            # Line numbers start at the first non-empty line, like file_content.strip()
+            if line_number < 0 and not line:
+                continue
+            line_number += 1
+            if line_number == 1:
+                self.read_period(raw_line)
+
+            kind, match = self.classify(line)
+
+            if kind == self.EMPLOYEE:
+                self._employee = match.group(1).strip()
+                self._department = match.group(2).strip()
+                badge_match = BADGE_PATTERN.search(line)
+                self._badge = badge_match.group(1) if badge_match else "N/A"
+            elif kind == self.WEEKDAYS:
+                self._weekdays = line.split(',')
+            elif kind == self.DATES:
+                self._dates = [cell if cell and DATE_CELL_PATTERN.match(cell) else None
+                               for cell in (cell.strip() for cell in line.split(','))]
+            elif kind == self.TIMES and self._employee and self._dates is not None:
+                yield from self.parse_times(line)
+
+    # Function to yield the records of one time-range line of the current employee
+    def parse_times(self, line):
+        weekdays = self._weekdays if self._weekdays is not None else WEEKDAY_HEADER.split(',')
+        for weekday, date_text, cell in zip(weekdays, self._dates, line.split(',')):
+            if not date_text:
+                continue
+            cell = cell.strip()
+            entry_minute = exit_minute = None
+
+            if '-' in cell:
+                time_match = TIME_RANGE_PATTERN.match(cell)
+                if not time_match:
+                    continue
+                entry_minute = to_minute(time_match.group(1), time_match.group(2))
+                exit_minute = to_minute(time_match.group(3), time_match.group(4))
+                if entry_minute is None or exit_minute is None:
+                    continue
+
+            yield CardRecord(self._employee, self._department, self._badge, weekday, date_text,
+                             self.convert_date(date_text), entry_minute, exit_minute)
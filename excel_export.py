@@ -0,0 +1,140 @@
+"""Constant-memory XLSX export: each sheet is streamed row by row with xlsxwriter's constant_memory mode."""
+import io
+
+import numpy as np
+import pandas as pd
+
+from attendance_core import CLOCK_COLUMNS, get_holidays_frame, parse_clock_minutes
+
+# Excel stores dates as days since 1899-12-30 and clock times as fractions of a day
+EXCEL_EPOCH = np.datetime64('1899-12-30', 'D')
+MINUTES_PER_DAY = 24 * 60
+
+# Data rows per sheet (Excel's row limit minus the header); longer tables continue on further sheets
+MAX_SHEET_ROWS = 1048575
+
+# Characters allowed in a sheet name
+MAX_SHEET_NAME_LENGTH = 31
+
+# Rows converted to cell values at a time
+WRITE_CHUNK_ROWS = 10000
+
+NUMBER_FORMATS = {
+    'date': 'dd.mm.yyyy',
+    'clock': 'hh:mm',
+    'float': '0.00',
+    'integer': '0'
+}
+
+# Highlighting of the 'Diferență' column, the same colors as in the app tables
+DIFFERENCE_COLUMN = 'Diferență'
+POSITIVE_FORMAT = {'bg_color': '#C6EFCE', 'font_color': '#006100'}
+NEGATIVE_FORMAT = {'bg_color': '#FFC7CE', 'font_color': '#9C0006'}
+
+
+# Function to convert a column to a list of Excel cell values (None for blanks) and its number format kind
+def prepare_column(name, series):
+    if name in CLOCK_COLUMNS or name in CLOCK_COLUMNS.values():
+        # Entry/exit as native times, from minutes or from 'HH:MM' strings
+        minutes = series if name in CLOCK_COLUMNS else parse_clock_minutes(series)
+        values = minutes.to_numpy(dtype=float, na_value=np.nan) / MINUTES_PER_DAY
+        kind = 'clock'
+    elif pd.api.types.is_datetime64_any_dtype(series):
+        days = series.to_numpy(dtype='datetime64[ns]')
+        values = (days - EXCEL_EPOCH) / np.timedelta64(1, 'D')
+        kind = 'date'
+    elif pd.api.types.is_bool_dtype(series):
+        return series.astype(object).where(series.notna(), None).tolist(), None
+    elif pd.api.types.is_integer_dtype(series):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        kind = 'integer'
+    elif pd.api.types.is_float_dtype(series):
+        values = series.to_numpy(dtype=float, na_value=np.nan)
+        kind = 'float'
+    else:
+        return [None if pd.isna(value) else str(value) for value in series.tolist()], None
+
+    values = values.astype(object)
+    values[pd.isna(values)] = None
+    return values.tolist(), kind
+
+
+# Function to write one table to a new worksheet: header, formatted columns, then the rows in order
+def write_sheet(workbook, sheet_name, df, formats):
+    worksheet = workbook.add_worksheet(sheet_name)
+    headers = [CLOCK_COLUMNS.get(name, str(name)) for name in df.columns]
+    worksheet.write_row(0, 0, headers, formats['header'])
+
+    # constant_memory mode only keeps the current row, so rows are written strictly in order; the cell values
+    # are prepared one chunk at a time, so memory does not grow with the table either
+    for start in range(0, len(df), WRITE_CHUNK_ROWS):
+        chunk = df.iloc[start:start + WRITE_CHUNK_ROWS]
+        columns = [prepare_column(name, chunk[name]) for name in chunk.columns]
+        if start == 0:
+            # Column widths and formats, sized on the first chunk
+            for col, (header, (values, kind)) in enumerate(zip(headers, columns)):
+                width = len(header)
+                if kind is None:
+                    width = max([width] + [len(value) for value in values if value is not None])
+                worksheet.set_column(col, col, min(max(width + 2, 10), 50), formats.get(kind))
+
+        for row, row_values in enumerate(zip(*(values for values, _ in columns)), start=start + 1):
+            worksheet.write_row(row, 0, row_values)
+
+    last_row = len(df)
+    if last_row:
+        if DIFFERENCE_COLUMN in df.columns:
+            col = df.columns.get_loc(DIFFERENCE_COLUMN)
+            worksheet.conditional_format(1, col, last_row, col, {'type': 'cell', 'criteria': '>', 'value': 0,
+                                                                 'format': formats['positive']})
+            worksheet.conditional_format(1, col, last_row, col, {'type': 'cell', 'criteria': '<', 'value': 0,
+                                                                 'format': formats['negative']})
+        worksheet.autofilter(0, 0, last_row, len(df.columns) - 1)
+    worksheet.freeze_panes(1, 0)
+
+
+# Function to write tables as the sheets of one workbook, given as {sheet name: DataFrame}, to a path or file object
+def write_workbook(target, sheets):
+    import xlsxwriter
+
+    workbook = xlsxwriter.Workbook(target, {
+        'constant_memory': True,
+        # Cell text is data, never a formula or a link
+        'strings_to_formulas': False,
+        'strings_to_urls': False
+    })
+    try:
+        formats = {kind: workbook.add_format({'num_format': num_format}) for kind, num_format in NUMBER_FORMATS.items()}
+        formats['header'] = workbook.add_format({'bold': True, 'bottom': 1})
+        formats['positive'] = workbook.add_format(POSITIVE_FORMAT)
+        formats['negative'] = workbook.add_format(NEGATIVE_FORMAT)
+
+        for sheet_name, df in sheets.items():
+            # Tables longer than a sheet continue on 'Name (2)', 'Name (3)', ..., the name cut to leave room for
+            # the part number
+            for part, start in enumerate(range(0, max(len(df), 1), MAX_SHEET_ROWS), start=1):
+                suffix = '' if part == 1 else f" ({part})"
+                part_name = sheet_name[:MAX_SHEET_NAME_LENGTH - len(suffix)] + suffix
+                write_sheet(workbook, part_name, df.iloc[start:start + MAX_SHEET_ROWS], formats)
+    finally:
+        workbook.close()
+
+
+# Function to assemble the complete report: the three tables and the holidays of the years they cover
+def report_sheets(daily_df, weekly_df, monthly_df):
+    years = []
+    if not daily_df.empty:
+        years = sorted(pd.to_datetime(daily_df['Data_Obiect']).dt.year.dropna().astype(int).unique())
+    return {
+        'Zilnic': daily_df,
+        'Săptămânal': weekly_df,
+        'Lunar': monthly_df,
+        'Sărbători Legale': get_holidays_frame(years)
+    }
+
+
+# Function to export tables as the bytes of an XLSX workbook
+def workbook_bytes(sheets):
+    output = io.BytesIO()
+    write_workbook(output, sheets)
+    return output.getvalue()
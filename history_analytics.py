@@ -0,0 +1,117 @@
+"""History analytics: totals over any date interval and trends by week, month or year, answered from the rollups
+kept by the history stores, with the daily rows read only for the days of partial months."""
+import calendar
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+from attendance_core import ROMANIAN_MONTH_NAMES
+
+# Trend levels, from the finest to the coarsest
+TREND_LEVELS = ('weekly', 'monthly', 'yearly')
+
+
+# Function to split a date interval into the largest whole periods it covers: calendar years, then months, then
+# the remaining days (as (first, last) intervals within a month)
+def split_date_range(start, end):
+    years, months, day_ranges = [], [], []
+    cursor = start
+    while cursor <= end:
+        month_end = date(cursor.year, cursor.month, calendar.monthrange(cursor.year, cursor.month)[1])
+        if cursor.month == 1 and cursor.day == 1 and date(cursor.year, 12, 31) <= end:
+            years.append(cursor.year)
+            cursor = date(cursor.year + 1, 1, 1)
+        elif cursor.day == 1 and month_end <= end:
+            months.append((cursor.year, cursor.month))
+            cursor = month_end + timedelta(days=1)
+        else:
+            last = min(month_end, end)
+            day_ranges.append((cursor, last))
+            cursor = last + timedelta(days=1)
+    return years, months, day_ranges
+
+
+# Function to total the hours of each employee (or department) over a date interval: whole years come from the
+# yearly rollup, whole months from the monthly one and only the remaining days from the daily rows, totalled per
+# employee by the store. Also returns how many years, months and days each source answered
+def range_totals(store, start, end, by='Angajat'):
+    years, months, day_ranges = split_date_range(start, end)
+    plan = {'years': len(years), 'months': len(months),
+            'days': sum((last - first).days + 1 for first, last in day_ranges)}
+
+    pieces = []
+    if years:
+        pieces.append(store.load_summary('yearly', years))
+    if months:
+        monthly_df = store.load_summary('monthly', sorted({year for year, _ in months}))
+        if not monthly_df.empty:
+            month_keys = monthly_df['An'].astype(int) * 12 + monthly_df['Luna'].astype(int)
+            pieces.append(monthly_df[month_keys.isin([year * 12 + month for year, month in months])])
+    if day_ranges:
+        pieces.append(store.day_totals(day_ranges))
+
+    pieces = [piece[['Angajat', 'Departament', 'Ore Totale', 'Ore Standard']] for piece in pieces if not piece.empty]
+    if not pieces:
+        return pd.DataFrame(), plan
+
+    # Employee totals first, so a department counts its distinct employees over the whole interval
+    rows = pd.concat([piece.astype({'Angajat': object, 'Departament': object}) for piece in pieces],
+                     ignore_index=True)
+    totals = rows.groupby('Angajat', as_index=False).agg(**{
+        'Departament': ('Departament', 'first'),
+        'Ore Totale': ('Ore Totale', 'sum'),
+        'Ore Standard': ('Ore Standard', 'sum')
+    })
+    if by == 'Departament':
+        totals = totals.groupby('Departament', as_index=False).agg(**{
+            'Angajați': ('Angajat', 'nunique'),
+            'Ore Totale': ('Ore Totale', 'sum'),
+            'Ore Standard': ('Ore Standard', 'sum')
+        })
+    totals['Diferență'] = totals['Ore Totale'] - totals['Ore Standard']
+    return totals, plan
+
+
+# Function to add the first and last day and a label to the rows of a rollup of the given level
+def add_periods(rollup, level):
+    years = rollup['An'].astype(int)
+    if level == 'yearly':
+        starts = pd.to_datetime({'year': years, 'month': 1, 'day': 1})
+        ends = starts + pd.offsets.YearEnd(0)
+        labels = years.astype(str)
+    elif level == 'monthly':
+        months = rollup['Luna'].astype(int)
+        starts = pd.to_datetime({'year': years, 'month': months, 'day': 1})
+        ends = starts + pd.offsets.MonthEnd(0)
+        month_names = pd.Series(np.array(ROMANIAN_MONTH_NAMES)[months.to_numpy() - 1], index=rollup.index)
+        labels = month_names + ' ' + years.astype(str)
+    else:
+        # Weekly rows are keyed by ISO year and week; the week starts on its Monday
+        weeks = rollup['Săptămână'].astype(int)
+        starts = pd.to_datetime(years.astype(str) + '-' + weeks.astype(str).str.zfill(2) + '-1', format='%G-%V-%u')
+        ends = starts + pd.Timedelta(days=6)
+        labels = years.astype(str) + ' S' + weeks.astype(str).str.zfill(2)
+    return rollup.assign(**{'Început': starts, 'Sfârșit': ends, 'Perioadă': labels})
+
+
+# Function to load the weekly, monthly or yearly rollup of employees (or departments), or of one of them, for the
+# periods that overlap a date interval, oldest first
+def range_trend(store, level, start, end, by='Angajat', entity=None):
+    kind = level if by == 'Angajat' else f"department_{level}"
+    # An ISO week can belong to the year before or after its days
+    first_year, last_year = (start.year - 1, end.year + 1) if level == 'weekly' else (start.year, end.year)
+    rollup = store.load_summary(kind, list(range(first_year, last_year + 1)), entity)
+    if rollup.empty:
+        return rollup
+
+    rollup = add_periods(rollup, level)
+    overlapping = (rollup['Început'] <= pd.Timestamp(end)) & (rollup['Sfârșit'] >= pd.Timestamp(start))
+    return rollup[overlapping].sort_values(['Început', by]).reset_index(drop=True)
+
+
+# Function to list the employees (or departments) with hours in the months that overlap a date interval, from the
+# monthly rollup
+def range_entities(store, start, end, by='Angajat'):
+    rollup = range_trend(store, 'monthly', start, end, by)
+    return sorted(rollup[by].astype(str).unique()) if not rollup.empty else []
@@ -0,0 +1,761 @@
+"""Attendance history storage engines: monthly Parquet files or an embedded SQLite database, each keeping
+materialized totals up to date with the daily rows: weekly and monthly per employee, rolled up to yearly per
+employee and to weekly, monthly and yearly per department."""
+import os
+import shutil
+import sqlite3
+import uuid
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from attendance_core import calculate_monthly_summary, calculate_weekly_summary, calendar_columns
+
+# Partition holding the rows without a parsed date
+UNDATED_PARTITION = (0, 0)
+
+# A history row is identified by the employee, the badge and the calendar day
+HISTORY_KEY_COLUMNS = ('Angajat', 'ID Legitimație', 'Data_Obiect')
+
+# Cells of the materialized totals, by kind: an employee's ISO week or calendar month as in the upload summaries,
+# and the rollups of those by year and by department
+SUMMARY_KEY_COLUMNS = {
+    'weekly': ('Angajat', 'An', 'Săptămână'),
+    'monthly': ('Angajat', 'An', 'Luna'),
+    'yearly': ('Angajat', 'An'),
+    'department_weekly': ('Departament', 'An', 'Săptămână'),
+    'department_monthly': ('Departament', 'An', 'Luna'),
+    'department_yearly': ('Departament', 'An')
+}
+
+# Rollups and the totals each one is computed from, sources first
+ROLLUP_SOURCES = {
+    'yearly': 'monthly',
+    'department_weekly': 'weekly',
+    'department_monthly': 'monthly',
+    'department_yearly': 'yearly'
+}
+
+# Layout version of the totals; a history with older (or no) totals gets them rebuilt once
+SUMMARIES_VERSION = 3
+
+# Daily columns the totals are computed from
+SUMMARY_SOURCE_COLUMNS = ['Angajat', 'Departament', 'Data_Obiect', 'Durata (Ore)', 'Ore Standard']
+
+
+# Function to encode the key columns of two frames as one int64 code per row, using shared codes
+def encode_keys(left, right, key_columns):
+    codes = np.zeros(len(left) + len(right), dtype=np.int64)
+    for column in key_columns:
+        values = pd.concat([left[column], right[column]], ignore_index=True)
+        if column == 'Data_Obiect':
+            values = pd.to_datetime(values).dt.normalize()
+        column_codes, uniques = pd.factorize(values, use_na_sentinel=False)
+
+        # Combine with the previous columns and re-factorize, so the codes stay small
+        codes, _ = pd.factorize(codes * len(uniques) + column_codes)
+    return codes[:len(left)], codes[len(left):]
+
+
+# Function to drop the stored rows whose key appears among the new rows
+def drop_replaced_rows(stored, new_rows, key_columns=HISTORY_KEY_COLUMNS):
+    stored_codes, new_codes = encode_keys(stored, new_rows, list(key_columns))
+    return stored[~pd.Index(stored_codes).isin(new_codes)]
+
+
+# Function to write a Parquet file atomically: written next to the target and renamed, so readers never see a
+# partial file
+def write_parquet(path, df):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        df.to_parquet(temp_path, index=False)
+        os.replace(temp_path, path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+# Function to compute the weekly and monthly totals of daily rows, optionally only the cells of some other rows
+def summarize_daily_rows(daily, cells_of=None):
+    if daily.empty:
+        return pd.DataFrame(), pd.DataFrame()
+    daily = daily[SUMMARY_SOURCE_COLUMNS].reset_index(drop=True)
+    if cells_of is not None:
+        # Only the employees of the touched cells; their weeks and months are complete in the given rows
+        daily = daily[daily['Angajat'].isin(cells_of['Angajat'].unique())].reset_index(drop=True)
+    daily = pd.concat([daily, calendar_columns(daily['Data_Obiect'])], axis=1)
+
+    weekly_df = calculate_weekly_summary(daily)
+    monthly_df = with_daily_standard_hours(calculate_monthly_summary(daily), daily)
+    if cells_of is not None:
+        dates = cells_of['Data_Obiect'].reset_index(drop=True)
+        employees = cells_of['Angajat'].to_numpy()
+        iso_dates = dates.dt.isocalendar()
+        touched_weeks = pd.DataFrame({'Angajat': employees, 'An': iso_dates['year'], 'Săptămână': iso_dates['week']})
+        touched_months = pd.DataFrame({'Angajat': employees, 'An': dates.dt.year, 'Luna': dates.dt.month})
+        weekly_df = keep_cells(weekly_df, touched_weeks, SUMMARY_KEY_COLUMNS['weekly'])
+        monthly_df = keep_cells(monthly_df, touched_months, SUMMARY_KEY_COLUMNS['monthly'])
+    return weekly_df, monthly_df
+
+
+# Function to replace the calendar-month standard hours of monthly totals by the sum over their stored days, like
+# the weekly totals: a whole month then adds up to the same hours as its days do, wherever the history starts or ends
+def with_daily_standard_hours(monthly_df, daily):
+    if monthly_df.empty:
+        return monthly_df
+    key_columns = list(SUMMARY_KEY_COLUMNS['monthly'])
+    standard_hours = daily.groupby(key_columns, as_index=False, observed=True)['Ore Standard'].sum()
+    standard_hours = standard_hours.astype({'An': int, 'Luna': int})
+    monthly_df = monthly_df.drop(columns=['Ore Standard', 'Diferență']).merge(standard_hours, on=key_columns,
+                                                                            how='left')
+    monthly_df['Diferență'] = monthly_df['Ore Totale'] - monthly_df['Ore Standard']
+    return monthly_df[['Angajat', 'Departament', 'An', 'Luna', 'Luna_Nume', 'Ore Totale',
+                       'Ore Standard', 'Diferență', 'Zile Lucrătoare']]
+
+
+# Function to total the hours of each employee over daily rows, keeping the department of the first day
+def total_days(daily):
+    if daily.empty:
+        return pd.DataFrame()
+    daily = daily.sort_values(['Angajat', 'Data_Obiect'])
+    return daily.groupby('Angajat', as_index=False, observed=True).agg(**{
+        'Departament': ('Departament', 'first'),
+        'Ore Totale': ('Durata (Ore)', 'sum'),
+        'Ore Standard': ('Ore Standard', 'sum')
+    })
+
+
+# Function to roll totals up to coarser cells: per employee (keeping the department) or per department (counting
+# the employees)
+def roll_up(summary, key_columns):
+    if summary.empty:
+        return pd.DataFrame()
+    key_columns = list(key_columns)
+    if 'Angajat' in key_columns:
+        aggregations = {'Departament': ('Departament', 'first')}
+        columns = ['Angajat', 'Departament'] + key_columns[1:]
+    else:
+        aggregations = {'Angajați': ('Angajat', 'nunique')}
+        columns = key_columns + ['Angajați']
+    rolled = summary.groupby(key_columns, as_index=False, observed=True).agg(**aggregations, **{
+        'Ore Totale': ('Ore Totale', 'sum'),
+        'Ore Standard': ('Ore Standard', 'sum')
+    })
+    rolled['Diferență'] = rolled['Ore Totale'] - rolled['Ore Standard']
+    return rolled[columns + ['Ore Totale', 'Ore Standard', 'Diferență']]
+
+
+# Function to keep the summary rows whose cell appears among the touched cells
+def keep_cells(summary, touched, key_columns):
+    if summary.empty:
+        return summary
+    summary_codes, touched_codes = encode_keys(summary, touched.dropna(), list(key_columns))
+    return summary[pd.Index(summary_codes).isin(touched_codes)].reset_index(drop=True)
+
+
+# Function to list the months whose rows can share a week with the given (year, month) pairs: themselves and
+# their neighbours, since a week spans at most two months
+def neighbour_months(partitions):
+    months = set()
+    for year, month in partitions:
+        if (year, month) == UNDATED_PARTITION:
+            continue
+        index = year * 12 + month - 1
+        months.update(divmod(neighbour, 12) for neighbour in (index - 1, index, index + 1))
+    return sorted((year, month + 1) for year, month in months)
+
+
+class ParquetHistoryStore:
+    def __init__(self, root):
+        self.root = root
+
+    # Function to get the file of a (year, month) partition
+    def partition_path(self, year, month):
+        return os.path.join(self.root, f"{year:04d}", f"{month:02d}.parquet")
+
+    # Function to list the stored partitions as (year, month) pairs
+    def partitions(self):
+        found = []
+        if not os.path.isdir(self.root):
+            return found
+
+        for year_dir in sorted(os.listdir(self.root)):
+            year_path = os.path.join(self.root, year_dir)
+            if not year_dir.isdigit() or not os.path.isdir(year_path):
+                continue
+            for file_name in sorted(os.listdir(year_path)):
+                month, extension = os.path.splitext(file_name)
+                if extension == '.parquet' and month.isdigit():
+                    found.append((int(year_dir), int(month)))
+        return found
+
+    # Function to check if the store holds any data
+    def is_empty(self):
+        return not self.partitions()
+
+    # Function to count the stored rows from the Parquet footers, without reading the data
+    def count(self):
+        import pyarrow.parquet as pq
+
+        return sum(pq.read_metadata(self.partition_path(year, month)).num_rows
+                   for year, month in self.partitions())
+
+    # Function to read a single partition, optionally only some of its columns
+    def read_partition(self, year, month, columns=None):
+        path = self.partition_path(year, month)
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        return pd.read_parquet(path, columns=columns)
+
+    # Function to load the given partitions (all of them by default) with column projection
+    def load(self, partitions=None, columns=None):
+        if partitions is None:
+            partitions = self.partitions()
+
+        frames = [self.read_partition(year, month, columns) for year, month in partitions]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    # Function to total the hours of each employee over day intervals ((first, last) pairs within one month each),
+    # reading only those days of their partitions
+    def day_totals(self, day_ranges):
+        frames = []
+        for first, last in day_ranges:
+            path = self.partition_path(first.year, first.month)
+            if os.path.exists(path):
+                days = [('Data_Obiect', '>=', pd.Timestamp(first)),
+                        ('Data_Obiect', '<', pd.Timestamp(last) + pd.Timedelta(days=1))]
+                frames.append(pd.read_parquet(path, columns=SUMMARY_SOURCE_COLUMNS, filters=days))
+        frames = [frame for frame in frames if not frame.empty]
+        return total_days(pd.concat(frames, ignore_index=True)) if frames else pd.DataFrame()
+
+    # Function to atomically replace a partition; an empty frame removes it
+    def write_partition(self, year, month, df):
+        path = self.partition_path(year, month)
+        if df.empty:
+            if os.path.exists(path):
+                os.remove(path)
+            return
+
+        write_parquet(path, df)
+
+    # Function to split rows into their (year, month) partitions
+    @staticmethod
+    def split_partitions(df):
+        dates = pd.to_datetime(df['Data_Obiect'])
+        years = dates.dt.year.fillna(UNDATED_PARTITION[0]).astype(int).rename('year')
+        months = dates.dt.month.fillna(UNDATED_PARTITION[1]).astype(int).rename('month')
+        for (year, month), partition_df in df.groupby([years, months], sort=True):
+            yield (int(year), int(month)), partition_df
+
+    # Function to add new rows, replacing stored rows with the same key, rewriting only the touched partitions;
+    # the totals of the touched weeks and months are recomputed along with them
+    def upsert(self, new_data, key_columns=HISTORY_KEY_COLUMNS):
+        # A history saved before the totals were kept gets them computed in full, once
+        rebuild = not self.has_summaries() and not self.is_empty()
+
+        touched = []
+        for (year, month), new_partition in self.split_partitions(new_data):
+            stored = self.read_partition(year, month)
+            if not stored.empty:
+                stored = drop_replaced_rows(stored, new_partition, key_columns)
+                new_partition = pd.concat([stored, new_partition], ignore_index=True)
+            self.write_partition(year, month, new_partition.reset_index(drop=True))
+            touched.append((year, month))
+
+        if rebuild:
+            self.rebuild_summaries()
+        else:
+            daily = self.load(neighbour_months(touched), SUMMARY_SOURCE_COLUMNS)
+            self.write_summaries(*summarize_daily_rows(daily, new_data))
+
+    # Function to get the file listing the uploads already saved, by content key
+    def uploads_path(self):
+        return os.path.join(self.root, 'uploads.parquet')
+
+    # Function to get which of the given upload keys were already saved to this history
+    def recorded_uploads(self, keys):
+        keys, path = list(keys), self.uploads_path()
+        if not keys or not os.path.exists(path):
+            return set()
+        return set(pd.read_parquet(path, filters=[('upload', 'in', keys)])['upload'])
+
+    # Function to record upload keys as saved, so the same content is not saved again in any session
+    def record_uploads(self, keys):
+        path = self.uploads_path()
+        stored = pd.read_parquet(path)['upload'].tolist() if os.path.exists(path) else []
+        write_parquet(path, pd.DataFrame({'upload': sorted(set(stored) | set(keys))}))
+
+    # Function to get the directory of the materialized totals
+    def summaries_root(self):
+        return os.path.join(self.root, 'summaries')
+
+    # Function to get the file of one year of a kind of totals
+    def summary_path(self, kind, year):
+        return os.path.join(self.summaries_root(), kind, f"{year:04d}.parquet")
+
+    # Function to check if the totals are kept for this history, in the current layout
+    def has_summaries(self):
+        version_path = os.path.join(self.summaries_root(), 'VERSION')
+        if not os.path.exists(version_path):
+            return False
+        with open(version_path) as version_file:
+            return version_file.read().strip() == str(SUMMARIES_VERSION)
+
+    # Function to list the years stored for a kind of totals
+    def summary_years(self, kind):
+        kind_dir = os.path.join(self.summaries_root(), kind)
+        if not os.path.isdir(kind_dir):
+            return []
+        return sorted(int(file_name[:-len('.parquet')]) for file_name in os.listdir(kind_dir)
+                      if file_name.endswith('.parquet') and file_name[:-len('.parquet')].isdigit())
+
+    # Function to read the stored totals of a kind, for the given years (all of them by default) and optionally
+    # one employee or department
+    def read_summary(self, kind, years=None, entity=None):
+        stored_years = self.summary_years(kind)
+        if years is not None:
+            stored_years = [year for year in stored_years if year in set(years)]
+        filters = [(SUMMARY_KEY_COLUMNS[kind][0], '==', entity)] if entity is not None else None
+        frames = [pd.read_parquet(self.summary_path(kind, year), filters=filters) for year in stored_years]
+        frames = [frame for frame in frames if not frame.empty]
+        if not frames:
+            return pd.DataFrame()
+        return pd.concat(frames, ignore_index=True)
+
+    # Function to replace cells of the weekly and monthly totals, rewriting only the years they fall in, along
+    # with the rollups of those years
+    def write_summaries(self, weekly_df, monthly_df):
+        for kind, summary in (('weekly', weekly_df), ('monthly', monthly_df)):
+            if summary.empty:
+                continue
+            key_columns = list(SUMMARY_KEY_COLUMNS[kind])
+            for year, year_df in summary.groupby('An', sort=True):
+                path = self.summary_path(kind, int(year))
+                if os.path.exists(path):
+                    stored = drop_replaced_rows(pd.read_parquet(path), year_df, key_columns)
+                    year_df = pd.concat([stored, year_df], ignore_index=True)
+                write_parquet(path, year_df.sort_values(key_columns).reset_index(drop=True))
+            self.write_rollups(kind, sorted(int(year) for year in summary['An'].dropna().unique()))
+
+        os.makedirs(self.summaries_root(), exist_ok=True)
+        with open(os.path.join(self.summaries_root(), 'VERSION'), 'w') as version_file:
+            version_file.write(str(SUMMARIES_VERSION))
+
+    # Function to recompute, for the given years, the rollups of a kind of totals (and the rollups of those)
+    def write_rollups(self, source_kind, years):
+        for kind, rollup_source in ROLLUP_SOURCES.items():
+            if rollup_source != source_kind:
+                continue
+            for year in years:
+                rolled = roll_up(self.read_summary(source_kind, [year]), SUMMARY_KEY_COLUMNS[kind])
+                path = self.summary_path(kind, year)
+                if not rolled.empty:
+                    write_parquet(path, rolled)
+                elif os.path.exists(path):
+                    os.remove(path)
+            self.write_rollups(kind, years)
+
+    # Function to recompute all the totals from the stored daily rows
+    def rebuild_summaries(self):
+        shutil.rmtree(self.summaries_root(), ignore_errors=True)
+        self.write_summaries(*summarize_daily_rows(self.load(columns=SUMMARY_SOURCE_COLUMNS)))
+
+    # Function to load a kind of totals for the given years (all of them by default) and optionally one employee or
+    # department, without reading the daily rows
+    def load_summary(self, kind, years=None, entity=None):
+        if not self.has_summaries() and not self.is_empty():
+            self.rebuild_summaries()
+        return self.read_summary(kind, years, entity)
+
+
+# Columns of the SQLite attendance table, by daily frame column
+SQLITE_COLUMNS = {
+    'Angajat': 'employee',
+    'Departament': 'department',
+    'ID Legitimație': 'badge',
+    'Zi': 'weekday',
+    'Data': 'date_text',
+    'Data_Obiect': 'day',
+    'Minut Sosire': 'entry_minute',
+    'Minut Plecare': 'exit_minute',
+    'Durata (Ore)': 'hours',
+    'Ore Standard': 'standard_hours',
+    'Diferență': 'difference',
+    'An': 'year',
+    'Luna': 'month',
+    'Luna_Nume': 'month_name',
+    'Săptămână': 'week'
+}
+
+# Columns of the SQLite totals tables, by summary frame column
+SQLITE_WEEKLY_COLUMNS = {
+    'Angajat': 'employee',
+    'Departament': 'department',
+    'An': 'year',
+    'Săptămână': 'week',
+    'Interval': 'interval_label',
+    'Ore Totale': 'hours',
+    'Ore Standard': 'standard_hours',
+    'Diferență': 'difference'
+}
+
+SQLITE_MONTHLY_COLUMNS = {
+    'Angajat': 'employee',
+    'Departament': 'department',
+    'An': 'year',
+    'Luna': 'month',
+    'Luna_Nume': 'month_name',
+    'Ore Totale': 'hours',
+    'Ore Standard': 'standard_hours',
+    'Diferență': 'difference',
+    'Zile Lucrătoare': 'working_days'
+}
+
+SQLITE_YEARLY_COLUMNS = {
+    'Angajat': 'employee',
+    'Departament': 'department',
+    'An': 'year',
+    'Ore Totale': 'hours',
+    'Ore Standard': 'standard_hours',
+    'Diferență': 'difference'
+}
+
+SQLITE_DEPARTMENT_WEEKLY_COLUMNS = {
+    'Departament': 'department',
+    'An': 'year',
+    'Săptămână': 'week',
+    'Angajați': 'employees',
+    'Ore Totale': 'hours',
+    'Ore Standard': 'standard_hours',
+    'Diferență': 'difference'
+}
+
+SQLITE_DEPARTMENT_MONTHLY_COLUMNS = {
+    'Departament': 'department',
+    'An': 'year',
+    'Luna': 'month',
+    'Angajați': 'employees',
+    'Ore Totale': 'hours',
+    'Ore Standard': 'standard_hours',
+    'Diferență': 'difference'
+}
+
+SQLITE_DEPARTMENT_YEARLY_COLUMNS = {
+    'Departament': 'department',
+    'An': 'year',
+    'Angajați': 'employees',
+    'Ore Totale': 'hours',
+    'Ore Standard': 'standard_hours',
+    'Diferență': 'difference'
+}
+
+# Totals tables and their columns, by kind
+SQLITE_SUMMARIES = {
+    'weekly': ('weekly_summary', SQLITE_WEEKLY_COLUMNS),
+    'monthly': ('monthly_summary', SQLITE_MONTHLY_COLUMNS),
+    'yearly': ('yearly_summary', SQLITE_YEARLY_COLUMNS),
+    'department_weekly': ('department_weekly_summary', SQLITE_DEPARTMENT_WEEKLY_COLUMNS),
+    'department_monthly': ('department_monthly_summary', SQLITE_DEPARTMENT_MONTHLY_COLUMNS),
+    'department_yearly': ('department_yearly_summary', SQLITE_DEPARTMENT_YEARLY_COLUMNS)
+}
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS attendance (
+    badge TEXT NOT NULL,
+    day TEXT NOT NULL,
+    employee TEXT NOT NULL,
+    department TEXT,
+    weekday TEXT,
+    date_text TEXT,
+    entry_minute INTEGER,
+    exit_minute INTEGER,
+    hours REAL,
+    standard_hours REAL,
+    difference REAL,
+    year INTEGER,
+    month INTEGER,
+    month_name TEXT,
+    week INTEGER,
+    PRIMARY KEY (badge, day, employee)
+);
+CREATE INDEX IF NOT EXISTS idx_attendance_employee ON attendance (employee, day);
+CREATE INDEX IF NOT EXISTS idx_attendance_department ON attendance (department, day);
+CREATE INDEX IF NOT EXISTS idx_attendance_day ON attendance (day);
+CREATE INDEX IF NOT EXISTS idx_attendance_month ON attendance (year, month);
+CREATE TABLE IF NOT EXISTS uploads (
+    upload TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS weekly_summary (
+    employee TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    department TEXT,
+    interval_label TEXT,
+    hours REAL,
+    standard_hours REAL,
+    difference REAL,
+    PRIMARY KEY (employee, year, week)
+);
+CREATE TABLE IF NOT EXISTS monthly_summary (
+    employee TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    department TEXT,
+    month_name TEXT,
+    hours REAL,
+    standard_hours REAL,
+    difference REAL,
+    working_days INTEGER,
+    PRIMARY KEY (employee, year, month)
+);
+CREATE TABLE IF NOT EXISTS yearly_summary (
+    employee TEXT NOT NULL,
+    department TEXT,
+    year INTEGER NOT NULL,
+    hours REAL,
+    standard_hours REAL,
+    difference REAL,
+    PRIMARY KEY (employee, year)
+);
+CREATE TABLE IF NOT EXISTS department_weekly_summary (
+    department TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    employees INTEGER,
+    hours REAL,
+    standard_hours REAL,
+    difference REAL,
+    PRIMARY KEY (department, year, week)
+);
+CREATE TABLE IF NOT EXISTS department_monthly_summary (
+    department TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    month INTEGER NOT NULL,
+    employees INTEGER,
+    hours REAL,
+    standard_hours REAL,
+    difference REAL,
+    PRIMARY KEY (department, year, month)
+);
+CREATE TABLE IF NOT EXISTS department_yearly_summary (
+    department TEXT NOT NULL,
+    year INTEGER NOT NULL,
+    employees INTEGER,
+    hours REAL,
+    standard_hours REAL,
+    difference REAL,
+    PRIMARY KEY (department, year)
+);
+"""
+
+
+# Function to insert or replace frame rows into a SQLite table, given the table columns by frame column
+def insert_rows(connection, table, df, column_map):
+    columns = [column for column in column_map if column in df.columns]
+
+    # Plain Python values, with None for missing ones
+    rows = df[columns].astype(object).where(df[columns].notna(), None)
+    sql_columns = ', '.join(column_map[column] for column in columns)
+    placeholders = ', '.join('?' * len(columns))
+    connection.executemany(
+        f"INSERT OR REPLACE INTO {table} ({sql_columns}) VALUES ({placeholders})",
+        rows.itertuples(index=False, name=None)
+    )
+
+
+class SqliteHistoryStore:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with self.connect() as connection:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.executescript(SQLITE_SCHEMA)
+
+    # Function to open a connection for a block, committed (or rolled back on error) and closed at its end; one
+    # per call, so Streamlit threads never share it
+    @contextmanager
+    def connect(self):
+        connection = sqlite3.connect(self.path)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    # Function to run a query and return the result with the frame column names (of the daily frame by default)
+    def query(self, sql, params=(), column_map=SQLITE_COLUMNS):
+        with self.connect() as connection:
+            result = pd.read_sql_query(sql, connection, params=params)
+
+        result = result.rename(columns={sql_column: column for column, sql_column in column_map.items()})
+        if 'Data_Obiect' in result.columns:
+            result['Data_Obiect'] = pd.to_datetime(result['Data_Obiect'].replace('', None))
+        for column in ('Minut Sosire', 'Minut Plecare'):
+            if column in result.columns:
+                result[column] = result[column].astype('Int16')
+        return result
+
+    # Function to build the SELECT list for a column projection
+    @staticmethod
+    def select_list(columns=None):
+        columns = columns or list(SQLITE_COLUMNS)
+        return ', '.join(SQLITE_COLUMNS[column] for column in columns)
+
+    # Function to check if the store holds any data
+    def is_empty(self):
+        return self.count() == 0
+
+    # Function to count the stored rows
+    def count(self):
+        with self.connect() as connection:
+            return connection.execute("SELECT COUNT(*) FROM attendance").fetchone()[0]
+
+    # Function to list the stored (year, month) pairs
+    def partitions(self):
+        with self.connect() as connection:
+            rows = connection.execute(
+                "SELECT DISTINCT COALESCE(year, 0), COALESCE(month, 0) FROM attendance ORDER BY 1, 2"
+            ).fetchall()
+        return [(int(year), int(month)) for year, month in rows]
+
+    # Function to load the given (year, month) pairs (all of them by default) with column projection
+    def load(self, partitions=None, columns=None):
+        sql = f"SELECT {self.select_list(columns)} FROM attendance"
+        params = []
+        if partitions is not None:
+            if not partitions:
+                return pd.DataFrame()
+            # One clause per month on the bare columns, so the (year, month) index answers them; the undated rows
+            # have no year
+            clauses = []
+            for year, month in partitions:
+                if (year, month) == UNDATED_PARTITION:
+                    clauses.append("year IS NULL")
+                else:
+                    clauses.append("(year = ? AND month = ?)")
+                    params += [int(year), int(month)]
+            sql += f" WHERE {' OR '.join(clauses)}"
+        return self.query(sql + " ORDER BY employee, day", params)
+
+    # Function to total the hours of each employee over day intervals ((first, last) pairs) in SQL, which reads only
+    # those days through the day index and returns one row per employee
+    def day_totals(self, day_ranges):
+        if not day_ranges:
+            return pd.DataFrame()
+        where = ' OR '.join(["day BETWEEN ? AND ?"] * len(day_ranges))
+        params = [day.strftime('%Y-%m-%d') for day_range in day_ranges for day in day_range]
+        # Along with MIN(day), SQLite takes the bare department column from the employee's first day
+        result = self.query(
+            "SELECT employee, department, MIN(day) AS first_day, SUM(hours) AS hours, "
+            f"SUM(standard_hours) AS standard_hours FROM attendance WHERE {where} GROUP BY employee ORDER BY employee",
+            params
+        )
+        if result.empty:
+            return pd.DataFrame()
+        return result.drop(columns=['first_day']).rename(columns={'Durata (Ore)': 'Ore Totale'})
+
+    # Function to add new rows; rows with the same badge, day and employee are replaced, and the totals of the
+    # touched weeks and months are recomputed along with them
+    def upsert(self, new_data):
+        # A history saved before the totals were kept gets them computed in full, once
+        rebuild = not self.has_summaries() and not self.is_empty()
+
+        rows = new_data.assign(Data_Obiect=pd.to_datetime(new_data['Data_Obiect']).dt.strftime('%Y-%m-%d').fillna(''))
+        with self.connect() as connection:
+            insert_rows(connection, 'attendance', rows, SQLITE_COLUMNS)
+
+        if rebuild:
+            self.rebuild_summaries()
+        else:
+            dates = pd.to_datetime(new_data['Data_Obiect']).dropna()
+            touched = set(zip(dates.dt.year.tolist(), dates.dt.month.tolist()))
+            daily = self.load(neighbour_months(touched), SUMMARY_SOURCE_COLUMNS)
+            self.write_summaries(*summarize_daily_rows(daily, new_data))
+
+    # Function to get which of the given upload keys were already saved to this history
+    def recorded_uploads(self, keys):
+        keys = list(keys)
+        if not keys:
+            return set()
+        with self.connect() as connection:
+            rows = connection.execute(
+                f"SELECT upload FROM uploads WHERE upload IN ({', '.join('?' * len(keys))})", keys
+            ).fetchall()
+        return {upload for upload, in rows}
+
+    # Function to record upload keys as saved, so the same content is not saved again in any session
+    def record_uploads(self, keys):
+        with self.connect() as connection:
+            connection.executemany("INSERT OR IGNORE INTO uploads (upload) VALUES (?)", [(key,) for key in keys])
+
+    # Function to check if the totals tables are kept for this database, in the current layout
+    # (PRAGMA user_version)
+    def has_summaries(self):
+        with self.connect() as connection:
+            return connection.execute("PRAGMA user_version").fetchone()[0] == SUMMARIES_VERSION
+
+    # Function to read the stored totals of a kind, for the given years (all of them by default) and optionally
+    # one employee or department (the first column of the table's key)
+    def read_summary(self, kind, years=None, entity=None):
+        table, column_map = SQLITE_SUMMARIES[kind]
+        conditions, params = [], []
+        if years is not None:
+            if not years:
+                return pd.DataFrame()
+            conditions.append("year IN ({})".format(', '.join('?' * len(years))))
+            params += [int(year) for year in years]
+        if entity is not None:
+            conditions.append(f"{column_map[SUMMARY_KEY_COLUMNS[kind][0]]} = ?")
+            params.append(entity)
+        sql = f"SELECT {', '.join(column_map.values())} FROM {table}"
+        if conditions:
+            sql += f" WHERE {' AND '.join(conditions)}"
+        order = ', '.join(column_map[column] for column in SUMMARY_KEY_COLUMNS[kind])
+        result = self.query(f"{sql} ORDER BY {order}", params, column_map)
+        return result if not result.empty else pd.DataFrame()
+
+    # Function to insert or replace cells of the weekly and monthly totals, along with the rollups of their years
+    def write_summaries(self, weekly_df, monthly_df):
+        for kind, summary in (('weekly', weekly_df), ('monthly', monthly_df)):
+            if summary.empty:
+                continue
+            table, column_map = SQLITE_SUMMARIES[kind]
+            with self.connect() as connection:
+                insert_rows(connection, table, summary, column_map)
+            self.write_rollups(kind, sorted(int(year) for year in summary['An'].dropna().unique()))
+
+        with self.connect() as connection:
+            connection.execute(f"PRAGMA user_version = {SUMMARIES_VERSION}")
+
+    # Function to recompute, for the given years, the rollups of a kind of totals (and the rollups of those)
+    def write_rollups(self, source_kind, years):
+        for kind, rollup_source in ROLLUP_SOURCES.items():
+            if rollup_source != source_kind:
+                continue
+            rolled = roll_up(self.read_summary(source_kind, years), SUMMARY_KEY_COLUMNS[kind])
+            table, column_map = SQLITE_SUMMARIES[kind]
+            with self.connect() as connection:
+                connection.execute(f"DELETE FROM {table} WHERE year IN ({', '.join('?' * len(years))})", years)
+                if not rolled.empty:
+                    insert_rows(connection, table, rolled, column_map)
+            self.write_rollups(kind, years)
+
+    # Function to recompute all the totals from the stored daily rows
+    def rebuild_summaries(self):
+        weekly_df, monthly_df = summarize_daily_rows(self.load(columns=SUMMARY_SOURCE_COLUMNS))
+        with self.connect() as connection:
+            for table, _ in SQLITE_SUMMARIES.values():
+                connection.execute(f"DELETE FROM {table}")
+        self.write_summaries(weekly_df, monthly_df)
+
+    # Function to load a kind of totals for the given years (all of them by default) and optionally one employee or
+    # department, without reading the daily rows
+    def load_summary(self, kind, years=None, entity=None):
+        if not self.has_summaries() and not self.is_empty():
+            self.rebuild_summaries()
+        return self.read_summary(kind, years, entity)
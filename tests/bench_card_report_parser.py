@@ -0,0 +1,67 @@
+"""Throughput of the streaming parser on a synthetic report of about 100k lines, and of the whole processing
+against the original parser on a smaller report (its backfill is quadratic per employee):
+
+    python tests/bench_card_report_parser.py [--employees 1000] [--weeks 50] [--min-lines-per-second N]
+
+The reports cover 2025, since the original parser fails on 29 February.
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import legacy_parser  # noqa: E402
+from attendance_core import process_attendance_data  # noqa: E402
+from card_report_parser import CardReportParser  # noqa: E402
+from synthetic_reports import generate_report  # noqa: E402
+
+
+# Function to run a function a few times and return its best time in seconds, with the result of the last run
+def best_time(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--employees', type=int, default=1000)
+    arg_parser.add_argument('--weeks', type=int, default=50)
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--legacy-employees', type=int, default=50,
+                            help="employees of the report processed by both parsers")
+    arg_parser.add_argument('--legacy-weeks', type=int, default=8, help="weeks of that report")
+    arg_parser.add_argument('--min-lines-per-second', type=float, default=0,
+                            help="fail when the parser is slower than this")
+    args = arg_parser.parse_args(argv)
+
+    report = generate_report(args.employees, date(2025, 1, 6), args.weeks, seed=1)
+    lines = report.split('\n')
+    parse_seconds, records = best_time(lambda: list(CardReportParser().parse(lines)), args.repeat)
+    process_seconds, (daily_df, *_) = best_time(lambda: process_attendance_data(lines), args.repeat)
+    lines_per_second = len(lines) / parse_seconds
+    print(f"report: {len(lines)} lines, {len(records)} records, {len(daily_df)} daily rows")
+    print(f"parse:   {parse_seconds:7.3f} s  {lines_per_second / 1000:8.0f}k lines/s")
+    print(f"process: {process_seconds:7.3f} s  {len(lines) / process_seconds / 1000:8.0f}k lines/s")
+
+    small_report = generate_report(args.legacy_employees, date(2025, 1, 6), args.legacy_weeks, seed=1)
+    small_lines = len(small_report.split('\n'))
+    legacy_seconds, _ = best_time(lambda: legacy_parser.process_attendance_data(small_report), 1)
+    new_seconds, _ = best_time(lambda: process_attendance_data(small_report), args.repeat)
+    print(f"{small_lines} lines: original {legacy_seconds:.3f} s, streaming {new_seconds:.3f} s "
+          f"({legacy_seconds / new_seconds:.0f}x)")
+
+    if lines_per_second < args.min_lines_per_second:
+        print(f"parser below {args.min_lines_per_second:.0f} lines/s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
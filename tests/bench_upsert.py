@@ -0,0 +1,75 @@
+"""Scaling of the keyed history upsert: dropping the stored rows replaced by new ones, for growing histories and
+batches of new rows (2000 employees over about five years):
+
+    python tests/bench_upsert.py [--history 100000 1000000 3000000] [--new 10000 50000] [--max-seconds S]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_store import HISTORY_KEY_COLUMNS, drop_replaced_rows  # noqa: E402
+
+EMPLOYEES = 2000
+DAYS = 2000
+
+
+# Function to generate history rows with random employees and days (keys repeat, like overlapping uploads)
+def history_rows(rng, count):
+    employees = rng.integers(0, EMPLOYEES, count)
+    return pd.DataFrame({
+        'Angajat': pd.Categorical.from_codes(employees, [f"NUME{i} PRENUME{i} {i}" for i in range(EMPLOYEES)]),
+        'ID Legitimație': pd.Categorical.from_codes(employees, [f"{100 + i}A{i}" for i in range(EMPLOYEES)]),
+        'Data_Obiect': pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, DAYS, count), unit='D'),
+        'Durata (Ore)': rng.random(count) * 10
+    })
+
+
+# Function to check the upsert against a plain MultiIndex anti-join on a small frame
+def check_against_multiindex(rng):
+    stored, new_rows = history_rows(rng, 20000), history_rows(rng, 3000)
+    keys = list(HISTORY_KEY_COLUMNS)
+    expected = stored[~pd.MultiIndex.from_frame(stored[keys]).isin(pd.MultiIndex.from_frame(new_rows[keys]))]
+    if not drop_replaced_rows(stored, new_rows).index.equals(expected.index):
+        raise AssertionError("drop_replaced_rows differs from the MultiIndex anti-join")
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument('--history', type=int, nargs='+', default=[100_000, 1_000_000, 3_000_000])
+    arg_parser.add_argument('--new', type=int, nargs='+', default=[10_000, 50_000])
+    arg_parser.add_argument('--repeat', type=int, default=3)
+    arg_parser.add_argument('--max-seconds', type=float, default=0,
+                            help="fail when an upsert takes longer than this (0: no limit)")
+    args = arg_parser.parse_args(argv)
+
+    rng = np.random.default_rng(0)
+    check_against_multiindex(rng)
+
+    slowest = 0.0
+    for history_count in args.history:
+        stored = history_rows(rng, history_count)
+        for new_count in args.new:
+            new_rows = history_rows(rng, new_count)
+            seconds = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                kept = drop_replaced_rows(stored, new_rows)
+                seconds.append(time.perf_counter() - started)
+            slowest = max(slowest, min(seconds))
+            print(f"history {history_count:>10,}  new {new_count:>7,}: {min(seconds):7.3f} s  "
+                  f"({history_count / min(seconds) / 1e6:5.1f}M rows/s, {history_count - len(kept):,} replaced)")
+
+    if args.max_seconds and slowest > args.max_seconds:
+        print(f"slowest upsert {slowest:.3f} s is over {args.max_seconds} s", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The modules of the app live in the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from history_store import ParquetHistoryStore, SqliteHistoryStore  # noqa: E402
+
+
+# An empty history of each engine
+@pytest.fixture(params=['parquet', 'sqlite'])
+def store(request, tmp_path):
+    if request.param == 'parquet':
+        return ParquetHistoryStore(str(tmp_path / 'history'))
+    return SqliteHistoryStore(str(tmp_path / 'history.db'))
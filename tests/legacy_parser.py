@@ -0,0 +1,421 @@
+"""Frozen copy of the report parsing of the original app (process_attendance_data and its helpers, as they were
+before the streaming parser), kept unchanged as the reference of the equivalence tests. Only the Streamlit error
+reporting is replaced by an exception."""
+import calendar
+import re
+from datetime import date, datetime, timedelta
+
+import pandas as pd
+
+
+class LegacyParserError(Exception):
+    pass
+
+
+# Romanian holidays by year
+ROMANIAN_HOLIDAYS = {
+    2024: [
+        "2024-01-01", "2024-01-02", "2024-01-24", 
+        "2024-05-01", "2024-05-03", "2024-05-05", "2024-05-06",
+        "2024-06-23", "2024-06-24", "2024-08-15",
+        "2024-11-30", "2024-12-01", "2024-12-25", "2024-12-26"
+    ],
+    2025: [
+        "2025-01-01", "2025-01-02", "2025-01-24",
+        "2025-04-18", "2025-04-20", "2025-04-21",
+        "2025-05-01", "2025-06-08", "2025-06-09",
+        "2025-08-15", "2025-11-30", "2025-12-01",
+        "2025-12-25", "2025-12-26"
+    ]
+}
+
+# Function to get holidays for a specific year
+def get_holidays_for_year(year):
+    if year in ROMANIAN_HOLIDAYS:
+        return ROMANIAN_HOLIDAYS[year]
+    
+    # If we don't have data for the requested year, extrapolate from 2025
+    extrapolated_holidays = []
+    for holiday in ROMANIAN_HOLIDAYS[2025]:
+        parts = holiday.split('-')
+        if len(parts) == 3:
+            new_date = f"{year}-{parts[1]}-{parts[2]}"
+            extrapolated_holidays.append(new_date)
+    return extrapolated_holidays
+
+# Function to check if a date is a holiday
+def is_holiday(check_date):
+    year = check_date.year
+    date_str = check_date.strftime("%Y-%m-%d")
+    return date_str in get_holidays_for_year(year)
+
+# Function to calculate working days in a month
+def calculate_working_days(year, month):
+    num_days = calendar.monthrange(year, month)[1]
+    working_days = 0
+    
+    for day in range(1, num_days + 1):
+        current_date = date(year, month, day)
+        if current_date.weekday() < 5:  # 0-4 are Monday-Friday
+            if not is_holiday(current_date):
+                working_days += 1
+    
+    return working_days
+
+# Function to calculate standard monthly hours
+def calculate_standard_monthly_hours(year, month):
+    num_days = calendar.monthrange(year, month)[1]
+    total_hours = 0
+    
+    for day in range(1, num_days + 1):
+        current_date = date(year, month, day)
+        weekday = current_date.weekday()
+        
+        # Skip weekends and holidays
+        if weekday >= 5 or is_holiday(current_date):
+            continue
+        
+        # Add hours based on day of week
+        if weekday == 4:  # Friday
+            total_hours += 6.0
+        else:  # Monday to Thursday
+            total_hours += 8.5
+    
+    return total_hours
+
+# Function to parse time strings
+def parse_time(time_str):
+    if pd.isna(time_str) or time_str == '':
+        return None
+    try:
+        return datetime.strptime(time_str.strip(), '%H:%M')
+    except:
+        return None
+
+# Function to calculate duration between times
+def calculate_duration(entry_time, exit_time):
+    if entry_time is None or exit_time is None:
+        return 0
+    
+    duration = exit_time - entry_time
+    hours = duration.total_seconds() / 3600
+    return round(hours, 2)
+
+# Function to convert date string to datetime
+def convert_date_string(date_str, year=None):
+    if pd.isna(date_str) or not date_str:
+        return None
+    
+    # Clean up the date string
+    date_str = date_str.strip()
+    
+    # Try different date formats
+    formats = ['%d %B %Y', '%d %B', '%d-%m-%Y', '%d/%m/%Y', '%Y-%m-%d']
+    
+    for fmt in formats:
+        try:
+            dt = datetime.strptime(date_str, fmt)
+            if '%Y' not in fmt and year:
+                # If year is not in the format, set it
+                dt = dt.replace(year=year)
+            return dt
+        except ValueError:
+            continue
+    
+    return None
+
+# Helper function to process employee data entries (removes duplication)
+def process_employee_entry(current_employee, department, badge_id, weekdays, dates, time_range, report_year):
+    data_entries = []
+    
+    for day_idx, (day, date_str, time_range_val) in enumerate(zip(weekdays, dates, time_range)):
+        if date_str:  # Check if date exists
+            date_obj = convert_date_string(date_str, report_year)
+            weekday_name = day
+            
+            if time_range_val and '-' in time_range_val:
+                entry_time_str, exit_time_str = time_range_val.split(' - ')
+                entry_time = parse_time(entry_time_str)
+                exit_time = parse_time(exit_time_str)
+                
+                if entry_time and exit_time:
+                    duration = calculate_duration(entry_time, exit_time)
+                    standard_duration = 0
+                    
+                    # Calculate standard hours based on weekday
+                    if weekday_name in ['Mon', 'Tue', 'Wed', 'Thu']:
+                        standard_duration = 8.5
+                    elif weekday_name == 'Fri':
+                        standard_duration = 6.0
+                    
+                    # Check if it's a holiday
+                    if date_obj and is_holiday(date_obj):
+                        standard_duration = 0
+                    
+                    data_entries.append({
+                        'Angajat': current_employee,
+                        'Departament': department,
+                        'ID Legitimație': badge_id,
+                        'Zi': weekday_name,
+                        'Data': date_str,
+                        'Data_Obiect': date_obj,
+                        'Ora Sosire': entry_time_str,
+                        'Ora Plecare': exit_time_str,
+                        'Durata (Ore)': duration,
+                        'Ore Standard': standard_duration,
+                        'Diferență': duration - standard_duration
+                    })
+            else:
+                # Date exists but no time range (absent day)
+                standard_duration = 0
+                if weekday_name in ['Mon', 'Tue', 'Wed', 'Thu']:
+                    standard_duration = 8.5
+                elif weekday_name == 'Fri':
+                    standard_duration = 6.0
+                
+                # Check if it's a holiday
+                if date_obj and is_holiday(date_obj):
+                    standard_duration = 0
+                
+                data_entries.append({
+                    'Angajat': current_employee,
+                    'Departament': department,
+                    'ID Legitimație': badge_id,
+                    'Zi': weekday_name,
+                    'Data': date_str,
+                    'Data_Obiect': date_obj,
+                    'Ora Sosire': '',
+                    'Ora Plecare': '',
+                    'Durata (Ore)': 0,
+                    'Ore Standard': standard_duration,
+                    'Diferență': -standard_duration
+                })
+    
+    return data_entries
+
+# Function to process attendance data
+def process_attendance_data(file_content):
+    try:
+        # Read CSV content
+        lines = file_content.strip().split('\n')
+        
+        # Extract date range from header
+        date_range_line = lines[1] if len(lines) > 1 else ""
+        date_match = re.search(r'from\s+(\d+\s+\w+\s+\d+)\s+to\s+(\d+\s+\w+\s+\d+)', date_range_line)
+        date_range = f"{date_match.group(1)} - {date_match.group(2)}" if date_match else "N/A"
+        
+        # Extract start and end dates
+        start_date_str = date_match.group(1) if date_match else None
+        end_date_str = date_match.group(2) if date_match else None
+        
+        start_date = convert_date_string(start_date_str)
+        end_date = convert_date_string(end_date_str)
+        report_year = start_date.year if start_date else datetime.now().year
+        
+        data = []
+        current_employee = None
+        department = None
+        badge_id = None
+        days_data = []
+        weekdays = None
+        dates = None
+        
+        for line in lines:
+            line = line.strip()
+            
+            # Skip empty lines
+            if not line:
+                continue
+            
+            # Check if this is an employee header line
+            employee_match = re.search(r',([^,]+\s+[^,]+\s+\d+),([^,]*),', line)
+            if employee_match:
+                # Process previous employee data if it exists
+                if current_employee and days_data:
+                    data_entries = process_employee_entry(current_employee, department, badge_id, weekdays, dates, days_data, report_year)
+                    data.extend(data_entries)
+                
+                # Set new employee data
+                current_employee = employee_match.group(1).strip()
+                department = employee_match.group(2).strip()
+                
+                # Extract badge ID
+                badge_match = re.search(r'(\d{3}[A-Z0-9]+)$', line)
+                badge_id = badge_match.group(1) if badge_match else "N/A"
+                
+                days_data = []
+                continue
+            
+            # Check if this is a weekday header line
+            if line.startswith('Mon,Tue,Wed,Thu,Fri,Sat,Sun'):
+                weekdays = line.split(',')
+                continue
+            
+            # Check if this is a date line
+            date_line_match = re.match(r'\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,\d+\s+\w+,', line)
+            if date_line_match:
+                dates = []
+                for date_str in line.split(','):
+                    date_str = date_str.strip()
+                    if date_str and re.match(r'\d+\s+\w+', date_str):
+                        dates.append(date_str)
+                    else:
+                        dates.append(None)
+                continue
+            
+            # Check if this is a time range line
+            time_range_match = re.match(r'(\d{1,2}:\d{2}\s+-\s+\d{1,2}:\d{2})?,(\d{1,2}:\d{2}\s+-\s+\d{1,2}:\d{2})?,', line)
+            if time_range_match:
+                days_data = line.split(',')
+                days_data = [d.strip() if d.strip() else None for d in days_data]
+                
+                # Process current employee data
+                if current_employee and days_data:
+                    data_entries = process_employee_entry(current_employee, department, badge_id, weekdays, dates, days_data, report_year)
+                    data.extend(data_entries)
+                
+                days_data = []
+                continue
+        
+        # Create DataFrame
+        df = pd.DataFrame(data)
+        
+        # Add missing working days for each employee
+        if not df.empty and start_date and end_date:
+            all_employees = df['Angajat'].unique()
+            
+            for employee in all_employees:
+                # Get department and badge ID for this employee
+                emp_df = df[df['Angajat'] == employee]
+                if not emp_df.empty:
+                    department = emp_df['Departament'].iloc[0] if 'Departament' in emp_df.columns else ""
+                    badge_id = emp_df['ID Legitimație'].iloc[0]
+                    
+                    current_date = start_date
+                    while current_date <= end_date:
+                        weekday_num = current_date.weekday()
+                        weekday_name = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'][weekday_num]
+                        date_str = current_date.strftime("%d %B")
+                        
+                        # Skip weekends
+                        if weekday_num < 5:
+                            # Check if this day already exists for this employee
+                            date_exists = False
+                            for _, row in emp_df.iterrows():
+                                row_date = row.get('Data_Obiect')
+                                if row_date and row_date.date() == current_date.date():
+                                    date_exists = True
+                                    break
+                            
+                            if not date_exists:
+                                # Calculate standard hours
+                                standard_duration = 0
+                                if weekday_name in ['Mon', 'Tue', 'Wed', 'Thu']:
+                                    standard_duration = 8.5
+                                elif weekday_name == 'Fri':
+                                    standard_duration = 6.0
+                                
+                                # Check if it's a holiday
+                                if is_holiday(current_date):
+                                    standard_duration = 0
+                                
+                                # Add the missing day
+                                new_row = {
+                                    'Angajat': employee,
+                                    'Departament': department,
+                                    'ID Legitimație': badge_id,
+                                    'Zi': weekday_name,
+                                    'Data': date_str,
+                                    'Data_Obiect': current_date,
+                                    'Ora Sosire': '',
+                                    'Ora Plecare': '',
+                                    'Durata (Ore)': 0,
+                                    'Ore Standard': standard_duration,
+                                    'Diferență': -standard_duration
+                                }
+                                df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
+                        
+                        current_date += timedelta(days=1)
+        
+        # Extract year, month info and add them as columns
+        if not df.empty and 'Data_Obiect' in df.columns:
+            df['An'] = df['Data_Obiect'].apply(lambda x: x.year if x else None)
+            df['Luna'] = df['Data_Obiect'].apply(lambda x: x.month if x else None)
+            df['Luna_Nume'] = df['Data_Obiect'].apply(lambda x: x.strftime('%B') if x else None)
+            df['Săptămână'] = df['Data_Obiect'].apply(lambda x: x.isocalendar()[1] if x else None)
+        
+        # Sort DataFrame by employee and date
+        if 'Data_Obiect' in df.columns and not df.empty:
+            df = df.sort_values(['Angajat', 'Data_Obiect']).reset_index(drop=True)
+        
+        # Calculate weekly totals for each employee
+        weekly_data = []
+        
+        if not df.empty and 'Săptămână' in df.columns:
+            for (employee, year, week), week_df in df.groupby(['Angajat', 'An', 'Săptămână']):
+                if pd.isna(year) or pd.isna(week):
+                    continue
+                    
+                total_hours = week_df['Durata (Ore)'].sum()
+                total_standard_hours = week_df['Ore Standard'].sum()
+                
+                # Get department
+                department = week_df['Departament'].iloc[0] if 'Departament' in week_df.columns else ""
+                
+                # Get the first and last date of the week
+                dates = sorted(week_df['Data_Obiect'].dropna())
+                week_start = dates[0].strftime('%d %b') if dates else ""
+                week_end = dates[-1].strftime('%d %b') if dates else ""
+                week_range = f"{week_start} - {week_end}" if week_start and week_end else f"Săpt. {week}"
+                
+                weekly_data.append({
+                    'Angajat': employee,
+                    'Departament': department,
+                    'An': year,
+                    'Săptămână': week,
+                    'Interval': week_range,
+                    'Ore Totale': total_hours,
+                    'Ore Standard': total_standard_hours,
+                    'Diferență': total_hours - total_standard_hours
+                })
+        
+        weekly_df = pd.DataFrame(weekly_data)
+        
+        # Calculate monthly totals
+        monthly_data = []
+        
+        if not df.empty and 'Luna' in df.columns and 'An' in df.columns:
+            for (employee, year, month), month_df in df.groupby(['Angajat', 'An', 'Luna']):
+                if pd.isna(year) or pd.isna(month):
+                    continue
+                    
+                # Calculate actual hours worked
+                total_hours = month_df['Durata (Ore)'].sum()
+                
+                # Calculate standard hours for the month
+                standard_hours = calculate_standard_monthly_hours(int(year), int(month))
+                
+                # Get department
+                department = month_df['Departament'].iloc[0] if 'Departament' in month_df.columns else ""
+                
+                # Get month name
+                month_name = month_df['Luna_Nume'].iloc[0] if not month_df['Luna_Nume'].isna().all() else ""
+                
+                monthly_data.append({
+                    'Angajat': employee,
+                    'Departament': department,
+                    'An': int(year),
+                    'Luna': int(month),
+                    'Luna_Nume': month_name,
+                    'Ore Totale': total_hours,
+                    'Ore Standard': standard_hours,
+                    'Diferență': total_hours - standard_hours,
+                    'Zile Lucrătoare': calculate_working_days(int(year), int(month))
+                })
+        
+        monthly_df = pd.DataFrame(monthly_data)
+        
+        return df, weekly_df, monthly_df, date_range, report_year
+    except Exception as e:
+        # The app reported the error with st.error() and returned empty frames
+        raise LegacyParserError(e) from e
@@ -0,0 +1,40 @@
+"""Synthetic "Report by first and last card presenting per calendar day" exports for the tests and benchmarks."""
+import random
+from datetime import timedelta
+
+
+# Function to generate a report of whole weeks starting on a Monday: every employee gets a header, the weekday
+# line and, per week, a date line and a time-range line. Some working days are absent, some whole weeks are
+# missing (the backfill adds them) and, when malformed cells are given, some time cells are replaced by them
+def generate_report(employees, start, weeks, seed=0, absent_rate=0.1, missing_week_rate=0.05, malformed=(),
+                    malformed_rate=0.02):
+    rng = random.Random(seed)
+    end = start + timedelta(days=7 * weeks - 1)
+    lines = ["Report by first and last card presenting per calendar day",
+             f"from {start.day} {start.strftime('%B %Y')} to {end.day} {end.strftime('%B %Y')}",
+             ""]
+
+    for employee in range(employees):
+        lines.append(f",NUME{employee} PRENUME{employee} {100 + employee},DEPT{employee % 3},,,,"
+                     f"{100 + employee}A{employee}")
+        lines.append("Mon,Tue,Wed,Thu,Fri,Sat,Sun")
+        for week in range(weeks):
+            if rng.random() < missing_week_rate:
+                continue
+            days = [start + timedelta(days=7 * week + offset) for offset in range(7)]
+            lines.append(",".join(f"{day.day} {day.strftime('%B')}" for day in days))
+
+            cells = []
+            for offset in range(7):
+                if offset >= 5 or rng.random() < absent_rate:
+                    cells.append("")
+                # The first two cells decide whether the line is recognised as a time line, so they stay valid
+                elif malformed and offset >= 2 and rng.random() < malformed_rate:
+                    cells.append(rng.choice(malformed))
+                else:
+                    entry = rng.randint(7 * 60 + 30, 9 * 60 + 30)
+                    exit = entry + rng.randint(300, 600)
+                    cells.append(f"{entry // 60:02d}:{entry % 60:02d} - {exit // 60:02d}:{exit % 60:02d}")
+            lines.append(",".join(cells))
+        lines.append("")
+    return "\n".join(lines)
@@ -0,0 +1,124 @@
+"""Merging the results of overlapping reports, and where batches run their process pool."""
+import sys
+import types
+from datetime import date, timedelta
+
+import attendance_batch
+from attendance_batch import BatchSource, merge_results, process_batch, process_batch_in_worker
+from attendance_core import process_attendance_data
+
+
+# Function to write a one-employee report over whole weeks from a Monday, with {day: 'HH:MM - HH:MM'} times
+def employee_report(start, weeks, times):
+    end = start + timedelta(days=7 * weeks - 1)
+    lines = ["Report by first and last card presenting per calendar day",
+             f"from {start.day} {start.strftime('%B %Y')} to {end.day} {end.strftime('%B %Y')}",
+             "",
+             ",POPESCU ION 101,IT,,,,101A7",
+             "Mon,Tue,Wed,Thu,Fri,Sat,Sun"]
+    for week in range(weeks):
+        days = [start + timedelta(days=7 * week + offset) for offset in range(7)]
+        if not any(day in times for day in days):
+            # A week without any card presenting is left out of the report, and backfilled as absent
+            continue
+        lines.append(",".join(f"{day.day} {day.strftime('%B')}" for day in days))
+        lines.append(",".join(times.get(day, '') for day in days))
+    return "\n".join(lines)
+
+
+def daily_rows(start, weeks, punched_days):
+    report = employee_report(start, weeks, {day: '08:30 - 17:00' for day in punched_days})
+    return process_attendance_data(report)[0]
+
+
+WEEK_ONE = [date(2025, 1, 6) + timedelta(days=offset) for offset in range(5)]
+WEEK_TWO = [date(2025, 1, 13) + timedelta(days=offset) for offset in range(5)]
+
+
+def hours_by_day(daily_df):
+    return dict(zip(daily_df['Data_Obiect'].dt.date, daily_df['Durata (Ore)']))
+
+
+def test_backfilled_absence_does_not_replace_punched_day():
+    # Report A has 6-10 January punched; report B covers 6-17 January but only has 13-17 January punched
+    report_a = daily_rows(date(2025, 1, 6), 1, WEEK_ONE)
+    report_b = daily_rows(date(2025, 1, 6), 2, WEEK_TWO)
+    assert report_b[report_b['Data_Obiect'].dt.date.isin(WEEK_ONE)]['Minut Sosire'].isna().all()
+
+    for frames in ([report_a, report_b], [report_b, report_a]):
+        daily_df, weekly_df, _, _, _ = merge_results(frames)
+        # Both weeks, weekends included, once each
+        assert len(daily_df) == 14
+        hours = hours_by_day(daily_df)
+        assert [hours[day] for day in WEEK_ONE + WEEK_TWO] == [8.5] * 10
+        assert weekly_df['Ore Totale'].tolist() == [42.5, 42.5]
+
+
+def test_later_report_wins_between_punched_days():
+    earlier = daily_rows(date(2025, 1, 6), 1, WEEK_ONE)
+    later = process_attendance_data(employee_report(date(2025, 1, 6), 1,
+                                                    {day: '09:00 - 17:00' for day in WEEK_ONE}))[0]
+    hours = hours_by_day(merge_results([earlier, later])[0])
+    assert [hours[day] for day in WEEK_ONE] == [8.0] * 5
+
+
+def test_absent_in_both_reports_stays_absent():
+    report_a = daily_rows(date(2025, 1, 6), 1, WEEK_ONE[:3])
+    report_b = daily_rows(date(2025, 1, 6), 1, WEEK_ONE[:2])
+    daily_df = merge_results([report_a, report_b])[0]
+
+    hours = hours_by_day(daily_df)
+    assert [hours[day] for day in WEEK_ONE] == [8.5, 8.5, 8.5, 0, 0]
+    assert daily_df['Data_Obiect'].is_unique
+
+
+def batch_sources():
+    return [BatchSource(f"raport{week}.csv",
+                        employee_report(date(2025, 1, 6), 2, {day: '08:30 - 17:00' for day in days}).encode())
+            for week, days in enumerate([WEEK_ONE, WEEK_TWO])]
+
+
+def record_progress(progress):
+    return lambda done, total, label: progress.append((done, total, label))
+
+
+def test_single_worker_batch_starts_no_processes(monkeypatch):
+    def no_process(*args, **kwargs):
+        raise AssertionError("a process was started")
+    monkeypatch.setattr(attendance_batch, 'ProcessPoolExecutor', no_process)
+    monkeypatch.setattr(attendance_batch.subprocess, 'Popen', no_process)
+
+    progress = []
+    (daily_df, *_), errors = process_batch_in_worker(batch_sources(), max_workers=1,
+                                                     progress_callback=record_progress(progress))
+    assert not errors and [done for done, _, _ in progress] == [1, 2]
+    assert [hours_by_day(daily_df)[day] for day in WEEK_ONE + WEEK_TWO] == [8.5] * 10
+
+
+def test_pool_matches_in_process_batch():
+    sources = batch_sources()
+    (pooled, *_), errors = process_batch(sources, max_workers=2)
+    assert not errors
+    (in_process, *_), _ = process_batch(sources, max_workers=1)
+    assert pooled.equals(in_process)
+
+
+def test_worker_process_batch_does_not_run_the_callers_main(tmp_path, monkeypatch):
+    # Like Streamlit, the caller's __main__ is a module made for the app script: pool processes spawned from it
+    # would run that script first
+    marker = tmp_path / 'app_ran'
+    script = tmp_path / 'app.py'
+    script.write_text(f"open({str(marker)!r}, 'w').close()\n")
+    app_main = types.ModuleType('__main__')
+    app_main.__file__ = str(script)
+    monkeypatch.setitem(sys.modules, '__main__', app_main)
+
+    sources = batch_sources() + [BatchSource('gol.xlsx', b'not a workbook')]
+    progress = []
+    (daily_df, *_), errors = process_batch_in_worker(sources, max_workers=2, progress_callback=record_progress(progress))
+
+    assert not marker.exists()
+    assert sorted(progress)[-1][:2] == (3, 3) and len(progress) == 3
+    assert [label for label, _ in errors] == ['gol.xlsx']
+    (in_process, *_), _ = process_batch(sources, max_workers=1)
+    assert daily_df.equals(in_process)
@@ -0,0 +1,94 @@
+"""The 'process' command of the batch CLI: a directory of reports processed into each output format."""
+import os
+import re
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from attendance_batch import list_sources, main, process_batch
+from synthetic_reports import generate_report
+
+# Files written by each output format
+OUTPUT_FILES = {
+    'csv': ['prezenta_zilnica.csv', 'sumar_saptamanal.csv', 'sumar_lunar.csv'],
+    'parquet': ['prezenta_zilnica.parquet', 'sumar_saptamanal.parquet', 'sumar_lunar.parquet'],
+    'xlsx': ['raport_prezenta.xlsx'],
+}
+
+
+# Function to write three overlapping reports, one of them spanning New Year, into a directory
+@pytest.fixture
+def report_paths(tmp_path):
+    reports_dir = tmp_path / 'rapoarte'
+    reports_dir.mkdir()
+    paths = []
+    for index, (start, weeks) in enumerate([(date(2024, 11, 25), 3), (date(2024, 12, 9), 4), (date(2025, 1, 6), 2)]):
+        path = reports_dir / f"raport{index}.csv"
+        path.write_text(generate_report(5, start, weeks, seed=index), encoding='utf-8')
+        paths.append(str(path))
+    return paths
+
+
+# Function to process the reports in this process, as the CLI should
+def expected_results(paths):
+    (daily_df, weekly_df, monthly_df, _, _), errors = process_batch(
+        [source for path in paths for source in list_sources(path, path)], max_workers=1)
+    assert not errors
+    return daily_df, weekly_df, monthly_df
+
+
+# Function to run the 'process' command and return its exit code with the paths it printed
+def run_cli(capsys, paths, out_dir, *options):
+    exit_code = main(['process', *paths, '--out', str(out_dir), '--workers', '1', '--quiet', *options])
+    return exit_code, capsys.readouterr().out.splitlines()
+
+
+@pytest.mark.parametrize('output_format', ['csv', 'parquet', 'xlsx'])
+def test_each_output_format(tmp_path, capsys, report_paths, output_format):
+    out_dir = tmp_path / 'rezultate'
+    exit_code, printed = run_cli(capsys, report_paths, out_dir, '--format', output_format)
+
+    assert exit_code == 0
+    assert printed == [str(out_dir / name) for name in OUTPUT_FILES[output_format]]
+    assert sorted(os.listdir(out_dir)) == sorted(OUTPUT_FILES[output_format])
+    daily_df, weekly_df, monthly_df = expected_results(report_paths)
+
+    if output_format == 'parquet':
+        # The frames as processed, entry/exit kept as minutes
+        for name, expected in zip(OUTPUT_FILES['parquet'], (daily_df, weekly_df, monthly_df)):
+            pd.testing.assert_frame_equal(pd.read_parquet(out_dir / name), expected)
+    elif output_format == 'csv':
+        # Entry/exit as 'HH:MM', like the app downloads
+        daily = pd.read_csv(out_dir / 'prezenta_zilnica.csv')
+        assert len(daily) == len(daily_df)
+        assert 'Minut Sosire' not in daily.columns
+        clocks = daily['Ora Sosire'].dropna()
+        assert not clocks.empty and clocks.map(lambda value: bool(re.fullmatch(r'\d\d:\d\d', value))).all()
+        for name, expected in zip(OUTPUT_FILES['csv'][1:], (weekly_df, monthly_df)):
+            written = pd.read_csv(out_dir / name)
+            assert written.columns.tolist() == expected.columns.tolist()
+            assert written['Ore Totale'].tolist() == pytest.approx(expected['Ore Totale'].tolist())
+    else:
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(out_dir / 'raport_prezenta.xlsx', read_only=True)
+        try:
+            assert workbook.sheetnames == ['Zilnic', 'Săptămânal', 'Lunar', 'Sărbători Legale']
+            for sheet_name, expected in zip(workbook.sheetnames, (daily_df, weekly_df, monthly_df)):
+                assert workbook[sheet_name].max_row == len(expected) + 1
+        finally:
+            workbook.close()
+
+
+def test_failed_report_is_reported_and_the_rest_written(tmp_path, capsys, report_paths):
+    broken = tmp_path / 'rapoarte' / 'stricat.xlsx'
+    broken.write_bytes(b'not a workbook')
+    out_dir = tmp_path / 'rezultate'
+
+    exit_code = main(['process', *report_paths, str(broken), '--out', str(out_dir), '--workers', '1', '--quiet'])
+    captured = capsys.readouterr()
+
+    assert exit_code == 1
+    assert "Eroare la procesarea stricat.xlsx" in captured.err
+    assert len(pd.read_csv(out_dir / 'prezenta_zilnica.csv')) == len(expected_results(report_paths)[0])
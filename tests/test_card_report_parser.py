@@ -0,0 +1,165 @@
+"""Equivalence of the streaming parser (through process_attendance_data) with the frozen original parser, on
+generated reports."""
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+
+import legacy_parser
+from attendance_core import ROMANIAN_MONTH_NAMES, format_clock_columns, process_attendance_data
+from card_report_parser import CardRecord, CardReportParser
+from synthetic_reports import generate_report
+
+ENGLISH_MONTH_NAMES = dict(zip(ROMANIAN_MONTH_NAMES, [date(2000, month, 1).strftime('%B') for month in range(1, 13)]))
+
+
+# Function to bring a frame to plain column types, so the compact types of the new frames compare equal to the
+# values of the legacy ones; entry/exit minutes are shown as 'HH:MM' and month names in English, like before
+def comparable(df):
+    if 'Minut Sosire' in df.columns:
+        df = format_clock_columns(df)
+    columns = {}
+    for name in df.columns:
+        column = df[name]
+        if pd.api.types.is_datetime64_any_dtype(column):
+            columns[name] = column.astype('datetime64[ns]')
+        elif pd.api.types.is_numeric_dtype(column) and not pd.api.types.is_bool_dtype(column):
+            columns[name] = column.astype(float)
+        else:
+            columns[name] = column.astype(object)
+    df = pd.DataFrame(columns)
+    if 'Luna_Nume' in df.columns:
+        df['Luna_Nume'] = df['Luna_Nume'].replace(ENGLISH_MONTH_NAMES)
+    return df.reset_index(drop=True)
+
+
+# Function to compare the results of both parsers: daily, weekly and monthly frames, date range and year
+def assert_same_results(legacy, new):
+    for legacy_df, new_df in zip(legacy[:3], new[:3]):
+        pd.testing.assert_frame_equal(comparable(new_df), comparable(legacy_df), check_dtype=False)
+    assert tuple(new[3:]) == tuple(legacy[3:])
+
+
+# Function to correct the dates the legacy parser got wrong, given {day cell: right date}: its rows dated
+# otherwise get the right date and calendar columns, and replace the absence the backfill added for that day
+def redate_legacy_rows(legacy_df, dates):
+    targets = legacy_df['Data'].map(dates).astype('datetime64[ns]')
+    wrong = targets.notna() & (legacy_df['Data_Obiect'].astype('datetime64[ns]') != targets)
+
+    redated = legacy_df[wrong].assign(Data_Obiect=targets[wrong])
+    redated = redated.assign(An=redated['Data_Obiect'].dt.year, Luna=redated['Data_Obiect'].dt.month,
+                             Luna_Nume=redated['Data_Obiect'].dt.strftime('%B'),
+                             Săptămână=redated['Data_Obiect'].dt.isocalendar().week.astype(int))
+    kept = legacy_df[~wrong].astype({'Data_Obiect': 'datetime64[ns]'})
+    replaced = pd.MultiIndex.from_frame(kept[['Angajat', 'Data_Obiect']]).isin(
+        pd.MultiIndex.from_frame(redated[['Angajat', 'Data_Obiect']]))
+    merged = pd.concat([kept[~replaced], redated], ignore_index=True)
+    return merged.sort_values(['Angajat', 'Data_Obiect']).reset_index(drop=True)
+
+
+@pytest.mark.parametrize('start, weeks, seed', [
+    (date(2025, 3, 3), 4, 1),
+    # Orthodox Easter and 1 May
+    (date(2025, 4, 14), 3, 2),
+    # Good Friday, 1 May, Easter Monday and Children's Day in one report
+    (date(2024, 4, 29), 6, 3),
+    (date(2024, 11, 25), 5, 4),
+])
+def test_reports_match_legacy_parser(start, weeks, seed):
+    report = generate_report(8, start, weeks, seed=seed)
+    assert_same_results(legacy_parser.process_attendance_data(report), process_attendance_data(report))
+
+
+def test_absent_days_and_missing_weeks_match_legacy_parser():
+    report = generate_report(10, date(2025, 1, 6), 8, seed=5, absent_rate=0.4, missing_week_rate=0.3)
+    new = process_attendance_data(report)
+    assert new[0]['Minut Sosire'].isna().any()
+    assert_same_results(legacy_parser.process_attendance_data(report), new)
+
+
+def test_new_year_report_dates_january_in_next_year():
+    report = generate_report(6, date(2024, 12, 23), 3, seed=6)
+    legacy = legacy_parser.process_attendance_data(report)
+    new = process_attendance_data(report)
+
+    # The day cells carry no year: the original parser dated the January cells in the start year (and
+    # backfilled the real January days as absent)
+    legacy_daily = legacy[0]
+    assert (legacy_daily.loc[legacy_daily['Data'] == '2 January', 'Data_Obiect'].dt.year == 2024).any()
+
+    january = {f"{day} January": datetime(2025, 1, day) for day in range(1, 13)}
+    pd.testing.assert_frame_equal(comparable(new[0]), comparable(redate_legacy_rows(legacy_daily, january)),
+                                  check_dtype=False)
+    assert not (new[0]['Data_Obiect'] < pd.Timestamp(2024, 12, 23)).any()
+    assert set(zip(new[2]['An'], new[2]['Luna'])) == {(2024, 12), (2025, 1)}
+    assert tuple(new[3:]) == tuple(legacy[3:])
+
+
+def test_invalid_clock_cells_are_skipped_like_legacy_parser():
+    report = generate_report(10, date(2025, 3, 3), 4, seed=7, malformed=('25:10 - 26:00', '8:75 - 17:00', 'ab - cd'),
+                             malformed_rate=0.2)
+    assert '8:75 - 17:00' in report
+    assert_same_results(legacy_parser.process_attendance_data(report), process_attendance_data(report))
+
+
+@pytest.mark.parametrize('malformed, legacy_equivalent', [
+    # Without the spaces around the dash the times are still read
+    ('08:00-17:00', '08:00 - 17:00'),
+    # A cell without an exit time is skipped like any unreadable cell
+    ('08:00 -', 'ab - cd'),
+])
+def test_cells_that_aborted_legacy_parser(malformed, legacy_equivalent):
+    report = generate_report(10, date(2025, 3, 3), 4, seed=8, malformed=(malformed,), malformed_rate=0.2)
+    assert malformed + ',' in report
+    with pytest.raises(legacy_parser.LegacyParserError):
+        legacy_parser.process_attendance_data(report)
+
+    legacy = legacy_parser.process_attendance_data(report.replace(malformed + ',', legacy_equivalent + ','))
+    assert_same_results(legacy, process_attendance_data(report))
+
+
+def test_leap_day_is_dated():
+    report = generate_report(8, date(2024, 2, 19), 3, seed=9, missing_week_rate=0)
+
+    # The original parser could not date 29 February (strptime defaults to 1900), and the undated rows then
+    # failed the whole report
+    with pytest.raises(legacy_parser.LegacyParserError):
+        legacy_parser.process_attendance_data(report)
+    daily_df = comparable(process_attendance_data(report)[0])
+
+    # Outside the leap week, the same rows as the original parser with that week left out of the report (and
+    # backfilled as absent)
+    lines = report.split('\n')
+    leap_weeks = [index for index, line in enumerate(lines) if line.startswith('26 February,')]
+    without_leap_week = [line for index, line in enumerate(lines)
+                         if index not in leap_weeks and index - 1 not in leap_weeks]
+    legacy_daily_df = comparable(legacy_parser.process_attendance_data('\n'.join(without_leap_week))[0])
+    leap_week = (daily_df['Data_Obiect'] >= datetime(2024, 2, 26)) & (daily_df['Data_Obiect'] <= datetime(2024, 3, 3))
+    legacy_leap_week = legacy_daily_df['Data_Obiect'].between(datetime(2024, 2, 26), datetime(2024, 3, 3))
+    pd.testing.assert_frame_equal(daily_df[~leap_week].reset_index(drop=True),
+                                  legacy_daily_df[~legacy_leap_week].reset_index(drop=True), check_dtype=False)
+
+    # 29 February is dated and keeps the times of its cell
+    leap_days = daily_df[daily_df['Data'] == '29 February']
+    assert (leap_days['Data_Obiect'] == datetime(2024, 2, 29)).all()
+    leap_cells = [lines[index + 1].split(',')[3] for index in leap_weeks]
+    assert [f"{entry} - {exit}" if entry else '' for entry, exit in
+            zip(leap_days['Ora Sosire'], leap_days['Ora Plecare'])] == leap_cells
+
+
+def test_parser_yields_typed_records():
+    lines = ["Report by first and last card presenting per calendar day",
+             "from 3 March 2025 to 9 March 2025",
+             ",POPESCU ION 101,IT,,,,101A7",
+             "Mon,Tue,Wed,Thu,Fri,Sat,Sun",
+             "3 March,4 March,5 March,6 March,7 March,8 March,9 March",
+             "08:05 - 16:35,,9:00 - 12:30,,,,"]
+    parser = CardReportParser()
+    records = list(parser.parse(lines))
+
+    assert parser.date_range == "3 March 2025 - 9 March 2025"
+    assert records[0] == CardRecord('POPESCU ION 101', 'IT', '101A7', 'Mon', '3 March', datetime(2025, 3, 3),
+                                    8 * 60 + 5, 16 * 60 + 35)
+    assert records[1].entry_minute is None and records[1].exit_minute is None
+    assert (records[2].entry_minute, records[2].exit_minute) == (9 * 60, 12 * 60 + 30)
+    assert [record.weekday for record in records] == ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
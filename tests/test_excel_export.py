@@ -0,0 +1,89 @@
+"""Excel export read back: sheet names, headers, cell values and the split of long tables over several sheets."""
+import io
+from datetime import date, datetime, time
+
+import pandas as pd
+import pytest
+
+import excel_export
+from attendance_core import process_attendance_data
+from excel_export import report_sheets, workbook_bytes, write_workbook
+from synthetic_reports import generate_report
+
+openpyxl = pytest.importorskip('openpyxl')
+pytest.importorskip('xlsxwriter')
+
+
+# Function to read every sheet of a workbook as {sheet name: list of row tuples}, the header first
+def read_back(source):
+    workbook = openpyxl.load_workbook(source, read_only=True)
+    try:
+        return {name: list(workbook[name].iter_rows(values_only=True)) for name in workbook.sheetnames}
+    finally:
+        workbook.close()
+
+
+# Function to process a report of 25 November - 15 December 2024
+def report_frames():
+    return process_attendance_data(generate_report(4, date(2024, 11, 25), 3, seed=5))[:3]
+
+
+def test_report_sheets_headers_and_values():
+    daily_df, weekly_df, monthly_df = report_frames()
+    sheets = read_back(io.BytesIO(workbook_bytes(report_sheets(daily_df, weekly_df, monthly_df))))
+
+    assert list(sheets) == ['Zilnic', 'Săptămânal', 'Lunar', 'Sărbători Legale']
+    # Entry/exit minutes are shown under their clock names
+    assert list(sheets['Zilnic'][0]) == [
+        'Angajat', 'Departament', 'ID Legitimație', 'Zi', 'Data', 'Data_Obiect', 'Ora Sosire', 'Ora Plecare',
+        'Durata (Ore)', 'Ore Standard', 'Diferență', 'An', 'Luna', 'Luna_Nume', 'Săptămână']
+    assert list(sheets['Săptămânal'][0]) == weekly_df.columns.tolist()
+    assert list(sheets['Lunar'][0]) == monthly_df.columns.tolist()
+    for name, df in (('Zilnic', daily_df), ('Săptămânal', weekly_df), ('Lunar', monthly_df)):
+        assert len(sheets[name]) == len(df) + 1
+
+    # Native dates, clock times and numbers; blanks for the absent days
+    first = dict(zip(sheets['Zilnic'][0], sheets['Zilnic'][1]))
+    row = daily_df.iloc[0]
+    assert first['Angajat'] == row['Angajat']
+    assert first['Data_Obiect'] == datetime(2024, 11, 25)
+    assert first['Ora Sosire'] == time(*divmod(int(row['Minut Sosire']), 60))
+    assert first['Durata (Ore)'] == pytest.approx(row['Durata (Ore)'])
+    absent = [dict(zip(sheets['Zilnic'][0], values)) for values in sheets['Zilnic'][1:]]
+    assert any(values['Ora Sosire'] is None for values in absent)
+
+    # The holidays of 2024, the only year of the report
+    holidays = sheets['Sărbători Legale']
+    assert len(holidays) > 1 and all(values[0].year == 2024 for values in holidays[1:])
+
+
+def test_long_table_continues_on_further_sheets(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_export, 'MAX_SHEET_ROWS', 30)
+    monkeypatch.setattr(excel_export, 'WRITE_CHUNK_ROWS', 7)
+    daily_df = report_frames()[0]
+    assert len(daily_df) == 80
+    path = tmp_path / 'raport.xlsx'
+    write_workbook(str(path), {'Zilnic': daily_df, 'Gol': daily_df.head(0)})
+    sheets = read_back(path)
+
+    assert list(sheets) == ['Zilnic', 'Zilnic (2)', 'Zilnic (3)', 'Gol']
+    # Every part repeats the header, and together they hold the rows in order
+    header = sheets['Zilnic'][0]
+    rows = []
+    for name in ('Zilnic', 'Zilnic (2)', 'Zilnic (3)'):
+        assert sheets[name][0] == header
+        rows += sheets[name][1:]
+    assert [len(sheets[name]) - 1 for name in ('Zilnic', 'Zilnic (2)', 'Zilnic (3)')] == [30, 30, 20]
+    dates = [values[header.index('Data_Obiect')] for values in rows]
+    assert dates == daily_df['Data_Obiect'].dt.to_pydatetime().tolist()
+    # An empty table still gets its sheet, with the header only
+    assert sheets['Gol'] == [header]
+
+
+def test_long_sheet_names_are_cut_to_the_excel_limit(tmp_path, monkeypatch):
+    monkeypatch.setattr(excel_export, 'MAX_SHEET_ROWS', 2)
+    name = 'Înregistrări zilnice ale angajaților'
+    path = tmp_path / 'raport.xlsx'
+    write_workbook(str(path), {name: pd.DataFrame({'Ore': [1.0, 2.0, 3.0]})})
+    # The part number is kept on the continuation sheets, so their names stay distinct
+    assert list(read_back(path)) == [name[:31], f"{name[:27]} (2)"]
@@ -0,0 +1,57 @@
+"""Interval totals from the stored rollups against a recompute from the daily rows of the same interval."""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from attendance_core import process_attendance_data
+from history_analytics import range_totals
+from synthetic_reports import generate_report
+
+INTERVALS = [
+    # One whole month, and the same month less its first or last day (answered from the daily rows)
+    (date(2024, 11, 1), date(2024, 11, 30)),
+    (date(2024, 11, 1), date(2024, 11, 29)),
+    (date(2024, 11, 2), date(2024, 11, 30)),
+    (date(2024, 12, 1), date(2024, 12, 31)),
+    (date(2024, 11, 30), date(2024, 12, 1)),
+    (date(2024, 11, 15), date(2024, 12, 5)),
+    # Whole years, with the history covering only some of their days
+    (date(2024, 1, 1), date(2024, 12, 31)),
+    (date(2024, 1, 1), date(2025, 12, 31)),
+    (date(2023, 12, 31), date(2025, 1, 1)),
+]
+
+
+# Function to total the daily rows of an interval per employee or department, without any rollup
+def recompute_totals(daily_df, start, end, by):
+    days = daily_df['Data_Obiect'].dt.normalize()
+    rows = daily_df[(days >= pd.Timestamp(start)) & (days <= pd.Timestamp(end))].astype(
+        {'Angajat': object, 'Departament': object})
+    totals = rows.groupby(by).agg(**{'Ore Totale': ('Durata (Ore)', 'sum'), 'Ore Standard': ('Ore Standard', 'sum')})
+    totals['Diferență'] = totals['Ore Totale'] - totals['Ore Standard']
+    return totals.sort_index()
+
+
+@pytest.mark.parametrize('by', ['Angajat', 'Departament'])
+def test_range_totals_match_the_daily_rows(store, by):
+    # The history covers only 25 November - 8 December 2024
+    daily_df = process_attendance_data(generate_report(6, date(2024, 11, 25), 2, seed=4))[0]
+    store.upsert(daily_df)
+
+    for start, end in INTERVALS:
+        totals, _ = range_totals(store, start, end, by)
+        totals = totals.set_index(by)[['Ore Totale', 'Ore Standard', 'Diferență']].sort_index()
+        pd.testing.assert_frame_equal(totals, recompute_totals(daily_df, start, end, by), check_dtype=False,
+                                      check_names=False, obj=f"{start} - {end}")
+
+
+def test_whole_month_and_its_days_agree(store):
+    store.upsert(process_attendance_data(generate_report(6, date(2024, 11, 25), 2, seed=4))[0])
+
+    whole_month, plan = range_totals(store, date(2024, 11, 1), date(2024, 11, 30))
+    assert plan == {'years': 0, 'months': 1, 'days': 0}
+    without_first_day, plan = range_totals(store, date(2024, 11, 2), date(2024, 11, 30))
+    assert plan == {'years': 0, 'months': 0, 'days': 29}
+    for column in ('Ore Totale', 'Ore Standard', 'Diferență'):
+        assert whole_month[column].tolist() == pytest.approx(without_first_day[column].tolist())
@@ -0,0 +1,132 @@
+"""History stores: the SQLite engine's connection handling and the queries answered by the stores."""
+import sqlite3
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import history_store
+from attendance_core import process_attendance_data
+from history_analytics import range_entities, range_trend
+from history_store import SUMMARY_SOURCE_COLUMNS, ParquetHistoryStore, SqliteHistoryStore, total_days
+from synthetic_reports import generate_report
+
+
+def test_sqlite_store_closes_its_connections(tmp_path, monkeypatch):
+    opened = []
+    connect = sqlite3.connect
+
+    def tracking_connect(*args, **kwargs):
+        connection = connect(*args, **kwargs)
+        opened.append(connection)
+        return connection
+
+    monkeypatch.setattr(history_store.sqlite3, 'connect', tracking_connect)
+    path = str(tmp_path / 'history.db')
+    daily_df = process_attendance_data(generate_report(5, date(2025, 3, 3), 2, seed=1))[0]
+
+    store = SqliteHistoryStore(path)
+    store.upsert(daily_df)
+    assert store.count() == len(daily_df)
+    assert len(store.load(columns=['Angajat', 'Data_Obiect'])) == len(daily_df)
+    assert not store.load_summary('monthly').empty
+    assert store.partitions() == [(2025, 3)]
+
+    assert opened
+    for connection in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            connection.execute("SELECT 1")
+
+    # Everything written was committed before the connections were closed
+    assert SqliteHistoryStore(path).count() == len(daily_df)
+
+
+def test_sqlite_store_rolls_back_a_failed_block(tmp_path):
+    store = SqliteHistoryStore(str(tmp_path / 'history.db'))
+    store.upsert(process_attendance_data(generate_report(2, date(2025, 3, 3), 1, seed=1))[0])
+    count = store.count()
+
+    with pytest.raises(RuntimeError):
+        with store.connect() as connection:
+            connection.execute("DELETE FROM attendance")
+            raise RuntimeError("failed in the middle of a write")
+    assert store.count() == count
+
+
+# Function to process a report of 6 employees over 25 November - 8 December 2024, with one undated row added
+def history_rows():
+    daily_df = process_attendance_data(generate_report(6, date(2024, 11, 25), 2, seed=4))[0]
+    undated = daily_df.iloc[[0]].astype({'ID Legitimație': object})
+    undated = undated.assign(**{'ID Legitimație': 'FARA-DATA', 'Data_Obiect': pd.NaT, 'An': pd.NA, 'Luna': pd.NA})
+    return pd.concat([daily_df, undated], ignore_index=True)
+
+
+def test_load_reads_only_the_given_months(store):
+    daily_df = history_rows()
+    store.upsert(daily_df)
+
+    assert store.partitions() == [(0, 0), (2024, 11), (2024, 12)]
+    november = store.load([(2024, 11)], ['Angajat', 'Data_Obiect'])
+    assert len(november) == (daily_df['Data_Obiect'].dt.month == 11).sum()
+    assert (november['Data_Obiect'].dt.month == 11).all()
+    undated = store.load([(0, 0)], ['Angajat', 'Data_Obiect'])
+    assert len(undated) == 1 and undated['Data_Obiect'].isna().all()
+    assert len(store.load([(2024, 12), (0, 0)])) == (daily_df['Data_Obiect'].dt.month == 12).sum() + 1
+    assert store.load([(2025, 1)]).empty
+
+
+def test_sqlite_month_filter_uses_the_month_index(tmp_path):
+    store = SqliteHistoryStore(str(tmp_path / 'history.db'))
+    store.upsert(history_rows())
+    with store.connect() as connection:
+        plan = connection.execute("EXPLAIN QUERY PLAN SELECT employee FROM attendance "
+                                  "WHERE (year = ? AND month = ?) OR year IS NULL", (2024, 11)).fetchall()
+    assert any('idx_attendance_month' in row[-1] for row in plan)
+
+
+def test_day_totals_sum_only_the_given_days(store):
+    daily_df = history_rows()
+    store.upsert(daily_df)
+
+    day_ranges = [(date(2024, 11, 27), date(2024, 11, 30)), (date(2024, 12, 2), date(2024, 12, 3))]
+    days = daily_df['Data_Obiect'].dt.date
+    expected = total_days(daily_df[SUMMARY_SOURCE_COLUMNS][
+        days.between(*day_ranges[0]) | days.between(*day_ranges[1])].astype({'Angajat': object}))
+
+    totals = store.day_totals(day_ranges)
+    assert totals.columns.tolist() == ['Angajat', 'Departament', 'Ore Totale', 'Ore Standard']
+    pd.testing.assert_frame_equal(totals.astype({'Angajat': object, 'Departament': object}),
+                                  expected.astype({'Departament': object}), check_dtype=False)
+    assert store.day_totals([(date(2025, 1, 6), date(2025, 1, 10))]).empty
+
+
+@pytest.mark.parametrize('by', ['Angajat', 'Departament'])
+def test_trend_of_one_entity_is_read_alone(store, by):
+    store.upsert(history_rows())
+    start, end = date(2024, 11, 1), date(2024, 12, 31)
+
+    entities = range_entities(store, start, end, by)
+    assert len(entities) == (6 if by == 'Angajat' else 3)
+    everyone = range_trend(store, 'weekly', start, end, by)
+    for entity in entities:
+        trend = range_trend(store, 'weekly', start, end, by, entity)
+        assert (trend[by] == entity).all()
+        pd.testing.assert_frame_equal(trend, everyone[everyone[by] == entity].reset_index(drop=True),
+                                      check_dtype=False, check_categorical=False)
+    assert range_trend(store, 'monthly', start, end, by, 'NIMENI').empty
+
+
+@pytest.mark.parametrize('open_store', [lambda path: ParquetHistoryStore(str(path / 'history')),
+                                        lambda path: SqliteHistoryStore(str(path / 'history.db'))],
+                         ids=['parquet', 'sqlite'])
+def test_recorded_uploads_outlive_the_store_object(tmp_path, open_store):
+    store = open_store(tmp_path)
+    assert store.recorded_uploads(['a:', 'b:Foaie1']) == set()
+    store.record_uploads(['a:', 'b:Foaie1'])
+    store.record_uploads(['a:'])
+
+    # A new session opens the same history with a new store object
+    reopened = open_store(tmp_path)
+    assert reopened.recorded_uploads(['a:', 'b:Foaie1', 'c:']) == {'a:', 'b:Foaie1'}
+    assert reopened.recorded_uploads([]) == set()
+    assert reopened.is_empty()
@@ -0,0 +1,64 @@
+"""Totals kept by the history stores: after overlapping and replacing uploads, the incrementally maintained weekly,
+monthly and yearly totals (and their department rollups) equal the totals rebuilt from the stored daily rows."""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from attendance_core import process_attendance_data
+from history_store import SUMMARY_KEY_COLUMNS
+from synthetic_reports import generate_report
+
+
+# Function to bring stored totals to plain, sorted rows, so both engines and both paths compare equal
+def comparable(summary, kind):
+    key_columns = list(SUMMARY_KEY_COLUMNS[kind])
+    columns = {}
+    for name in summary.columns:
+        column = summary[name]
+        if isinstance(column.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(column):
+            columns[name] = column.astype(object)
+        elif pd.api.types.is_numeric_dtype(column):
+            columns[name] = column.astype(float)
+        else:
+            columns[name] = column
+    return pd.DataFrame(columns).sort_values(key_columns).reset_index(drop=True)
+
+
+# Function to read every kind of totals of a store
+def all_summaries(store):
+    return {kind: comparable(store.load_summary(kind), kind) for kind in SUMMARY_KEY_COLUMNS}
+
+
+def test_incremental_totals_equal_a_rebuild(store):
+    # 25 November - 29 December 2024, then 16 December 2024 - 12 January 2025 (overlapping two weeks, spanning New
+    # Year and with ISO week 1 of 2025 starting in December), then 6 - 19 January 2025 for some of the employees
+    december = process_attendance_data(generate_report(6, date(2024, 11, 25), 5, seed=1))[0]
+    new_year = process_attendance_data(generate_report(6, date(2024, 12, 16), 4, seed=2))[0]
+    january = process_attendance_data(generate_report(3, date(2025, 1, 6), 2, seed=3))[0]
+
+    # Corrected uploads of some days: the same keys with other hours. The January one touches only January, while
+    # its week starts in December, and the first week of the months it reloads starts in November
+    def corrected(daily_df, first, last):
+        rows = daily_df[daily_df['Data_Obiect'].between(pd.Timestamp(first), pd.Timestamp(last))].copy()
+        rows['Durata (Ore)'] = rows['Durata (Ore)'] + 1.25
+        rows['Diferență'] = rows['Durata (Ore)'] - rows['Ore Standard']
+        return rows
+
+    for daily_df in (december, new_year, january, corrected(december, date(2024, 12, 9), date(2024, 12, 12)),
+                     corrected(new_year, date(2025, 1, 2), date(2025, 1, 3))):
+        store.upsert(daily_df)
+    incremental = all_summaries(store)
+
+    store.rebuild_summaries()
+    rebuilt = all_summaries(store)
+    for kind in SUMMARY_KEY_COLUMNS:
+        pd.testing.assert_frame_equal(incremental[kind], rebuilt[kind], obj=kind)
+
+    # The week spanning New Year is one cell, and the correction is counted once
+    weekly = incremental['weekly']
+    assert not weekly[(weekly['An'] == 2025) & (weekly['Săptămână'] == 1)].empty
+    assert weekly[(weekly['An'] == 2024) & (weekly['Săptămână'] == 1)].empty
+    stored = store.load()
+    assert len(stored) == len(stored.drop_duplicates(['Angajat', 'ID Legitimație', 'Data_Obiect']))
+    assert incremental['yearly']['Ore Totale'].sum() == pytest.approx(stored['Durata (Ore)'].sum())
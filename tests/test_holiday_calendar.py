@@ -0,0 +1,45 @@
+"""Holiday calendar: computed Orthodox Easter, the vectorized holiday mask and the month metrics built on it."""
+from datetime import date
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from attendance_core import calculate_orthodox_easter, get_holiday_calendar, get_month_metrics, holiday_mask
+
+
+@pytest.mark.parametrize('year, easter', [
+    (2023, date(2023, 4, 16)),
+    (2024, date(2024, 5, 5)),
+    (2025, date(2025, 4, 20)),
+    (2026, date(2026, 4, 12)),
+    (2027, date(2027, 5, 2)),
+])
+def test_orthodox_easter(year, easter):
+    assert calculate_orthodox_easter(year) == easter
+
+
+def test_calendar_of_2024():
+    calendar = get_holiday_calendar(2024)
+    # Good Friday, Easter Sunday and Monday, Pentecost Sunday and Monday move with Easter
+    movable = [date(2024, 5, 3), date(2024, 5, 5), date(2024, 5, 6), date(2024, 6, 23), date(2024, 6, 24)]
+    assert set(movable) <= set(calendar.dates)
+    assert len(calendar.dates) == 14
+    assert calendar.days.tolist() == calendar.dates
+    assert get_holiday_calendar(2024) is calendar
+
+
+def test_holiday_mask_spans_years_and_skips_missing_dates():
+    dates = pd.to_datetime(['2024-12-25', '2024-12-27', None, '2025-01-01', '2025-04-21', '2025-04-22'])
+    assert holiday_mask(dates).tolist() == [True, False, False, True, True, False]
+    assert holiday_mask(pd.to_datetime([None])).tolist() == [False]
+
+
+def test_month_metrics_skip_holidays():
+    # May 2024: 23 weekdays, less 1 May, Good Friday (3 May) and Easter Monday (6 May), with Easter Sunday the
+    # fourth holiday; 4 of the 5 Fridays are worked (6 hours)
+    metrics = get_month_metrics(2024, 5)
+    assert int(metrics['Zile Lucrătoare']) == 20
+    assert int(metrics['Sărbători Legale']) == 4
+    fridays = np.busday_count('2024-05-01', '2024-06-01', weekmask='0000100') - 1
+    assert float(metrics['Ore Standard']) == (20 - fridays) * 8.5 + fridays * 6.0
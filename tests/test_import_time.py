@@ -0,0 +1,69 @@
+"""Cold-start budget: the processing modules and the first run of the app (no upload yet) must stay within their
+import-time budgets and must not load the plotting or Excel-writer libraries, which are imported on first use."""
+import json
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Seconds, about three times what the small container measures (0.4 s and 0.8 s), so only a new heavy import fails
+CORE_IMPORT_BUDGET = 1.5
+APP_FIRST_RUN_BUDGET = 3.0
+
+# Loaded only when the charts are shown or an Excel file is downloaded (Streamlit itself imports plotly's figure
+# classes to set up its chart theme, so plotly.express is what the app defers)
+DEFERRED_MODULES = ('plotly.express', 'xlsxwriter')
+
+# First script run of the app in a fresh interpreter, as a user opening the page sees it
+APP_FIRST_RUN = f"""
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app_test = AppTest.from_file({os.path.join(ROOT, 'app.py')!r}, default_timeout=60)
+started = time.perf_counter()
+app_test.run()
+print(json.dumps({{'seconds': time.perf_counter() - started,
+                   'exceptions': [exception.value for exception in app_test.exception],
+                   'loaded': list(sys.modules)}}))
+"""
+
+
+# Function to list the deferred modules among the names of loaded modules
+def deferred_modules(loaded):
+    return sorted({deferred for deferred in DEFERRED_MODULES for name in loaded
+                   if name == deferred or name.startswith(deferred + '.')})
+
+
+# Function to run Python code in a fresh interpreter from the repository root and return its completed process
+def run_python(*args):
+    return subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, text=True, check=True)
+
+
+# Function to import a module with -X importtime and return its cumulative import time in seconds, with the names of
+# all the modules the import loaded
+def measure_import(module):
+    process = run_python('-X', 'importtime', '-c', f"import {module}")
+    cumulative = {}
+    for line in process.stderr.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)$', line)
+        if match:
+            cumulative[match.group(3)] = int(match.group(1)) / 1e6
+    return cumulative[module], set(cumulative)
+
+
+def test_core_import_time_within_budget():
+    # Best of three, so a slow first read of the files from disk does not count
+    seconds, loaded = min((measure_import('attendance_batch') for _ in range(3)), key=lambda measured: measured[0])
+    assert seconds < CORE_IMPORT_BUDGET, f"import attendance_batch took {seconds:.2f} s"
+    assert not deferred_modules(loaded)
+
+
+def test_app_first_run_within_budget():
+    pytest.importorskip('streamlit.testing.v1')
+    result = json.loads(run_python('-c', APP_FIRST_RUN).stdout.splitlines()[-1])
+    assert not result['exceptions']
+    assert result['seconds'] < APP_FIRST_RUN_BUDGET, f"first run of the app took {result['seconds']:.2f} s"
+    assert not deferred_modules(result['loaded'])
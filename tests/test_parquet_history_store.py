@@ -0,0 +1,80 @@
+"""Parquet history store: one typed file per month, loads limited to some months and columns, atomic writes."""
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import history_store
+from attendance_core import apply_daily_schema, process_attendance_data
+from history_store import ParquetHistoryStore
+from synthetic_reports import generate_report
+
+
+# Function to process a report of 25 November - 8 December 2024 (two months)
+def two_month_rows():
+    return process_attendance_data(generate_report(5, date(2024, 11, 25), 2, seed=2))[0]
+
+
+# Function to list the files under a directory, relative to it
+def stored_files(root):
+    return sorted(os.path.relpath(os.path.join(directory, name), root)
+                  for directory, _, names in os.walk(root) for name in names)
+
+
+def test_rows_are_partitioned_by_year_and_month(tmp_path):
+    store = ParquetHistoryStore(str(tmp_path))
+    store.upsert(two_month_rows())
+
+    assert [name for name in stored_files(tmp_path) if not name.startswith('summaries')] == [
+        os.path.join('2024', '11.parquet'), os.path.join('2024', '12.parquet')]
+    assert store.partitions() == [(2024, 11), (2024, 12)]
+
+
+def test_partition_round_trip_keeps_the_column_types(tmp_path):
+    daily_df = two_month_rows()
+    store = ParquetHistoryStore(str(tmp_path))
+    store.upsert(daily_df)
+
+    december = daily_df[daily_df['Data_Obiect'].dt.month == 12].reset_index(drop=True)
+    loaded = store.read_partition(2024, 12)
+    # The same values and types, with the categories of the stored rows only
+    pd.testing.assert_frame_equal(apply_daily_schema(loaded), apply_daily_schema(december))
+    assert loaded.dtypes.equals(december.dtypes)
+    assert store.count() == len(daily_df)
+
+
+def test_load_projects_columns_and_months(tmp_path):
+    daily_df = two_month_rows()
+    store = ParquetHistoryStore(str(tmp_path))
+    store.upsert(daily_df)
+
+    loaded = store.load([(2024, 11)], ['Angajat', 'Data_Obiect', 'Durata (Ore)'])
+    assert loaded.columns.tolist() == ['Angajat', 'Data_Obiect', 'Durata (Ore)']
+    november = daily_df[daily_df['Data_Obiect'].dt.month == 11]
+    assert len(loaded) == len(november)
+    assert loaded['Durata (Ore)'].sum() == pytest.approx(november['Durata (Ore)'].sum())
+    assert store.load([(2023, 1)]).empty
+
+
+def test_partition_write_is_atomic(tmp_path, monkeypatch):
+    store = ParquetHistoryStore(str(tmp_path))
+    daily_df = two_month_rows()
+    store.upsert(daily_df)
+    path = store.partition_path(2024, 12)
+    before = pd.read_parquet(path)
+
+    # A write failing before the rename leaves the stored file as it was, and no temporary file behind
+    def failing_replace(source, target):
+        raise OSError("disk full")
+    monkeypatch.setattr(history_store.os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        store.write_partition(2024, 12, daily_df.head(3))
+    pd.testing.assert_frame_equal(pd.read_parquet(path), before)
+    assert not [name for name in stored_files(tmp_path) if name.endswith('.tmp')]
+
+    monkeypatch.undo()
+    store.write_partition(2024, 12, daily_df.head(3))
+    assert len(store.read_partition(2024, 12)) == 3
+    store.write_partition(2024, 12, daily_df.head(0))
+    assert store.partitions() == [(2024, 11)]
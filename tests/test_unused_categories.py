@@ -0,0 +1,37 @@
+"""Summaries of a subset of the daily rows, whose category columns still list the employees, departments and days
+left out: those give no rows."""
+from datetime import date
+
+from attendance_cube import build_attendance_cube
+from attendance_core import calculate_monthly_summary, calculate_weekly_summary, process_attendance_data
+from synthetic_reports import generate_report
+
+
+def one_employee_rows():
+    daily_df = process_attendance_data(generate_report(6, date(2025, 1, 27), 2, seed=3))[0]
+    employee = daily_df['Angajat'].iloc[0]
+    rows = daily_df[daily_df['Angajat'] == employee]
+    assert len(rows['Angajat'].cat.categories) == 6 and len(rows['Departament'].cat.categories) == 3
+    return rows, employee
+
+
+def test_summaries_have_only_the_rows_of_the_subset():
+    rows, employee = one_employee_rows()
+
+    weekly_df = calculate_weekly_summary(rows)
+    assert (weekly_df['Angajat'] == employee).all()
+    assert list(zip(weekly_df['An'], weekly_df['Săptămână'])) == [(2025, 5), (2025, 6)]
+
+    monthly_df = calculate_monthly_summary(rows)
+    assert (monthly_df['Angajat'] == employee).all()
+    assert list(zip(monthly_df['An'], monthly_df['Luna'])) == [(2025, 1), (2025, 2)]
+
+
+def test_cube_has_only_the_rows_of_the_subset():
+    rows, employee = one_employee_rows()
+    cube = build_attendance_cube(rows)
+
+    assert len(cube[('department', 'total')]) == 1
+    employees = cube[('employee', 'weekly')]
+    assert (employees['Angajat'] == employee).all() and len(employees) == 2
+    assert cube[('company', 'total')]['Ore Totale'].iloc[0] == rows['Durata (Ore)'].sum()
@@ -0,0 +1,42 @@
+"""Weekly summaries of reports spanning New Year: weeks are keyed by their ISO year."""
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from attendance_batch import merge_results
+from attendance_core import process_attendance_data
+from synthetic_reports import generate_report
+
+
+def test_week_spanning_new_year_is_one_row():
+    # 23 December 2024 to 12 January 2025; ISO week 1 of 2025 runs from 30 December to 5 January
+    daily_df, weekly_df, _, _, _ = process_attendance_data(generate_report(6, date(2024, 12, 23), 3, seed=6))
+
+    weeks = weekly_df[weekly_df['Angajat'] == weekly_df['Angajat'].iloc[0]]
+    assert list(zip(weeks['An'], weeks['Săptămână'])) == [(2024, 52), (2025, 1), (2025, 2)]
+    assert weeks['Interval'].tolist()[1] == '30 Dec - 05 Jan'
+
+
+def test_weekly_totals_match_the_days_of_each_iso_week():
+    daily_df, weekly_df, _, _, _ = process_attendance_data(generate_report(6, date(2024, 12, 23), 3, seed=6))
+
+    iso = daily_df['Data_Obiect'].dt.isocalendar()
+    expected = daily_df.groupby([daily_df['Angajat'].astype(str), iso['year'], iso['week']])['Durata (Ore)'].sum()
+    totals = weekly_df.groupby([weekly_df['Angajat'].astype(str), weekly_df['An'].astype(int),
+                                weekly_df['Săptămână'].astype(int)])['Ore Totale'].sum()
+    pd.testing.assert_series_equal(totals, expected, check_names=False, check_index_type=False)
+
+
+def test_weeks_of_different_years_are_not_merged():
+    # Week 1 of 2025 (30 December 2024 - 5 January 2025) and the last days of December 2025, which are in ISO week
+    # 1 of 2026: keyed by calendar year, both reports would fall in (2025, 1)
+    first = process_attendance_data(generate_report(3, date(2024, 12, 30), 1, seed=1))[0]
+    second = process_attendance_data(generate_report(3, date(2025, 12, 29), 1, seed=2))[0]
+    daily_df, weekly_df, _, _, _ = merge_results([first, second])
+
+    assert sorted(set(zip(weekly_df['An'], weekly_df['Săptămână']))) == [(2025, 1), (2026, 1)]
+    weeks = weekly_df[weekly_df['Angajat'] == weekly_df['Angajat'].iloc[0]]
+    assert weeks['Interval'].tolist() == ['30 Dec - 05 Jan', '29 Dec - 04 Jan']
+    assert weeks['Ore Totale'].sum() == pytest.approx(
+        daily_df.loc[daily_df['Angajat'] == weeks['Angajat'].iloc[0], 'Durata (Ore)'].sum())
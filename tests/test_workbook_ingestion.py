@@ -0,0 +1,74 @@
+"""Excel ingestion: the worksheet rows streamed from a workbook give the same frames as the CSV export of the same
+report, for any of its sheets, and an empty sheet gives no rows."""
+import io
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from attendance_core import process_attendance_data, read_report_lines
+from card_report_parser import get_workbook_sheet_names, iter_workbook_lines
+from synthetic_reports import generate_report
+
+openpyxl = pytest.importorskip('openpyxl')
+
+
+# Function to write reports into the sheets of a workbook as Excel holds them: one cell per comma-separated value,
+# nothing in the blank cells and the badge and card numbers as numbers
+def report_workbook(sheets):
+    workbook = openpyxl.Workbook()
+    workbook.remove(workbook.active)
+    for sheet_name, report in sheets.items():
+        worksheet = workbook.create_sheet(sheet_name)
+        for line in report.splitlines():
+            worksheet.append([int(cell) if cell.isdigit() else cell or None for cell in line.split(',')])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+# Function to process a report from its CSV text and from a workbook sheet
+def both_paths(report, workbook_bytes, sheet_name=None):
+    from_csv = process_attendance_data(read_report_lines('raport.csv', report.encode('utf-8')))
+    from_xlsx = process_attendance_data(read_report_lines('raport.xlsx', workbook_bytes, sheet_name))
+    return from_csv, from_xlsx
+
+
+# Function to check that two results hold the same frames, date range and year
+def assert_same_results(expected, actual):
+    for expected_df, actual_df in zip(expected[:3], actual[:3]):
+        pd.testing.assert_frame_equal(actual_df, expected_df)
+    assert tuple(actual[3:]) == tuple(expected[3:])
+
+
+@pytest.mark.parametrize('start, weeks, seed', [
+    (date(2024, 11, 25), 2, 0),
+    # Spanning New Year, with absent days and missing weeks
+    (date(2024, 12, 23), 3, 1),
+])
+def test_workbook_gives_the_frames_of_the_csv_export(start, weeks, seed):
+    report = generate_report(6, start, weeks, seed=seed, absent_rate=0.2, missing_week_rate=0.1)
+    from_csv, from_xlsx = both_paths(report, report_workbook({'Raport': report}))
+    assert not from_csv[0].empty
+    assert_same_results(from_csv, from_xlsx)
+
+
+def test_each_sheet_is_read_on_its_own():
+    november = generate_report(4, date(2024, 11, 4), 2, seed=2)
+    march = generate_report(3, date(2025, 3, 3), 1, seed=3)
+    workbook_bytes = report_workbook({'Noiembrie': november, 'Gol': '', 'Martie': march})
+    assert get_workbook_sheet_names(io.BytesIO(workbook_bytes)) == ['Noiembrie', 'Gol', 'Martie']
+
+    # The first sheet by default, or the named one
+    assert_same_results(*both_paths(november, workbook_bytes))
+    assert_same_results(*both_paths(march, workbook_bytes, 'Martie'))
+
+
+def test_empty_sheet_gives_no_rows():
+    workbook_bytes = report_workbook({'Gol': ''})
+    assert list(iter_workbook_lines(io.BytesIO(workbook_bytes))) == []
+
+    daily_df, weekly_df, monthly_df, date_range, _ = process_attendance_data(
+        read_report_lines('raport.xlsx', workbook_bytes))
+    assert daily_df.empty and weekly_df.empty and monthly_df.empty
+    assert date_range == 'N/A'